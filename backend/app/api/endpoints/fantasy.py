@@ -2,16 +2,29 @@
 Endpoint para otimização de time de Fantasy F1.
 """
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Optional
-from app.services.fantasy_optimizer import find_best_team
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from app.services.fantasy_optimizer import find_best_team, find_best_teams_batch
 
 router = APIRouter()
 
+# Máximo de pedidos em uma otimização em lote
+MAX_BATCH_SIZE = 500
+
 
 class OptimizationRequest(BaseModel):
     budget: float = 100.0
     custom_points_projections: Optional[Dict[str, float]] = None
+    top_k: int = Field(default=1, ge=1, le=50, description="Número de times alternativos em top_teams")
+
+
+class BatchOptimizationRequest(BaseModel):
+    requests: List[OptimizationRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description="Pedidos de otimização (orçamento, projeções e top_k), respondidos na mesma ordem"
+    )
 
 
 @router.post("/optimize")
@@ -20,7 +33,9 @@ async def optimize_team(request: OptimizationRequest):
     Otimiza um time de Fantasy F1 maximizando expected_points.
     
     Args:
-        request: OptimizationRequest com budget (padrão: 100.0)
+        request: OptimizationRequest com budget (padrão: 100.0) e top_k
+            (padrão: 1; com mais, inclui "top_teams" com os melhores times e a
+            diferença de pontos de cada um para o ótimo em "gap_to_best")
     
     Returns:
         Dict com a melhor equipe:
@@ -36,7 +51,7 @@ async def optimize_team(request: OptimizationRequest):
         if request.budget <= 0:
             raise HTTPException(status_code=400, detail="Orçamento deve ser maior que zero")
         
-        result = find_best_team(request.budget, request.custom_points_projections)
+        result = find_best_team(request.budget, request.custom_points_projections, request.top_k)
         return result
     
     except ValueError as e:
@@ -46,3 +61,31 @@ async def optimize_team(request: OptimizationRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao otimizar time: {str(e)}")
 
+
+@router.post("/optimize/batch")
+def optimize_team_batch(request: BatchOptimizationRequest):
+    """
+    Otimiza vários times (por exemplo, simulações "e se" de 60 a 120 milhões)
+    com um só carregamento de f1_prices.json.
+    
+    Pedidos com as mesmas projeções compartilham a tabela de escalações por
+    orçamento e são respondidos juntos. Síncrono: o FastAPI roda a
+    otimização no threadpool, fora do event loop.
+    
+    Args:
+        request: BatchOptimizationRequest com a lista de pedidos (cada um
+            como em /optimize)
+    
+    Returns:
+        Dict com "results": um item por pedido, na ordem dos pedidos, no
+        formato de /optimize, ou {"error": mensagem} para pedidos inválidos
+        ou sem time válido
+    """
+    try:
+        results = find_best_teams_batch([item.model_dump() for item in request.requests])
+        return {"results": results}
+    
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Arquivo de dados não encontrado: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao otimizar times: {str(e)}")
@@ -1,7 +1,7 @@
 """
 Endpoints para otimização de times de Fantasy F1.
 """
-from typing import Dict, Literal
+from typing import Dict, List, Literal
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
@@ -10,6 +10,9 @@ from app.services.optimizer import TeamOptimizer
 
 router = APIRouter()
 
+# Máximo de pedidos em uma otimização em lote
+MAX_BATCH_SIZE = 500
+
 
 class OptimizeRequest(BaseModel):
     """Modelo de requisição para otimização."""
@@ -18,6 +21,32 @@ class OptimizeRequest(BaseModel):
         default="points",
         description="Estratégia de otimização: 'points' (maximiza pontos), 'value' (maximiza sentiment), 'balanced' (equilibrado)"
     )
+    top_k: int = Field(default=1, ge=1, le=50, description="Número de times alternativos em top_teams")
+
+
+class BatchOptimizeRequest(BaseModel):
+    """Modelo de requisição para otimização em lote."""
+    requests: List[OptimizeRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description="Pedidos de otimização (orçamento, estratégia e top_k), respondidos na mesma ordem"
+    )
+
+
+def _team_response(result: Dict, strategy: str) -> Dict:
+    """Resposta de um time otimizado (ver optimize_team)."""
+    response = {
+        "drivers": result["drivers"],
+        "constructors": result["constructors"],
+        "total_score": result["total_score"],
+        "total_cost": result["total_cost"],
+        "budget_remaining": result["budget_remaining"],
+        "strategy": strategy
+    }
+    if "top_teams" in result:
+        response["top_teams"] = result["top_teams"]
+    return response
 
 
 @router.post("/optimize")
@@ -35,6 +64,8 @@ def optimize_team(request: OptimizeRequest) -> Dict:
             - total_score: Score total do time
             - total_cost: Custo total
             - budget_remaining: Orçamento restante
+            - top_teams: Com top_k > 1, os top_k melhores times (com gap_to_best,
+              o score a menos que o ótimo)
     
     Raises:
         HTTPException 422: Se os parâmetros forem inválidos
@@ -44,17 +75,10 @@ def optimize_team(request: OptimizeRequest) -> Dict:
         optimizer = TeamOptimizer()
         result = optimizer.find_best_team(
             budget=request.budget,
-            strategy=request.strategy
+            strategy=request.strategy,
+            top_k=request.top_k
         )
-        
-        return {
-            "drivers": result["drivers"],
-            "constructors": result["constructors"],
-            "total_score": result["total_score"],
-            "total_cost": result["total_cost"],
-            "budget_remaining": result["budget_remaining"],
-            "strategy": request.strategy
-        }
+        return _team_response(result, request.strategy)
         
     except ValueError as e:
         raise HTTPException(
@@ -68,3 +92,40 @@ def optimize_team(request: OptimizeRequest) -> Dict:
         )
 
 
+@router.post("/optimize/batch")
+def optimize_team_batch(request: BatchOptimizeRequest) -> Dict:
+    """
+    Otimiza vários times (por exemplo, uma faixa de orçamentos em cada
+    estratégia) com um só carregamento dos ativos.
+    
+    Todos os pedidos usam o mesmo TeamOptimizer, e portanto o mesmo índice de
+    combinações de pilotos com custos e pontos já somados.
+    
+    Args:
+        request: Lista de pedidos com orçamento, estratégia e top_k
+    
+    Returns:
+        Dict com "results": um item por pedido, na ordem dos pedidos, no
+        formato de /optimize, ou {"error": mensagem} para pedidos sem time
+        válido
+    
+    Raises:
+        HTTPException 500: Se houver erro ao carregar os dados
+    """
+    try:
+        optimizer = TeamOptimizer()
+        results = []
+        for item in request.requests:
+            try:
+                result = optimizer.find_best_team(budget=item.budget, strategy=item.strategy, top_k=item.top_k)
+            except ValueError as e:
+                results.append({"error": str(e)})
+                continue
+            results.append(_team_response(result, item.strategy))
+        return {"results": results}
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao otimizar times: {str(e)}"
+        )
@@ -1,28 +1,74 @@
 """
 Endpoint para simulação de corrida F1.
 """
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from typing import Dict, List, Optional
-from app.simulation.models import DriverSim
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Callable, Dict, List, Literal, Optional
+from app.simulation.models import DriverSim, MonteCarloStats, RaceState, SweepScenario
 from app.simulation.engine import simulate_race
+from app.simulation.runner import STOP_COMPLETED, run_in_rounds, run_monte_carlo, run_sweep
+from app.simulation.precision import STOP_FIXED, measure_precision, run_until_precise
+from app.simulation.jobs import JOB_DONE, JOB_FAILED, JobQueueFull, get_job_manager
+from app.simulation.streams import VarianceReduction, iteration_seed, resolve_seed
 from app.services.fantasy_data import load_assets
-from app.services.race_setup import get_race_parameters
+from app.services.race_setup import load_race_parameters
+from app.simulation.cache import CACHE_MISS, get_result_cache, make_cache_key
+from app.simulation.scoring import summarize_fantasy
+from app.simulation.head_to_head import summarize_head_to_head
+from app.simulation.run_store import (
+    StoredRun, get_run_store, head_to_head_matrix, joint_top_n_probability, position_counts, top_n_probabilities
+)
+from app.simulation.trace import TRACE_FULL, build_race_trace
+from app.simulation.timing import (
+    PHASE_AGGREGATION, PHASE_PARAMETERS, PHASE_SERIALIZATION, PHASE_SIMULATION,
+    PhaseTimer, activate, get_phase_histograms, phase
+)
+import numpy as np
 import random
 
 router = APIRouter()
 
+# Iterações do modo fixo quando não informadas
+DEFAULT_ITERATIONS = 100
+
+# Intervalo (s) entre verificações de novos parciais no stream de eventos de um job
+JOB_EVENTS_POLL_INTERVAL = 0.2
+
+# Voltas da corrida quando não informadas (valor padrão, pode variar por pista)
+DEFAULT_TOTAL_LAPS = 58
+
+# Grade padrão de probabilidades de chuva da varredura (0-100%)
+DEFAULT_SWEEP_RAIN_PROBABILITIES = list(range(0, 101, 10))
+
+# Iterações por cenário da varredura quando não informadas
+DEFAULT_SWEEP_ITERATIONS = 1000
+
+# Máximo de cenários (produto das grades) em uma varredura
+MAX_SWEEP_SCENARIOS = 100
+
+# Tentativas de simulação individual para obter um Race Trace vencido pelo favorito
+REPRESENTATIVE_RACE_ATTEMPTS = 50
+
 
 class SimulationRequest(BaseModel):
     gp_name: str
-    num_simulations: int = 100
+    num_simulations: Optional[int] = Field(default=None, ge=1)
+    seed: Optional[int] = None
+    pit_strategy: Literal["reactive", "planned"] = "reactive"
+    time_budget_ms: Optional[int] = Field(default=None, ge=10, le=600000)
 
 
-def convert_drivers_to_sim_drivers(drivers_df, laps: int = 58) -> List[DriverSim]:
+def convert_drivers_to_sim_drivers(drivers_df, laps: int = 58, seed: Optional[int] = None) -> List[DriverSim]:
     """
     Converte DataFrame de pilotos para lista de DriverSim.
     Usa predicted_points como base para calcular tempos base e consistência.
+    Com `seed`, a variação aleatória da consistência é reprodutível.
     """
+    rng = random if seed is None else random.Random(seed)
     sim_drivers = []
     
     for _, driver in drivers_df.iterrows():
@@ -36,9 +82,9 @@ def convert_drivers_to_sim_drivers(drivers_df, laps: int = 58) -> List[DriverSim
         
         # Consistência baseada no tier (A = mais consistente, B = menos)
         if driver.get('tier') == 'A':
-            consistency = 0.5 + random.uniform(-0.1, 0.2)
+            consistency = 0.5 + rng.uniform(-0.1, 0.2)
         else:
-            consistency = 1.0 + random.uniform(-0.2, 0.3)
+            consistency = 1.0 + rng.uniform(-0.2, 0.3)
         
         # Degradação baseada no preço (carros mais caros tendem a ter menor degradação)
         price = driver.get('price', 15.0)
@@ -55,16 +101,70 @@ def convert_drivers_to_sim_drivers(drivers_df, laps: int = 58) -> List[DriverSim
     return sim_drivers
 
 
+def _find_representative_race(
+    drivers: List[DriverSim],
+    total_laps: int,
+    weather_prob: float,
+    winner_name: str,
+    seed: int,
+    pit_strategy: str = "reactive",
+    weather_model: str = "static"
+):
+    """
+    Encontra uma corrida vencida pelo piloto indicado, para exibir no Race Trace.
+    
+    As tentativas rodam em modo resumo (sem histórico volta a volta); apenas a
+    corrida escolhida é re-simulada, com a mesma semente, gravando o histórico.
+    
+    Args:
+        drivers: Pilotos da simulação
+        total_laps: Número de voltas
+        weather_prob: Probabilidade de chuva (0.0 a 1.0)
+        winner_name: Piloto mais provável de vencer
+        seed: Semente da execução (a tentativa i usa iteration_seed(seed, i))
+        pit_strategy: Estratégia de pit ("reactive" ou "planned")
+        weather_model: Modelo de clima ("static" ou "markov")
+    
+    Returns:
+        Lista de RaceResult da corrida escolhida (a última tentativa se nenhuma
+        for vencida pelo piloto indicado)
+    """
+    # Estado compacto reaproveitado (reinicializado no lugar) entre as tentativas
+    state = RaceState(drivers)
+    race_seed = None
+    for attempt in range(REPRESENTATIVE_RACE_ATTEMPTS):
+        race_seed = iteration_seed(seed, attempt)
+        results, _ = simulate_race(
+            drivers, total_laps, weather_prob, seed=race_seed,
+            record_history=False, pit_strategy=pit_strategy, state=state, weather_model=weather_model
+        )
+        if results and results[0].driver_name == winner_name:
+            break
+    
+    if race_seed is None:
+        return None
+    
+    # Re-simula apenas a corrida devolvida, agora com histórico completo
+    results, _ = simulate_race(
+        drivers, total_laps, weather_prob, seed=race_seed, pit_strategy=pit_strategy, state=state,
+        weather_model=weather_model
+    )
+    return results
+
+
 @router.post("/simulate")
 async def simulate_race_monte_carlo(request: SimulationRequest):
     """
     Executa simulação Monte Carlo de uma corrida (usando dados mockados).
     
     Args:
-        request: SimulationRequest com gp_name e num_simulations
+        request: SimulationRequest com gp_name, num_simulations, seed (opcional),
+            pit_strategy e time_budget_ms (opcional: com orçamento de tempo, roda
+            quantas iterações couberem, até num_simulations se informado;
+            sem orçamento, num_simulations padrão é 100)
     
     Returns:
-        Dict com estatísticas das simulações:
+        Dict com estatísticas das simulações (num_simulations = iterações concluídas):
         - win_probabilities: Dict {driver_name: probability}
         - podium_probabilities: Dict {driver_name: probability}
         - avg_positions: Dict {driver_name: avg_position}
@@ -72,36 +172,34 @@ async def simulate_race_monte_carlo(request: SimulationRequest):
     try:
         gp_name = request.gp_name
         num_simulations = request.num_simulations
+        seed = resolve_seed(request.seed)
         # Carrega dados dos pilotos
         drivers_df, _ = load_assets()
         
         # Converte para DriverSim
-        sim_drivers = convert_drivers_to_sim_drivers(drivers_df)
+        sim_drivers = convert_drivers_to_sim_drivers(drivers_df, seed=seed)
         
         # Número de voltas (padrão para F1: ~58 voltas, varia por pista)
         # Por enquanto, fixo em 58
         laps = 58
         
-        # Contadores para estatísticas
-        wins = {driver.name: 0 for driver in sim_drivers}
-        podiums = {driver.name: 0 for driver in sim_drivers}
-        positions_sum = {driver.name: 0.0 for driver in sim_drivers}
-        
-        # Executa simulações Monte Carlo
-        for _ in range(num_simulations):
-            results = simulate_race(sim_drivers, laps)
-            
-            # Contabiliza vitórias (P1 - primeiro na lista ordenada)
-            if results:
-                wins[results[0].driver_name] += 1
-            
-            # Contabiliza pódios (P1, P2, P3 - primeiros 3 na lista ordenada)
-            for i in range(min(3, len(results))):
-                podiums[results[i].driver_name] += 1
-            
-            # Soma posições para média (baseado na ordem na lista)
-            for position, result in enumerate(results, start=1):
-                positions_sum[result.driver_name] += position
+        # Executa simulações Monte Carlo (motor vetorizado, em shards)
+        if request.time_budget_ms is not None:
+            # Orçamento de tempo: quantas iterações couberem
+            stats, stop_reason, _ = run_in_rounds(
+                sim_drivers, laps, request.time_budget_ms / 1000.0, seed=seed,
+                max_iterations=num_simulations, pit_strategy=request.pit_strategy
+            )
+        else:
+            stats = run_monte_carlo(
+                sim_drivers, laps, DEFAULT_ITERATIONS if num_simulations is None else num_simulations, seed=seed,
+                pit_strategy=request.pit_strategy
+            )
+            stop_reason = STOP_COMPLETED
+        num_simulations = stats.iterations
+        wins = dict(zip(stats.driver_names, stats.wins.tolist()))
+        podiums = dict(zip(stats.driver_names, stats.podiums.tolist()))
+        positions_sum = dict(zip(stats.driver_names, stats.positions_sum.tolist()))
         
         # Calcula probabilidades
         win_probabilities = {
@@ -129,6 +227,10 @@ async def simulate_race_monte_carlo(request: SimulationRequest):
         return {
             "gp_name": gp_name,
             "num_simulations": num_simulations,
+            "time_budget_ms": request.time_budget_ms,
+            "stop_reason": stop_reason,
+            "seed": seed,
+            "pit_strategy": request.pit_strategy,
             "win_probabilities": win_probabilities,
             "podium_probabilities": podium_probabilities,
             "avg_positions": avg_positions,
@@ -139,35 +241,148 @@ async def simulate_race_monte_carlo(request: SimulationRequest):
         raise HTTPException(status_code=500, detail=f"Erro na simulação: {str(e)}")
 
 
-@router.post("/run/{year}/{gp}")
-async def run_monte_carlo_simulation(
+def _run_options(
+    iterations: Optional[int] = Query(
+        default=None, ge=1, le=10000,
+        description="Número de iterações Monte Carlo (padrão: 100; no modo adaptativo, o limite de iterações)"
+    ),
+    rain_probability: int = Query(default=0, ge=0, le=100, description="Probabilidade de chuva (0-100%)"),
+    seed: Optional[int] = Query(default=None, ge=0, description="Semente para resultados reprodutíveis"),
+    pit_strategy: Literal["reactive", "planned"] = Query(
+        default="reactive",
+        description="Pit stops decididos volta a volta (reactive) ou pelo plano ótimo pré-calculado (planned)"
+    ),
+    tolerance: Optional[float] = Query(
+        default=None, gt=0, le=0.5,
+        description="Modo adaptativo: simula até a meia-largura dos ICs de vitória/pódio do topo ficar abaixo deste valor (ex: 0.01)"
+    ),
+    confidence: float = Query(default=0.95, gt=0.5, lt=1, description="Nível de confiança dos intervalos"),
+    time_budget_ms: Optional[int] = Query(
+        default=None, ge=10, le=600000,
+        description="Orçamento de tempo (ms): roda quantas iterações couberem (até `iterations`, se informado)"
+    ),
+    use_cache: bool = Query(default=True, description="Reaproveita resultados de cenários idênticos"),
+    antithetic: bool = Query(
+        default=False,
+        description="Variáveis antitéticas: pares de corridas com sorteios espelhados (menos iterações para a mesma precisão)"
+    ),
+    stratified_weather: bool = Query(
+        default=False, description="Sorteio estratificado do clima (fração de corridas com chuva fiel à probabilidade)"
+    ),
+    weather_model: Literal["static", "markov"] = Query(
+        default="static",
+        description="Clima único na corrida (static) ou evoluindo volta a volta, com chuva no meio da prova e pit stops de crossover (markov)"
+    ),
+    fantasy: bool = Query(
+        default=False,
+        description="Inclui a distribuição da pontuação de Fantasy (média, percentis e histograma) por piloto e construtor"
+    ),
+    timings: bool = Query(
+        default=False, description="Inclui o bloco `timings` com a duração (ms) de cada fase da requisição"
+    ),
+    trace_format: Literal["full", "columnar", "packed"] = Query(
+        default="full",
+        description="Formato do race_trace: listas por piloto (full), arrays por campo (columnar) ou buffers base64 (packed)"
+    ),
+    store_positions: bool = Query(
+        default=False,
+        description="Guarda as posições finais de todas as corridas e devolve `run_id` para consultas em /runs/{run_id}"
+    ),
+    head_to_head: bool = Query(
+        default=False,
+        description="Inclui a matriz de confronto direto (quem termina à frente) e as disputas entre companheiros de equipe"
+    )
+) -> Dict:
+    """Parâmetros de query comuns a /run e /jobs/run (ver run_monte_carlo_simulation)."""
+    return {
+        "iterations": iterations,
+        "rain_probability": rain_probability,
+        "seed": seed,
+        "pit_strategy": pit_strategy,
+        "tolerance": tolerance,
+        "confidence": confidence,
+        "time_budget_ms": time_budget_ms,
+        "use_cache": use_cache,
+        "antithetic": antithetic,
+        "stratified_weather": stratified_weather,
+        "weather_model": weather_model,
+        "fantasy": fantasy,
+        "timings": timings,
+        "trace_format": trace_format,
+        "store_positions": store_positions,
+        "head_to_head": head_to_head
+    }
+
+
+def _build_predictions(drivers: List[DriverSim], stats: MonteCarloStats) -> List[Dict]:
+    """
+    Calcula probabilidades, posições médias e pontos médios por piloto.
+    
+    Returns:
+        Lista de predições ordenada por probabilidade de vitória (maior primeiro)
+    """
+    iterations = stats.iterations
+    wins = dict(zip(stats.driver_names, stats.wins.tolist()))
+    positions_sum = dict(zip(stats.driver_names, stats.positions_sum.tolist()))
+    points_sum = dict(zip(stats.driver_names, stats.points_sum.tolist()))
+    
+    predictions = []
+    for driver in drivers:
+        win_probability = wins[driver.name] / iterations
+        avg_position = positions_sum[driver.name] / iterations
+        average_fantasy_points = points_sum[driver.name] / iterations
+        
+        predictions.append({
+            "driver": driver.name,
+            "win_probability": round(win_probability, 4),
+            "avg_position": round(avg_position, 2),
+            "average_fantasy_points": round(average_fantasy_points, 2)
+        })
+    
+    # Ordena por probabilidade de vitória (maior primeiro)
+    predictions.sort(key=lambda x: x["win_probability"], reverse=True)
+    return predictions
+
+
+def execute_run(
     year: int,
     gp: str,
-    iterations: int = Query(default=100, ge=1, le=10000, description="Número de iterações Monte Carlo"),
-    rain_probability: int = Query(default=0, ge=0, le=100, description="Probabilidade de chuva (0-100%)")
-):
+    iterations: Optional[int] = None,
+    rain_probability: int = 0,
+    seed: Optional[int] = None,
+    pit_strategy: str = "reactive",
+    tolerance: Optional[float] = None,
+    confidence: float = 0.95,
+    time_budget_ms: Optional[int] = None,
+    use_cache: bool = True,
+    antithetic: bool = False,
+    stratified_weather: bool = False,
+    weather_model: str = "static",
+    fantasy: bool = False,
+    trace_format: str = TRACE_FULL,
+    store_positions: bool = False,
+    head_to_head: bool = False,
+    progress: Optional[Callable[[Dict], None]] = None
+) -> Dict:
     """
-    Executa simulação Monte Carlo usando dados reais do FastF1.
+    Executa a simulação Monte Carlo de /run (síncrona, fora do event loop).
     
     Args:
-        year: Ano da temporada (ex: 2024)
-        gp: Nome do Grande Prêmio (ex: 'Bahrain')
-        iterations: Número de iterações Monte Carlo (padrão: 100, máximo: 10000)
+        year, gp e demais parâmetros: ver run_monte_carlo_simulation
+        progress: Callback opcional chamado a cada rodada de iterações com um
+            agregado parcial {"iterations", "predictions", "precision"}; com ele,
+            o modo de iterações fixas também roda em rodadas (mesmo resultado)
     
     Returns:
-        JSON com predições:
-        {
-            "track": "Bahrain",
-            "iterations": 100,
-            "predictions": [
-                {"driver": "VER", "win_probability": 0.85, "avg_position": 1.2},
-                {"driver": "HAM", "win_probability": 0.10, "avg_position": 3.4}
-            ]
-        }
+        Dict da resposta de /run
+    
+    Raises:
+        HTTPException: Erros de carregamento de dados (status original) ou 500
     """
     try:
-        # Obtém parâmetros de corrida a partir de dados reais
-        drivers = get_race_parameters(year, gp)
+        # Obtém parâmetros de corrida a partir de dados reais (memorizados por ano/GP)
+        with phase(PHASE_PARAMETERS):
+            drivers = load_race_parameters(year, gp)
         
         # Obtém número de voltas da pista (usando um valor padrão por enquanto)
         # Futuramente pode ser extraído da sessão
@@ -176,97 +391,603 @@ async def run_monte_carlo_simulation(
         # Converte rain_probability de 0-100 para 0.0-1.0
         weather_prob = rain_probability / 100.0
         
-        # Contadores para estatísticas
-        wins = {driver.name: 0 for driver in drivers}
-        positions_sum = {driver.name: 0.0 for driver in drivers}
-        points_sum = {driver.name: 0.0 for driver in drivers}
-        weather_conditions_count = {}
+        # Cache de resultados endereçado pelo conteúdo do cenário
+        cache = get_result_cache() if use_cache else None
+        cache_key = make_cache_key(
+            drivers, total_laps, weather_prob, iterations, seed,
+            pit_strategy=pit_strategy, tolerance=tolerance, confidence=confidence,
+            time_budget_ms=time_budget_ms, track=gp,
+            antithetic=antithetic, stratified_weather=stratified_weather, weather_model=weather_model,
+            fantasy=fantasy, trace_format=trace_format, store_positions=store_positions,
+            head_to_head=head_to_head
+        )
+        if cache is not None:
+            cached, tier = cache.get(cache_key)
+            # Uma resposta com run_id só vale enquanto a matriz continuar armazenada
+            if cached is not None and (not store_positions or get_run_store().exists(cached.get("run_id", ""))):
+                return {**cached, "cache": tier}
+        
+        seed = resolve_seed(seed)
         
-        # Armazena a "iteração mais representativa" (onde o vencedor foi o mais provável)
-        most_likely_winner = None
-        representative_iteration = None
-        max_win_prob = 0.0
+        time_budget = time_budget_ms / 1000.0 if time_budget_ms is not None else None
+        variance_reduction = VarianceReduction(antithetic=antithetic, stratified_weather=stratified_weather)
         
-        # Loop de Monte Carlo
-        for iteration in range(iterations):
-            results, weather_condition = simulate_race(drivers, total_laps, weather_prob)
+        # Publica agregados parciais a cada rodada (jobs)
+        on_round = None
+        if progress is not None:
+            def on_round(partial_stats: MonteCarloStats) -> None:
+                progress({
+                    "iterations": partial_stats.iterations,
+                    "predictions": _build_predictions(drivers, partial_stats),
+                    "precision": measure_precision(partial_stats, confidence, tolerance).to_dict()
+                })
+        
+        with phase(PHASE_SIMULATION):
+            # Monte Carlo: shards do motor vetorizado no pool de processos
+            if tolerance is not None:
+                # Modo adaptativo: rodadas até atingir a precisão pedida
+                stats, precision = run_until_precise(
+                    drivers, total_laps, tolerance, weather_prob, seed=seed, confidence=confidence,
+                    max_iterations=iterations, time_budget=time_budget, pit_strategy=pit_strategy,
+                    on_round=on_round, variance_reduction=variance_reduction, weather_model=weather_model,
+                    fantasy=fantasy, record_positions=store_positions,
+                    head_to_head=head_to_head
+                )
+            elif time_budget is not None or on_round is not None:
+                # Orçamento de tempo (quantas iterações couberem) ou progresso por rodada;
+                # sem orçamento, as rodadas cobrem exatamente as iterações pedidas
+                fixed = time_budget is None
+                stats, stop_reason, rounds = run_in_rounds(
+                    drivers, total_laps, time_budget, weather_prob, seed=seed,
+                    max_iterations=(iterations or DEFAULT_ITERATIONS) if fixed else iterations,
+                    pit_strategy=pit_strategy, on_round=on_round, variance_reduction=variance_reduction,
+                    weather_model=weather_model, fantasy=fantasy, record_positions=store_positions,
+                    head_to_head=head_to_head
+                )
+                if fixed:
+                    stop_reason = STOP_FIXED
+                precision = measure_precision(stats, confidence, stop_reason=stop_reason, rounds=rounds)
+            else:
+                stats = run_monte_carlo(
+                    drivers, total_laps, iterations or DEFAULT_ITERATIONS, weather_prob,
+                    seed=seed, pit_strategy=pit_strategy, variance_reduction=variance_reduction,
+                    weather_model=weather_model, fantasy=fantasy, record_positions=store_positions,
+                    head_to_head=head_to_head
+                )
+                precision = measure_precision(stats, confidence)
+        
+        # Race Trace, predições e resumo da resposta
+        with phase(PHASE_AGGREGATION):
+            # Armazena uma iteração "representativa" (vencida pelo piloto mais provável)
+            most_likely_winner = stats.driver_names[int(stats.wins.argmax())]
+            representative_iteration = _find_representative_race(
+                drivers, total_laps, weather_prob, most_likely_winner, seed, pit_strategy, weather_model
+            )
             
-            # Conta condições climáticas (para determinar a mais frequente)
-            weather_key = weather_condition.value
-            weather_conditions_count[weather_key] = weather_conditions_count.get(weather_key, 0) + 1
+            # Calcula probabilidades, posições médias e pontos médios
+            predictions = _build_predictions(drivers, stats)
             
-            # Guarda o vencedor (primeiro na lista ordenada)
-            if results:
-                winner_name = results[0].driver_name
-                wins[winner_name] += 1
-                
-                # Calcula probabilidade de vitória temporária
-                temp_win_prob = wins[winner_name] / (iteration + 1)
-                
-                # Armazena a iteração mais representativa (maior probabilidade de vitória até agora)
-                if temp_win_prob > max_win_prob:
-                    max_win_prob = temp_win_prob
-                    most_likely_winner = winner_name
-                    representative_iteration = results
+            # Determina a condição climática mais frequente
+            weather_conditions_count = stats.weather_counts
+            most_common_weather = max(weather_conditions_count.items(), key=lambda x: x[1])[0] if weather_conditions_count else "DRY"
             
-            # Soma posições e pontos para média
-            for result in results:
-                positions_sum[result.driver_name] += result.position
-                points_sum[result.driver_name] += float(result.fantasy_points)
-        
-        # Calcula probabilidades, posições médias e pontos médios
-        predictions = []
-        for driver in drivers:
-            win_probability = wins[driver.name] / iterations
-            avg_position = positions_sum[driver.name] / iterations
-            average_fantasy_points = points_sum[driver.name] / iterations
+            # Prepara dados do Race Trace (da iteração mais representativa)
+            race_trace_data = None
+            if representative_iteration:
+                race_trace_data = build_race_trace(representative_iteration, total_laps, trace_format)
+            
+            response_data = {
+                "track": gp,
+                "iterations": stats.iterations,
+                "time_budget_ms": time_budget_ms,
+                "seed": seed,
+                "pit_strategy": pit_strategy,
+                "variance_reduction": {"antithetic": antithetic, "stratified_weather": stratified_weather},
+                "weather_model": weather_model,
+                "weather_condition": most_common_weather,
+                "predictions": predictions,
+                "precision": precision.to_dict()
+            }
+            
+            # Distribuição da pontuação de Fantasy (pilotos e construtores)
+            if stats.fantasy is not None:
+                response_data["fantasy"] = summarize_fantasy(stats.fantasy)
             
-            predictions.append({
-                "driver": driver.name,
-                "win_probability": round(win_probability, 4),
-                "avg_position": round(avg_position, 2),
-                "average_fantasy_points": round(average_fantasy_points, 2)
-            })
+            # Confronto direto e disputas entre companheiros de equipe
+            if stats.ahead_counts is not None:
+                response_data["head_to_head"] = summarize_head_to_head(
+                    stats.driver_names, stats.ahead_counts, stats.iterations, [d.team for d in drivers]
+                )
+            
+            # Adiciona race_trace se disponível
+            if race_trace_data:
+                response_data["race_trace"] = race_trace_data
         
-        # Ordena por probabilidade de vitória (maior primeiro)
-        predictions.sort(key=lambda x: x["win_probability"], reverse=True)
+        with phase(PHASE_SERIALIZATION):
+            # Matriz de posições finais para as consultas de /runs/{run_id}
+            if store_positions:
+                response_data["run_id"] = get_run_store().save(
+                    stats.finishing_positions, stats.driver_names,
+                    {
+                        "track": gp,
+                        "year": year,
+                        "seed": seed,
+                        "rain_probability": rain_probability,
+                        "pit_strategy": pit_strategy,
+                        "weather_model": weather_model
+                    }
+                )
+            if cache is not None:
+                cache.put(cache_key, response_data)
+        
+        return {**response_data, "cache": CACHE_MISS}
+    
+    except HTTPException:
+        # Re-raise HTTP exceptions (já têm status code apropriado)
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao executar simulação Monte Carlo: {str(e)}"
+        )
+
+
+def execute_timed_run(
+    year: int,
+    gp: str,
+    timer: PhaseTimer,
+    timings: bool = False,
+    observe: bool = False,
+    **options
+) -> Dict:
+    """
+    Executa execute_run com `timer` ativo, medindo as fases da requisição.
+    
+    Args:
+        year, gp, **options: ver execute_run
+        timer: Timer que recebe as durações das fases
+        timings: Adiciona o bloco "timings" (ms por fase) à resposta
+        observe: Registra as fases nos histogramas do processo ao terminar
+            (quem serializa a resposta depois registra por conta própria)
+    
+    Returns:
+        Dict da resposta de /run
+    """
+    try:
+        with activate(timer):
+            result = execute_run(year, gp, **options)
+    finally:
+        if observe:
+            get_phase_histograms().observe_timer(timer)
+    if timings:
+        result = {**result, "timings": timer.to_dict()}
+    return result
+
+
+@router.post("/run/{year}/{gp}")
+async def run_monte_carlo_simulation(year: int, gp: str, options: Dict = Depends(_run_options)):
+    """
+    Executa simulação Monte Carlo usando dados reais do FastF1.
+    
+    O processamento roda em uma thread do pool do servidor (e os shards no pool
+    de processos), sem bloquear o event loop.
+    
+    Args:
+        year: Ano da temporada (ex: 2024)
+        gp: Nome do Grande Prêmio (ex: 'Bahrain')
+        iterations: Número de iterações Monte Carlo (padrão: 100, máximo: 10000).
+            No modo adaptativo é o limite de iterações (padrão: settings.SIMULATION_MAX_ITERATIONS)
+        seed: Semente opcional; a mesma semente reproduz o mesmo resultado
+        pit_strategy: "reactive" (padrão) ou "planned"
+        tolerance: Se informado, ativa o modo adaptativo (para ao atingir a
+            tolerância, o limite de iterações ou settings.SIMULATION_ADAPTIVE_TIME_BUDGET)
+        confidence: Nível de confiança dos intervalos reportados em "precision"
+        time_budget_ms: Orçamento de tempo da simulação em milissegundos. Sem
+            tolerance, roda quantas iterações couberem (até `iterations` ou
+            settings.SIMULATION_MAX_ITERATIONS); com tolerance, substitui
+            settings.SIMULATION_ADAPTIVE_TIME_BUDGET
+        use_cache: Consulta/grava o cache de resultados. A chave inclui os
+            parâmetros dos pilotos e todos os parâmetros acima; sem semente,
+            qualquer resultado anterior sem semente do mesmo cenário é reaproveitado
+        antithetic: Variáveis antitéticas nos sorteios (ruído das voltas, pneus,
+            clima). Os intervalos e o modo adaptativo usam o tamanho efetivo da
+            amostra, reportado em precision.effective_sample_size
+        stratified_weather: Sorteio estratificado do clima
+        weather_model: "static" (padrão: uma condição por corrida) ou "markov"
+            (condição por volta via cadeia de Markov; weather_condition passa a
+            ser a condição predominante das corridas)
+        fantasy: Inclui "fantasy" com média, percentis e histograma da
+            pontuação de Fantasy de cada piloto e construtor (regras de app/core;
+            grid estimado pelo ritmo, sem abandonos simulados)
+        timings: Inclui "timings" com a duração (ms) de cada fase: session_load
+            (FastF1), parameters, simulation, aggregation e serialization (só a
+            gravação no cache; a serialização da própria resposta aparece apenas
+            no cabeçalho Server-Timing, enviado sempre)
+        trace_format: Formato do race_trace (ver app/simulation/trace.py):
+            "full" (padrão, listas por piloto), "columnar" (intervalo para o
+            líder em float32 e posições em uint8, pilotos × voltas) ou "packed"
+            (os mesmos arrays em base64, posições codificadas por diferença)
+        store_positions: Guarda a posição final de cada piloto em cada corrida
+            (uint8, iterações × pilotos) e inclui "run_id" na resposta, para
+            consultas de confronto direto, histograma de posições e top-N em
+            /runs/{run_id} sem nova simulação
+        head_to_head: Inclui "head_to_head" com a probabilidade de cada piloto
+            terminar à frente de cada outro (contada no mesmo passo da
+            simulação) e as disputas entre companheiros de equipe
+    
+    Returns:
+        JSON com predições:
+        {
+            "track": "Bahrain",
+            "iterations": 100,
+            "seed": 123,
+            "pit_strategy": "reactive",
+            "predictions": [
+                {"driver": "VER", "win_probability": 0.85, "avg_position": 1.2},
+                {"driver": "HAM", "win_probability": 0.10, "avg_position": 3.4}
+            ],
+            "precision": {"confidence": 0.95, "max_half_width": 0.031, "converged": false,
+                          "effective_sample_size": 100, ...},
+            "cache": "miss"
+        }
+    """
+    timer = PhaseTimer()
+    try:
+        result = await run_in_threadpool(execute_timed_run, year, gp, timer, **options)
+        with timer.phase(PHASE_SERIALIZATION):
+            response = JSONResponse(content=result)
+    finally:
+        get_phase_histograms().observe_timer(timer)
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
+
+
+def execute_sweep(
+    year: int,
+    gp: str,
+    rain_probabilities: List[int],
+    pit_stop_losses: Optional[List[float]] = None,
+    laps: Optional[List[int]] = None,
+    iterations: int = DEFAULT_SWEEP_ITERATIONS,
+    seed: Optional[int] = None,
+    pit_strategy: str = "reactive",
+    use_cache: bool = True
+) -> Dict:
+    """
+    Executa a varredura de /sweep (síncrona, fora do event loop).
+    
+    Args:
+        year, gp e demais parâmetros: ver run_scenario_sweep
+    
+    Returns:
+        Dict da resposta de /sweep
+    
+    Raises:
+        HTTPException: 422 se a grade tiver cenários demais ou que a
+            estratégia planejada não cobre; erros de carregamento de dados
+            (status original) ou 500
+    """
+    scenarios = [
+        SweepScenario(rain_probability / 100.0, total_laps, pit_stop_loss)
+        for rain_probability in rain_probabilities
+        for pit_stop_loss in (pit_stop_losses or [None])
+        for total_laps in (laps or [DEFAULT_TOTAL_LAPS])
+    ]
+    if len(scenarios) > MAX_SWEEP_SCENARIOS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"A varredura tem {len(scenarios)} cenários (máximo: {MAX_SWEEP_SCENARIOS})"
+        )
+    
+    try:
+        drivers = load_race_parameters(year, gp)
         
-        # Determina a condição climática mais frequente
-        most_common_weather = max(weather_conditions_count.items(), key=lambda x: x[1])[0] if weather_conditions_count else "DRY"
+        cache = get_result_cache() if use_cache else None
+        cache_key = make_cache_key(
+            drivers, None, None, iterations, seed, pit_strategy=pit_strategy, track=gp,
+            sweep=[[s.weather_prob, s.total_laps, s.pit_stop_loss] for s in scenarios]
+        )
+        if cache is not None:
+            cached, tier = cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "cache": tier}
         
-        # Prepara dados do Race Trace (da iteração mais representativa)
-        race_trace_data = None
-        if representative_iteration:
-            lap_data = []
-            for result in representative_iteration:
-                lap_data.append({
-                    'driver': result.driver_name,
-                    'lap_history': result.lap_history,
-                    'position_history': result.position_history
-                })
-            race_trace_data = {
-                'lap_data': lap_data,
-                'total_laps': total_laps
-            }
+        seed = resolve_seed(seed)
+        
+        # Todos os cenários sobre os mesmos sorteios (números aleatórios comuns)
+        try:
+            results = run_sweep(drivers, scenarios, iterations, seed=seed, pit_strategy=pit_strategy)
+        except ValueError as e:
+            # Cenário que a estratégia planejada não cobre (ex: poucas voltas)
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        def matrix(counts: List[np.ndarray], digits: int) -> List[List[float]]:
+            return [np.round(row / iterations, digits).tolist() for row in counts]
         
         response_data = {
             "track": gp,
             "iterations": iterations,
-            "weather_condition": most_common_weather,
-            "predictions": predictions
+            "seed": seed,
+            "pit_strategy": pit_strategy,
+            "drivers": [d.name for d in drivers],
+            "scenarios": [
+                {
+                    "rain_probability": round(scenario.weather_prob * 100),
+                    "total_laps": scenario.total_laps,
+                    "pit_stop_loss": scenario.pit_stop_loss,
+                    "weather_counts": stats.weather_counts
+                }
+                for scenario, stats in zip(scenarios, results)
+            ],
+            "win_probability": matrix([stats.wins for stats in results], 4),
+            "podium_probability": matrix([stats.podiums for stats in results], 4),
+            "avg_position": matrix([stats.positions_sum for stats in results], 2),
+            "average_fantasy_points": matrix([stats.points_sum for stats in results], 2)
         }
         
-        # Adiciona race_trace se disponível
-        if race_trace_data:
-            response_data["race_trace"] = race_trace_data
+        if cache is not None:
+            cache.put(cache_key, response_data)
         
-        return response_data
+        return {**response_data, "cache": CACHE_MISS}
     
     except HTTPException:
-        # Re-raise HTTP exceptions (já têm status code apropriado)
         raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Erro ao executar simulação Monte Carlo: {str(e)}"
+            detail=f"Erro ao executar varredura de cenários: {str(e)}"
         )
+
+
+@router.post("/sweep/{year}/{gp}")
+async def run_scenario_sweep(
+    year: int,
+    gp: str,
+    rain_probabilities: List[int] = Query(
+        default=DEFAULT_SWEEP_RAIN_PROBABILITIES,
+        description="Probabilidades de chuva (0-100%) da grade; repita o parâmetro para cada valor"
+    ),
+    pit_stop_losses: Optional[List[float]] = Query(
+        default=None, description="Tempos de pit stop (s) da grade (padrão: o de cada piloto)"
+    ),
+    laps: Optional[List[int]] = Query(default=None, description="Números de voltas da grade (padrão: 58)"),
+    iterations: int = Query(default=DEFAULT_SWEEP_ITERATIONS, ge=1, le=10000, description="Corridas por cenário"),
+    seed: Optional[int] = Query(default=None, ge=0, description="Semente para resultados reprodutíveis"),
+    pit_strategy: Literal["reactive", "planned"] = Query(default="reactive"),
+    use_cache: bool = Query(default=True, description="Reaproveita resultados de varreduras idênticas")
+):
+    """
+    Simula uma grade de cenários (chuva × pit stop × voltas) em uma passada.
+    
+    Os cenários são o produto cartesiano das grades e usam números aleatórios
+    comuns: a mesma corrida i de cada cenário recebe os mesmos sorteios
+    (clima, pneu de largada, variação das voltas). As diferenças entre
+    cenários refletem só a mudança de parâmetro, e os sorteios são feitos uma
+    vez para toda a grade.
+    
+    Args:
+        year: Ano da temporada (ex: 2024)
+        gp: Nome do Grande Prêmio (ex: 'Bahrain')
+        rain_probabilities: Probabilidades de chuva (0-100%), padrão 0, 10, ..., 100
+        pit_stop_losses: Tempos de pit stop em segundos (opcional)
+        laps: Números de voltas (opcional)
+        iterations: Corridas por cenário (padrão: 1000)
+        seed: Semente opcional
+        pit_strategy: "reactive" (padrão) ou "planned"
+        use_cache: Consulta/grava o cache de resultados
+    
+    Returns:
+        JSON com matrizes [cenário][piloto] (pilotos na ordem de "drivers"):
+        {
+            "drivers": ["VER", "HAM", ...],
+            "scenarios": [{"rain_probability": 0, "total_laps": 58, "pit_stop_loss": null,
+                           "weather_counts": {"DRY": 1000}}, ...],
+            "win_probability": [[0.85, 0.10, ...], ...],
+            "podium_probability": [[...], ...],
+            "avg_position": [[...], ...],
+            "average_fantasy_points": [[...], ...],
+            "cache": "miss"
+        }
+    """
+    for rain_probability in rain_probabilities:
+        if not 0 <= rain_probability <= 100:
+            raise HTTPException(status_code=422, detail="rain_probabilities deve estar entre 0 e 100")
+    if laps and min(laps) < 1:
+        raise HTTPException(status_code=422, detail="laps deve ser positivo")
+    if pit_stop_losses and min(pit_stop_losses) < 0:
+        raise HTTPException(status_code=422, detail="pit_stop_losses não pode ser negativo")
+    
+    return await run_in_threadpool(
+        execute_sweep, year, gp, rain_probabilities, pit_stop_losses, laps,
+        iterations, seed, pit_strategy, use_cache
+    )
+
+
+@router.post("/jobs/run/{year}/{gp}", status_code=202)
+async def submit_simulation_job(year: int, gp: str, options: Dict = Depends(_run_options)):
+    """
+    Enfileira uma simulação de /run como job em segundo plano.
+    
+    Aceita os mesmos parâmetros de /run. Acompanhe por GET /jobs/{job_id}
+    (consulta) ou GET /jobs/{job_id}/events (Server-Sent Events com os
+    agregados parciais de cada rodada de iterações).
+    
+    Returns:
+        {"job_id": "...", "status": "queued"}
+    
+    Raises:
+        HTTPException 429: Limite de jobs na fila ou em execução atingido
+    """
+    try:
+        job = get_job_manager().submit(execute_timed_run, year, gp, PhaseTimer(), observe=True, **options)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"{e}; tente novamente mais tarde")
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_simulation_metrics():
+    """
+    Histogramas da duração das fases de /run e /jobs/run neste processo.
+    
+    Formato de texto do Prometheus (métrica simulation_phase_seconds, rótulo
+    `phase`), para coleta periódica.
+    """
+    return PlainTextResponse(
+        get_phase_histograms().render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+def _get_job_or_404(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado (ou expirado)")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_simulation_job(job_id: str):
+    """
+    Estado de um job de simulação.
+    
+    Returns:
+        {"job_id", "status" (queued/running/done/failed), "progress" (último
+        agregado parcial), "result" (resposta de /run quando done), "error"}
+    """
+    return _get_job_or_404(job_id).to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_simulation_job(job_id: str):
+    """
+    Acompanha um job por Server-Sent Events.
+    
+    Emite um evento `progress` a cada agregado parcial e termina com `done`
+    (resultado completo) ou `failed` (erro).
+    """
+    job = _get_job_or_404(job_id)
+    
+    async def events():
+        version = -1
+        while True:
+            if job.version != version:
+                version = job.version
+                if job.status == JOB_DONE:
+                    yield f"event: done\ndata: {json.dumps(job.result)}\n\n"
+                    return
+                if job.status == JOB_FAILED:
+                    yield f"event: failed\ndata: {json.dumps(job.error)}\n\n"
+                    return
+                if job.progress is not None:
+                    yield f"event: progress\ndata: {json.dumps(job.progress)}\n\n"
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _get_run_or_404(run_id: str) -> StoredRun:
+    try:
+        return get_run_store().load(run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Execução {run_id} não encontrada (ou removida)")
+
+
+def _run_columns(run: StoredRun, drivers: Optional[List[str]]) -> List[int]:
+    try:
+        return run.columns(drivers)
+    except KeyError as e:
+        raise HTTPException(status_code=422, detail=str(e.args[0]))
+
+
+@router.get("/runs/{run_id}")
+async def get_stored_run(run_id: str):
+    """
+    Metadados de uma execução armazenada (/run com store_positions).
+    
+    Returns:
+        {"run_id", "drivers", "iterations", "metadata"}
+    """
+    run = _get_run_or_404(run_id)
+    return {
+        "run_id": run.run_id,
+        "drivers": run.driver_names,
+        "iterations": int(run.positions.shape[0]),
+        "metadata": run.metadata
+    }
+
+
+@router.get("/runs/{run_id}/head_to_head")
+async def get_run_head_to_head(
+    run_id: str,
+    drivers: Optional[List[str]] = Query(default=None, description="Pilotos da matriz (padrão: todos)")
+):
+    """
+    Confronto direto entre pilotos a partir das corridas armazenadas.
+    
+    Returns:
+        {"drivers": [...], "matrix": [[...], ...]}, onde matrix[a][b] é a
+        probabilidade de drivers[a] terminar à frente de drivers[b]
+    """
+    run = _get_run_or_404(run_id)
+    columns = _run_columns(run, drivers)
+    matrix = head_to_head_matrix(run.positions, columns)
+    return {
+        "drivers": [run.driver_names[c] for c in columns],
+        "matrix": np.round(matrix, 4).tolist()
+    }
+
+
+@router.get("/runs/{run_id}/positions")
+async def get_run_positions(
+    run_id: str,
+    drivers: Optional[List[str]] = Query(default=None, description="Pilotos consultados (padrão: todos)")
+):
+    """
+    Distribuição da posição final de cada piloto.
+    
+    Returns:
+        {"iterations": n, "drivers": [{"driver", "counts": [P1, P2, ...],
+        "probabilities": [...]}, ...]}
+    """
+    run = _get_run_or_404(run_id)
+    columns = _run_columns(run, drivers)
+    counts = position_counts(run.positions)
+    iterations = int(run.positions.shape[0])
+    return {
+        "iterations": iterations,
+        "drivers": [
+            {
+                "driver": run.driver_names[c],
+                "counts": counts[c].tolist(),
+                "probabilities": np.round(counts[c] / max(iterations, 1), 4).tolist()
+            }
+            for c in columns
+        ]
+    }
+
+
+@router.get("/runs/{run_id}/top")
+async def get_run_top_n(
+    run_id: str,
+    n: int = Query(default=3, ge=1, description="Posições consideradas (ex: 3 = pódio, 10 = pontos)"),
+    drivers: Optional[List[str]] = Query(
+        default=None, description="Pilotos consultados; com dois ou mais, inclui a probabilidade conjunta"
+    )
+):
+    """
+    Probabilidade de terminar entre os `n` primeiros.
+    
+    Returns:
+        {"n", "probabilities": {piloto: p}, "all_of": p (todos os pilotos
+        pedidos no top-N na mesma corrida; só com dois ou mais pilotos)}
+    """
+    run = _get_run_or_404(run_id)
+    columns = _run_columns(run, drivers)
+    probabilities = top_n_probabilities(run.positions, n)
+    result = {
+        "n": n,
+        "probabilities": {run.driver_names[c]: round(float(probabilities[c]), 4) for c in columns}
+    }
+    if drivers is not None and len(columns) > 1:
+        result["all_of"] = round(joint_top_n_probability(run.positions, n, columns), 4)
+    return result
@@ -11,5 +11,27 @@ class Settings:
     
     # FastF1 Cache
     CACHE_DIR = os.path.join(DATA_DIR, "external", "fastf1_cache")
+    
+    # Simulação Monte Carlo (shards executados em um pool de processos)
+    SIMULATION_WORKERS: int = int(os.getenv("SIMULATION_WORKERS", os.cpu_count() or 1))
+    SIMULATION_MIN_SHARD_SIZE: int = int(os.getenv("SIMULATION_MIN_SHARD_SIZE", 1000))
+    
+    # Modo adaptativo: limites de iterações e de tempo (segundos) por requisição
+    SIMULATION_MAX_ITERATIONS: int = int(os.getenv("SIMULATION_MAX_ITERATIONS", 100000))
+    SIMULATION_ADAPTIVE_TIME_BUDGET: float = float(os.getenv("SIMULATION_ADAPTIVE_TIME_BUDGET", 10.0))
+    
+    # Cache de resultados de simulação (memória LRU + disco com limite de tamanho)
+    SIMULATION_CACHE_DIR: str = os.getenv("SIMULATION_CACHE_DIR", os.path.join(BASE_DIR, "cache", "simulation_results"))
+    SIMULATION_CACHE_MEMORY_ENTRIES: int = int(os.getenv("SIMULATION_CACHE_MEMORY_ENTRIES", 128))
+    SIMULATION_CACHE_DISK_BYTES: int = int(os.getenv("SIMULATION_CACHE_DISK_BYTES", 256 * 1024 * 1024))
+    
+    # Matrizes de posições finais das execuções (consultas de confronto direto e top-N)
+    SIMULATION_RUNS_DIR: str = os.getenv("SIMULATION_RUNS_DIR", os.path.join(BASE_DIR, "cache", "simulation_runs"))
+    SIMULATION_RUNS_DISK_BYTES: int = int(os.getenv("SIMULATION_RUNS_DISK_BYTES", 512 * 1024 * 1024))
+    
+    # Jobs de simulação em segundo plano (threads que coordenam o pool de processos)
+    SIMULATION_JOB_WORKERS: int = int(os.getenv("SIMULATION_JOB_WORKERS", 4))
+    SIMULATION_JOB_TTL: float = float(os.getenv("SIMULATION_JOB_TTL", 3600))
+    SIMULATION_MAX_JOBS: int = int(os.getenv("SIMULATION_MAX_JOBS", 256))
 
 settings = Settings()
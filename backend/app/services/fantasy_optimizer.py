@@ -1,10 +1,65 @@
 """
 Serviço de otimização para encontrar o melhor time de Fantasy F1 usando f1_prices.json.
+
+O time ótimo (5 pilotos + 2 construtores dentro do orçamento, no máximo 3
+pilotos da mesma equipe) é encontrado por branch-and-bound exato: os pares de
+construtores são visitados pelo maior limite superior de pontos, e a escolha
+dos pilotos é uma busca em profundidade sobre os pilotos ordenados por pontos,
+podada quando nem os melhores pilotos que ainda cabem no orçamento superam o
+melhor time já encontrado. O resultado é o mesmo da enumeração completa (com o
+mesmo desempate) em milissegundos, e cresce bem com pilotos reservas no grid.
+
+Para os k melhores times, a busca mantém um heap mínimo limitado a k times e
+poda pelo k-ésimo melhor, então pedir 50 times custa quase o mesmo que pedir um.
+
+Consultas com vários orçamentos (simulações "e se", lotes) usam uma tabela
+indexada por orçamento (LineupTable): a melhor escalação válida de 5 pilotos
+para cada nível de orçamento em décimos de milhão, montada uma vez por versão
+de preços e projeções. Cada orçamento vira uma busca na tabela por par de
+construtores. Montar a tabela enumera todas as combinações de 5 pilotos, então
+ela só é usada até LINEUP_TABLE_MAX_COMBINATIONS combinações; acima disso (e
+para um orçamento só) cada orçamento é resolvido pelo branch-and-bound.
+
+Preços e orçamento são comparados em décimos de milhão (a resolução dos preços
+do Fantasy), arredondando preços para cima e o orçamento para baixo, então a
+tabela e o branch-and-bound aceitam exatamente os mesmos times.
 """
+import hashlib
+import heapq
 import itertools
 import json
+import math
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Composição do time
+TEAM_DRIVERS = 5
+TEAM_CONSTRUCTORS = 2
+MAX_DRIVERS_PER_TEAM = 3
+
+# Folga relativa nas podas: os limites somam preços e pontos em outra ordem que
+# a avaliação final, então diferenças de arredondamento não podem podar um time
+# que a avaliação exata aceitaria
+_TOLERANCE = 1e-9
+
+# Níveis de orçamento por milhão (resolução de 0.1M)
+BUDGET_UNITS_PER_MILLION = 10
+
+# Combinações de pilotos avaliadas por bloco ao montar a tabela
+LINEUP_CHUNK = 65536
+
+# Tabelas mantidas em memória (uma por versão de preços e projeções)
+LINEUP_TABLE_CACHE_SIZE = 8
+
+# Máximo de combinações de 5 pilotos para montar a tabela (C(30, 5) = 142.506);
+# em grids maiores, o branch-and-bound por orçamento é mais rápido
+LINEUP_TABLE_MAX_COMBINATIONS = 150_000
+
+NO_VALID_TEAM = "Não foi possível encontrar um time válido com o orçamento disponível"
 
 
 def load_prices_data() -> List[Dict]:
@@ -19,23 +74,464 @@ def load_prices_data() -> List[Dict]:
         return json.load(f)
 
 
-def find_best_team(budget: float = 100.0, custom_points_projections: Dict[str, float] = None) -> Dict:
+def _tolerance(value: float) -> float:
+    return _TOLERANCE * max(1.0, abs(value))
+
+
+def _price_units(price: float) -> int:
+    """Preço em décimos de milhão, arredondado para cima."""
+    # round() descarta o ruído de ponto flutuante (47.7 * 10 = 476.99999...)
+    return int(math.ceil(round(price * BUDGET_UNITS_PER_MILLION, 6)))
+
+
+def _budget_units(budget: float) -> int:
+    """Orçamento em décimos de milhão, arredondado para baixo."""
+    return int(math.floor(round(budget * BUDGET_UNITS_PER_MILLION, 6)))
+
+
+def _evaluate_team(
+    driver_items: List[Dict],
+    constructor_items: List[Dict],
+    budget: float
+) -> Optional[Tuple[float, float]]:
+    """
+    Pontos e custo de um time, somados na ordem dos itens (como a enumeração completa).
+
+    Returns:
+        Tupla (total de pontos, custo total) ou None se passar do orçamento
+    """
+    cost_units = sum(_price_units(item["price"]) for item in constructor_items + driver_items)
+    if cost_units > _budget_units(budget):
+        return None
+    constructor_cost = sum(item["price"] for item in constructor_items)
+    total_cost = constructor_cost + sum(item["price"] for item in driver_items)
+    driver_points = sum(item["expected_points"] for item in driver_items)
+    constructor_points = sum(item["expected_points"] for item in constructor_items)
+    return driver_points + constructor_points, total_cost
+
+
+def solve_top_teams(drivers: List[Dict], constructors: List[Dict], budget: float, top_k: int = 1) -> List[Dict]:
+    """
+    Os `top_k` melhores times por branch-and-bound exato.
+    
+    Entre times com a mesma pontuação, vem antes o primeiro na ordem da
+    enumeração completa (par de construtores e depois combinação de pilotos,
+    na ordem das listas), o mesmo que a busca exaustiva devolveria.
+    
+    Args:
+        drivers: Pilotos ({"id", "price", "team", "expected_points"})
+        constructors: Construtores ({"id", "price", "expected_points"})
+        budget: Orçamento disponível
+        top_k: Número de times
+    
+    Returns:
+        Times do melhor para o pior (ver find_best_team), cada um com
+        "gap_to_best" (pontos a menos que o ótimo); vazia se nenhum time
+        couber no orçamento
+    """
+    if top_k < 1:
+        raise ValueError("top_k deve ser pelo menos 1")
+    
+    # Ordem de busca: mais pontos primeiro (o primeiro piloto que cabe é o melhor)
+    order = sorted(range(len(drivers)), key=lambda i: (-drivers[i]["expected_points"], i))
+    points = [drivers[i]["expected_points"] for i in order]
+    prices = [drivers[i]["price"] for i in order]
+    teams = [drivers[i]["team"] for i in order]
+    num_drivers = len(order)
+    
+    # cheapest[k][m]: soma dos m menores preços entre order[k:] (inviabilidade rápida)
+    cheapest = []
+    for k in range(num_drivers + 1):
+        suffix = sorted(prices[k:])
+        cheapest.append([sum(suffix[:m]) if m <= len(suffix) else float("inf") for m in range(TEAM_DRIVERS + 1)])
+    
+    def top_points(start: int, count: int, limit: float) -> Optional[float]:
+        """Limite superior: soma dos `count` pilotos com mais pontos em order[start:] com preço <= limit."""
+        total, taken = 0.0, 0
+        for k in range(start, num_drivers):
+            if prices[k] <= limit:
+                total += points[k]
+                taken += 1
+                if taken == count:
+                    return total
+        return None
+    
+    # Pares de construtores, do maior limite superior para o menor
+    pairs = []
+    for pair in itertools.combinations(range(len(constructors)), TEAM_CONSTRUCTORS):
+        pair_items = [constructors[c] for c in pair]
+        pair_cost = sum(item["price"] for item in pair_items)
+        if sum(_price_units(item["price"]) for item in pair_items) > _budget_units(budget):
+            continue
+        pair_points = sum(item["expected_points"] for item in pair_items)
+        remaining = budget - pair_cost
+        driver_bound = top_points(0, TEAM_DRIVERS, remaining + _tolerance(remaining))
+        if driver_bound is None:
+            continue
+        pairs.append((pair_points + driver_bound, pair, pair_items, pair_cost, pair_points))
+    pairs.sort(key=lambda entry: (-entry[0], entry[1]))
+    
+    # Heap mínimo dos melhores times: (pontos, desempate, time); a raiz é o
+    # k-ésimo melhor. O desempate é a chave da ordem de enumeração negada
+    # (chave menor = melhor), então a raiz também perde os empates
+    heap: List[Tuple[float, Tuple, Dict]] = []
+    
+    def threshold() -> Optional[float]:
+        return heap[0][0] if len(heap) == top_k else None
+    
+    def pruned(bound: float) -> bool:
+        # Limites iguais ao k-ésimo não são podados: podem vencer pelo desempate
+        kth = threshold()
+        return kth is not None and bound < kth - _tolerance(kth)
+    
+    def search(pair: Tuple, pair_items: List[Dict], pair_points: float, remaining: float,
+               start: int, chosen: List[int], points_so_far: float, team_counts: Dict[str, int]) -> None:
+        missing = TEAM_DRIVERS - len(chosen)
+        if missing == 0:
+            indices = sorted(order[k] for k in chosen)
+            driver_items = [drivers[i] for i in indices]
+            evaluation = _evaluate_team(driver_items, pair_items, budget)
+            if evaluation is None:
+                return
+            total_points, total_cost = evaluation
+            entry_key = (total_points, tuple(-i for i in pair + tuple(indices)))
+            if len(heap) == top_k and entry_key <= heap[0][:2]:
+                return
+            team = {
+                "drivers": [item["id"] for item in driver_items],
+                "constructors": [item["id"] for item in pair_items],
+                "total_points": total_points,
+                "total_cost": total_cost,
+                "budget_remaining": budget - total_cost
+            }
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry_key + (team,))
+            else:
+                heapq.heapreplace(heap, entry_key + (team,))
+            return
+        
+        limit = remaining + _tolerance(remaining)
+        if cheapest[start][missing] > limit:
+            return
+        bound = top_points(start, missing, limit)
+        if bound is None or pruned(pair_points + points_so_far + bound):
+            return
+        
+        for k in range(start, num_drivers - missing + 1):
+            if prices[k] > limit or team_counts.get(teams[k], 0) >= MAX_DRIVERS_PER_TEAM:
+                continue
+            team_counts[teams[k]] = team_counts.get(teams[k], 0) + 1
+            chosen.append(k)
+            search(pair, pair_items, pair_points, remaining - prices[k], k + 1, chosen,
+                   points_so_far + points[k], team_counts)
+            chosen.pop()
+            team_counts[teams[k]] -= 1
+    
+    for bound, pair, pair_items, pair_cost, pair_points in pairs:
+        if pruned(bound):
+            break
+        search(pair, pair_items, pair_points, budget - pair_cost, 0, [], 0.0, {})
+    
+    teams = [team for _, _, team in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+    for team in teams:
+        team["gap_to_best"] = teams[0]["total_points"] - team["total_points"]
+    return teams
+
+
+def solve_best_team(drivers: List[Dict], constructors: List[Dict], budget: float) -> Optional[Dict]:
+    """
+    Time ótimo por branch-and-bound exato (ver solve_top_teams).
+    
+    Returns:
+        Dict do time (ver find_best_team) ou None se nenhum time couber no orçamento
+    """
+    teams = solve_top_teams(drivers, constructors, budget)
+    if not teams:
+        return None
+    team = teams[0]
+    del team["gap_to_best"]
+    return team
+
+
+class LineupTable:
+    """
+    Melhor escalação válida de 5 pilotos para cada nível de orçamento.
+    
+    Os níveis vão de 0 até o custo da escalação mais cara, em décimos de
+    milhão. Para montar a tabela, todas as combinações de 5 pilotos são
+    avaliadas uma vez em blocos NumPy (custo, pontos e a regra de no máximo 3
+    por equipe); a melhor de cada custo exato é propagada para os níveis
+    acima por máximo acumulado. Entre escalações com os mesmos pontos vence a
+    primeira na ordem de itertools.combinations, o mesmo desempate da
+    enumeração completa.
+    """
+    
+    def __init__(self, drivers: List[Dict]):
+        """
+        Args:
+            drivers: Pilotos ({"id", "price", "team", "expected_points"})
+        """
+        self.drivers = drivers
+        num_drivers = len(drivers)
+        prices = np.array([_price_units(d["price"]) for d in drivers], dtype=np.int64)
+        points = np.array([d["expected_points"] for d in drivers], dtype=np.float64)
+        team_index: Dict[str, int] = {}
+        teams = np.array([team_index.setdefault(d["team"], len(team_index)) for d in drivers], dtype=np.int64)
+        
+        self.max_level = int(np.sort(prices)[::-1][:TEAM_DRIVERS].sum()) if num_drivers >= TEAM_DRIVERS else 0
+        num_levels = self.max_level + 1
+        # Melhor combinação de custo exato igual ao nível: pontos e ordinal na enumeração
+        level_points = np.full(num_levels, -np.inf)
+        level_ordinals = np.full(num_levels, -1, dtype=np.int64)
+        level_lineups = np.zeros((num_levels, TEAM_DRIVERS), dtype=np.int64)
+        
+        combinations = itertools.combinations(range(num_drivers), TEAM_DRIVERS)
+        offset = 0
+        while True:
+            flat = np.fromiter(
+                itertools.chain.from_iterable(itertools.islice(combinations, LINEUP_CHUNK)), dtype=np.int64
+            )
+            if flat.size == 0:
+                break
+            combos = flat.reshape(-1, TEAM_DRIVERS)
+            ordinals = np.arange(offset, offset + len(combos))
+            offset += len(combos)
+            
+            # Máximo 3 por equipe: com as equipes ordenadas, a 1ª e a 4ª (ou a
+            # 2ª e a 5ª) iguais indicam 4 pilotos da mesma equipe
+            combo_teams = np.sort(teams[combos], axis=1)
+            valid = np.all(
+                combo_teams[:, :-MAX_DRIVERS_PER_TEAM] != combo_teams[:, MAX_DRIVERS_PER_TEAM:], axis=1
+            )
+            combos, ordinals = combos[valid], ordinals[valid]
+            if len(combos) == 0:
+                continue
+            costs = prices[combos].sum(axis=1)
+            # Soma na ordem da combinação, como sum() na enumeração completa
+            combo_points = points[combos[:, 0]]
+            for j in range(1, TEAM_DRIVERS):
+                combo_points = combo_points + points[combos[:, j]]
+            
+            # Melhor do bloco para cada custo: mais pontos e, no empate, menor ordinal
+            ranking = np.lexsort((ordinals, -combo_points, costs))
+            block_costs, first = np.unique(costs[ranking], return_index=True)
+            best = ranking[first]
+            # Os blocos vêm em ordem de enumeração: só substitui com mais pontos
+            better = combo_points[best] > level_points[block_costs]
+            levels, best = block_costs[better], best[better]
+            level_points[levels] = combo_points[best]
+            level_ordinals[levels] = ordinals[best]
+            level_lineups[levels] = combos[best]
+        
+        # Melhor escalação com custo <= nível (máximo acumulado com o mesmo desempate)
+        self.points = level_points.copy()
+        self.lineups = level_lineups.copy()
+        self._feasible = level_ordinals >= 0
+        best_level = -1
+        for level in range(num_levels):
+            if level_ordinals[level] >= 0 and (
+                best_level < 0
+                or level_points[level] > level_points[best_level]
+                or (level_points[level] == level_points[best_level]
+                    and level_ordinals[level] < level_ordinals[best_level])
+            ):
+                best_level = level
+            if best_level >= 0:
+                self.points[level] = level_points[best_level]
+                self.lineups[level] = level_lineups[best_level]
+                self._feasible[level] = True
+    
+    def _levels(self, budget_units: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Nível da tabela de cada orçamento em décimos e se há escalação que caiba."""
+        levels = np.minimum(budget_units, self.max_level)
+        feasible = budget_units >= 0
+        feasible &= self._feasible[np.maximum(levels, 0)]
+        return np.maximum(levels, 0), feasible
+    
+    def best_lineup(self, budget: float) -> Optional[List[int]]:
+        """
+        Melhor escalação de pilotos que cabe no orçamento.
+        
+        Returns:
+            Índices dos pilotos (em ordem crescente) ou None se nenhuma couber
+        """
+        levels, feasible = self._levels(np.array([_budget_units(budget)]))
+        if not feasible[0]:
+            return None
+        return self.lineups[levels[0]].tolist()
+    
+    def best_teams(self, constructors: List[Dict], budgets: Sequence[float]) -> List[Optional[Dict]]:
+        """
+        Melhor time para cada orçamento: uma busca na tabela por par de construtores.
+        
+        Args:
+            constructors: Construtores ({"id", "price", "expected_points"})
+            budgets: Orçamentos a consultar
+        
+        Returns:
+            Um time por orçamento, na mesma ordem (ver find_best_team), ou
+            None onde nenhum time couber
+        """
+        pairs = list(itertools.combinations(range(len(constructors)), TEAM_CONSTRUCTORS))
+        budget_units = np.array([_budget_units(budget) for budget in budgets], dtype=np.int64)
+        if not pairs or len(budget_units) == 0:
+            return [None] * len(budget_units)
+        pair_units = np.array(
+            [sum(_price_units(constructors[c]["price"]) for c in pair) for pair in pairs], dtype=np.int64
+        )
+        pair_points = np.array([sum(constructors[c]["expected_points"] for c in pair) for pair in pairs])
+        
+        # Pares × orçamentos: pontos dos pilotos do nível restante + pontos do par
+        levels, feasible = self._levels(budget_units[None, :] - pair_units[:, None])
+        totals = np.where(feasible, self.points[levels] + pair_points[:, None], -np.inf)
+        # argmax devolve o primeiro par com o máximo, o desempate da enumeração
+        best_pairs = np.argmax(totals, axis=0)
+        
+        teams: List[Optional[Dict]] = []
+        for b, budget in enumerate(budgets):
+            p = best_pairs[b]
+            if not feasible[p, b]:
+                teams.append(None)
+                continue
+            driver_items = [self.drivers[i] for i in self.lineups[levels[p, b]]]
+            pair_items = [constructors[c] for c in pairs[p]]
+            total_points, total_cost = _evaluate_team(driver_items, pair_items, budget)
+            teams.append({
+                "drivers": [item["id"] for item in driver_items],
+                "constructors": [item["id"] for item in pair_items],
+                "total_points": total_points,
+                "total_cost": total_cost,
+                "budget_remaining": budget - total_cost
+            })
+        return teams
+
+
+_lineup_tables: "OrderedDict[str, LineupTable]" = OrderedDict()
+_lineup_tables_lock = threading.Lock()
+
+
+def _market_version(drivers: List[Dict]) -> str:
+    """Chave da versão de preços e projeções dos pilotos."""
+    fields = [(d["id"], d["price"], d["team"], d["expected_points"]) for d in drivers]
+    return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()
+
+
+def get_lineup_table(drivers: List[Dict]) -> LineupTable:
+    """
+    Tabela de escalações da versão atual dos pilotos (montada na primeira
+    consulta e reutilizada enquanto preços e projeções não mudarem).
+    """
+    version = _market_version(drivers)
+    with _lineup_tables_lock:
+        table = _lineup_tables.get(version)
+        if table is not None:
+            _lineup_tables.move_to_end(version)
+            return table
+    
+    table = LineupTable(drivers)
+    with _lineup_tables_lock:
+        _lineup_tables[version] = table
+        while len(_lineup_tables) > LINEUP_TABLE_CACHE_SIZE:
+            _lineup_tables.popitem(last=False)
+    return table
+
+
+def _apply_projections(
+    prices_data: List[Dict],
+    custom_points_projections: Optional[Dict[str, float]]
+) -> Tuple[List[Dict], List[Dict]]:
+    """Pilotos e construtores com as projeções aplicadas (em cópias dos itens)."""
+    prices_data = [dict(item) for item in prices_data]
+    
+    # Atualiza expected_points se custom_points_projections for fornecido
+    if custom_points_projections:
+        for item in prices_data:
+            # Tenta encontrar pelo nome (chave do dict)
+            if item["name"] in custom_points_projections:
+                item["expected_points"] = custom_points_projections[item["name"]]
+            # Também tenta encontrar pelo ID (caso o dict use IDs)
+            elif item["id"] in custom_points_projections:
+                item["expected_points"] = custom_points_projections[item["id"]]
+    
+    # Separa pilotos e construtores
+    drivers = [item for item in prices_data if item["type"] == "DRIVER"]
+    constructors = [item for item in prices_data if item["type"] == "CONSTRUCTOR"]
+    return drivers, constructors
+
+
+def load_market(custom_points_projections: Dict[str, float] = None) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Pilotos e construtores de f1_prices.json, com as projeções aplicadas.
+    
+    Args:
+        custom_points_projections: Projeções de pontos por nome ou ID (ver find_best_team)
+    
+    Returns:
+        Tupla (pilotos, construtores)
+    """
+    return _apply_projections(load_prices_data(), custom_points_projections)
+
+
+def _best_teams_for_budgets(
+    drivers: List[Dict],
+    constructors: List[Dict],
+    budgets: Sequence[float]
+) -> List[Optional[Dict]]:
+    """
+    Melhor time para cada orçamento: pela LineupTable quando há vários
+    orçamentos e o grid é pequeno o bastante para enumerar as escalações;
+    senão, branch-and-bound por orçamento (o mesmo resultado).
+    """
+    if len(budgets) > 1 and math.comb(len(drivers), TEAM_DRIVERS) <= LINEUP_TABLE_MAX_COMBINATIONS:
+        return get_lineup_table(drivers).best_teams(constructors, budgets)
+    return [solve_best_team(drivers, constructors, budget) for budget in budgets]
+
+
+def find_best_teams_for_budgets(
+    budgets: Sequence[float],
+    custom_points_projections: Dict[str, float] = None
+) -> List[Optional[Dict]]:
+    """
+    Melhor time para cada orçamento de uma simulação "e se" (por exemplo,
+    de 60 a 120 milhões), com uma só tabela de escalações (ver
+    _best_teams_for_budgets).
+    
+    Args:
+        budgets: Orçamentos a consultar
+        custom_points_projections: Projeções de pontos por nome ou ID (ver find_best_team)
+    
+    Returns:
+        Um time por orçamento, na mesma ordem (ver find_best_team), ou None
+        onde nenhum time couber
+    """
+    drivers, constructors = load_market(custom_points_projections)
+    return _best_teams_for_budgets(drivers, constructors, budgets)
+
+
+def find_best_team(
+    budget: float = 100.0,
+    custom_points_projections: Dict[str, float] = None,
+    top_k: int = 1
+) -> Dict:
     """
     Encontra o melhor time de Fantasy F1 maximizando expected_points.
     
-    Algoritmo:
+    Algoritmo (solve_top_teams, branch-and-bound exato):
         1. Separa Pilotos e Construtores
-        2. Gera todas as combinações possíveis de 2 Construtores
-        3. Para cada par de construtores, calcula o orçamento restante
-        4. Gera combinações de 5 Pilotos que caibam nesse restante
-        5. Respeita a regra: Máximo 3 pilotos da mesma equipe
-        6. Maximiza a soma de expected_points
+        2. Ordena os pares de Construtores pelo limite superior de pontos
+           (pontos do par + os 5 pilotos de mais pontos que cabem no restante)
+        3. Para cada par, escolhe 5 Pilotos por busca em profundidade, podando
+           ramos que estouram o orçamento ou cujo limite superior não supera
+           o k-ésimo melhor time encontrado
+        4. Respeita a regra: Máximo 3 pilotos da mesma equipe
+        5. Maximiza a soma de expected_points
     
     Args:
         budget: Orçamento disponível (padrão: 100.0)
         custom_points_projections: Dict opcional com projeções customizadas de pontos.
             Se fornecido, usa esses valores ao invés dos valores padrão do JSON.
             Formato: {"driver_name": points, ...}
+        top_k: Número de times a devolver em "top_teams" (padrão: 1, só o melhor)
     
     Returns:
         Dict com:
@@ -46,80 +542,74 @@ def find_best_team(budget: float = 100.0, custom_points_projections: Dict[str, f
             "total_cost": float,
             "budget_remaining": float
         }
+        Com top_k > 1, inclui também "top_teams": os top_k melhores times
+        (o primeiro é o próprio ótimo), cada um com os campos acima e
+        "gap_to_best" (pontos a menos que o ótimo)
     """
-    prices_data = load_prices_data()
+    drivers, constructors = load_market(custom_points_projections)
     
-    # Separa pilotos e construtores
-    drivers = [item for item in prices_data if item["type"] == "DRIVER"]
-    constructors = [item for item in prices_data if item["type"] == "CONSTRUCTOR"]
+    if top_k == 1:
+        best_team = solve_best_team(drivers, constructors, budget)
+        if best_team is None:
+            raise ValueError(NO_VALID_TEAM)
+        return best_team
+    return _find_top_teams(drivers, constructors, budget, top_k)
+
+
+def _find_top_teams(drivers: List[Dict], constructors: List[Dict], budget: float, top_k: int) -> Dict:
+    """Melhor time com "top_teams" (ver find_best_team)."""
+    teams = solve_top_teams(drivers, constructors, budget, top_k)
+    if not teams:
+        raise ValueError(NO_VALID_TEAM)
     
-    # Cria dicionário para acesso rápido
-    data_dict = {item["id"]: item for item in prices_data}
+    best_team = {key: value for key, value in teams[0].items() if key != "gap_to_best"}
+    best_team["top_teams"] = teams
+    return best_team
+
+
+def find_best_teams_batch(queries: Sequence[Dict]) -> List[Dict]:
+    """
+    Vários pedidos de otimização com um só carregamento de f1_prices.json.
     
-    # Atualiza expected_points se custom_points_projections for fornecido
-    if custom_points_projections:
-        for item in prices_data:
-            # Tenta encontrar pelo nome (chave do dict)
-            if item["name"] in custom_points_projections:
-                item["expected_points"] = custom_points_projections[item["name"]]
-            # Também tenta encontrar pelo ID (caso o dict use IDs)
-            elif item["id"] in custom_points_projections:
-                item["expected_points"] = custom_points_projections[item["id"]]
+    Os pedidos com as mesmas projeções compartilham os dados projetados, e
+    os de top_k = 1 são respondidos juntos (ver _best_teams_for_budgets): com
+    vários orçamentos, por uma consulta vetorizada à LineupTable.
     
-    best_team = None
-    best_points = -1.0
+    Args:
+        queries: Pedidos {"budget", "custom_points_projections" (opcional),
+            "top_k" (opcional, padrão 1)}
     
-    # Gera todas as combinações de 2 construtores
-    constructor_combinations = list(itertools.combinations([c["id"] for c in constructors], 2))
+    Returns:
+        Um resultado por pedido, na ordem dos pedidos: o dict de
+        find_best_team ou {"error": mensagem} se o pedido for inválido ou
+        nenhum time couber no orçamento
+    """
+    prices_data = load_prices_data()
+    results: List[Optional[Dict]] = [None] * len(queries)
     
-    for constructor_pair in constructor_combinations:
-        # Calcula custo dos construtores
-        constructor_cost = sum(data_dict[cid]["price"] for cid in constructor_pair)
-        remaining_budget = budget - constructor_cost
-        
-        # Se não sobra orçamento suficiente, pula
-        if remaining_budget < 0:
-            continue
-        
-        # Gera combinações de 5 pilotos
-        driver_combinations = list(itertools.combinations([d["id"] for d in drivers], 5))
-        
-        for driver_combo in driver_combinations:
-            # Calcula custo dos pilotos
-            driver_cost = sum(data_dict[did]["price"] for did in driver_combo)
-            total_cost = constructor_cost + driver_cost
-            
-            # Verifica orçamento
-            if total_cost > budget:
-                continue
-            
-            # Verifica regra: máximo 3 pilotos da mesma equipe
-            team_counts = {}
-            for driver_id in driver_combo:
-                team = data_dict[driver_id]["team"]
-                team_counts[team] = team_counts.get(team, 0) + 1
-                if team_counts[team] > 3:
-                    break
-            else:
-                # Se chegou aqui, a regra foi respeitada
-                # Calcula pontos totais
-                driver_points = sum(data_dict[did]["expected_points"] for did in driver_combo)
-                constructor_points = sum(data_dict[cid]["expected_points"] for cid in constructor_pair)
-                total_points = driver_points + constructor_points
-                
-                # Atualiza melhor time se necessário
-                if total_points > best_points:
-                    best_points = total_points
-                    best_team = {
-                        "drivers": list(driver_combo),
-                        "constructors": list(constructor_pair),
-                        "total_points": total_points,
-                        "total_cost": total_cost,
-                        "budget_remaining": budget - total_cost
-                    }
-    
-    if best_team is None:
-        raise ValueError("Não foi possível encontrar um time válido com o orçamento disponível")
+    # Pedidos agrupados pelas projeções (na ordem da primeira ocorrência)
+    groups: Dict[str, List[int]] = {}
+    for i, query in enumerate(queries):
+        projections = query.get("custom_points_projections") or {}
+        groups.setdefault(json.dumps(projections, sort_keys=True), []).append(i)
     
-    return best_team
-
+    for indices in groups.values():
+        drivers, constructors = _apply_projections(prices_data, queries[indices[0]].get("custom_points_projections"))
+        single = []
+        for i in indices:
+            budget, top_k = queries[i]["budget"], queries[i].get("top_k", 1)
+            if budget <= 0:
+                results[i] = {"error": "Orçamento deve ser maior que zero"}
+            elif top_k == 1:
+                single.append(i)
+            else:
+                try:
+                    results[i] = _find_top_teams(drivers, constructors, budget, top_k)
+                except ValueError as e:
+                    results[i] = {"error": str(e)}
+        
+        if single:
+            teams = _best_teams_for_budgets(drivers, constructors, [queries[i]["budget"] for i in single])
+            for i, team in zip(single, teams):
+                results[i] = team if team is not None else {"error": NO_VALID_TEAM}
+    return results
@@ -1,19 +1,106 @@
 """
 Serviço de otimização para encontrar o melhor time de Fantasy F1.
+
+Preço, pontos previstos, sentiment e equipe de cada ativo são convertidos em
+arrays NumPy uma vez, na criação do otimizador; os candidatos (combinações de
+pilotos × combinações de construtores) são avaliados em blocos, com custo,
+limite de pilotos por equipe e score calculados como operações de arrays.
+Os k melhores times ficam num heap mínimo limitado; de cada bloco só entram os
+candidatos com score acima do k-ésimo melhor.
+
+O custo de todos os candidatos e o score de cada estratégia (com a regra de
+pilotos por equipe já aplicada) formam um índice montado na primeira busca e
+reutilizado pelas seguintes do mesmo otimizador: num lote com vários
+orçamentos e estratégias, cada consulta só aplica o orçamento.
 """
+import heapq
 import itertools
-from typing import Dict, List, Literal, Optional, Tuple
+from typing import Dict, Iterator, List, Literal, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 from app.services.fantasy_data import load_assets
 
+# Máximo de pilotos da mesma equipe em um time
+MAX_DRIVERS_PER_TEAM = 3
+
+# Combinações de pilotos avaliadas por bloco (× todas as combinações de construtores)
+COMBINATION_CHUNK = 4096
+
+STRATEGIES = ("points", "value", "balanced")
+
+
+def _column(df: pd.DataFrame, name: str) -> np.ndarray:
+    """Coluna numérica como float64 (zeros se a coluna não existir)."""
+    if name not in df.columns:
+        return np.zeros(len(df))
+    return df[name].to_numpy(dtype=np.float64)
+
+
+def _sequential_sum(values: np.ndarray) -> np.ndarray:
+    """Soma das colunas da esquerda para a direita (mesmo arredondamento de um laço em Python)."""
+    total = values[:, 0].copy()
+    for j in range(1, values.shape[1]):
+        total += values[:, j]
+    return total
+
+
+def _combination_chunks(n: int, k: int, chunk: int) -> Iterator[np.ndarray]:
+    """Combinações de k índices entre n, em ordem lexicográfica, como arrays (bloco × k)."""
+    combinations = itertools.combinations(range(n), k)
+    while True:
+        flat = np.fromiter(
+            itertools.chain.from_iterable(itertools.islice(combinations, chunk)), dtype=np.intp
+        )
+        if flat.size == 0:
+            return
+        yield flat.reshape(-1, k)
+
 
 class TeamOptimizer:
     """Otimizador de times de Fantasy F1."""
     
     def __init__(self):
-        """Inicializa o otimizador carregando os dados."""
+        """Inicializa o otimizador carregando os dados e montando os arrays dos ativos."""
         self.df_drivers, self.df_constructors = load_assets()
+        
+        self.driver_ids: List[str] = self.df_drivers['id'].tolist()
+        self.constructor_ids: List[str] = self.df_constructors['id'].tolist()
+        self._driver_index = {driver_id: i for i, driver_id in enumerate(self.driver_ids)}
+        self._constructor_index = {constructor_id: i for i, constructor_id in enumerate(self.constructor_ids)}
+        
+        self.driver_prices = _column(self.df_drivers, 'price')
+        self.driver_points = _column(self.df_drivers, 'predicted_points')
+        self.driver_sentiment = _column(self.df_drivers, 'sentiment')
+        self.driver_teams = pd.factorize(self.df_drivers['team_id'])[0]
+        self.constructor_prices = _column(self.df_constructors, 'price')
+        self.constructor_points = _column(self.df_constructors, 'predicted_points')
+        self.constructor_sentiment = _column(self.df_constructors, 'sentiment')
+        
+        # Máximos da normalização da estratégia "balanced" (5 pilotos + 2 construtores)
+        self._max_points = self._team_max(self.driver_points, self.constructor_points)
+        self._max_sentiment = self._team_max(self.driver_sentiment, self.constructor_sentiment)
+        
+        # Índice de candidatos por formato de time e scores por estratégia
+        # (ver _candidate_index e _candidate_scores)
+        self._candidates: Dict[Tuple[int, int], Tuple[np.ndarray, List[Tuple[np.ndarray, ...]]]] = {}
+        self._scores: Dict[Tuple[int, int, str], List[np.ndarray]] = {}
+    
+    @staticmethod
+    def _team_max(driver_values: np.ndarray, constructor_values: np.ndarray) -> float:
+        driver_max = driver_values.max() if driver_values.size else np.nan
+        constructor_max = constructor_values.max() if constructor_values.size else np.nan
+        return float(driver_max * 5 + constructor_max * 2)
+    
+    def _indices(self, driver_ids: List[str], constructor_ids: List[str]) -> Optional[Tuple[List[int], List[int]]]:
+        """Índices dos ativos nos arrays (None se algum ID não existir)."""
+        try:
+            return (
+                [self._driver_index[driver_id] for driver_id in driver_ids],
+                [self._constructor_index[constructor_id] for constructor_id in constructor_ids]
+            )
+        except KeyError:
+            return None
     
     def _validate_team(self, driver_ids: List[str], constructor_ids: List[str], budget: float) -> bool:
         """
@@ -27,34 +114,32 @@ class TeamOptimizer:
         Returns:
             bool: True se válido, False caso contrário
         """
-        # Verifica orçamento
-        total_cost = 0.0
-        
-        for driver_id in driver_ids:
-            driver = self.df_drivers[self.df_drivers['id'] == driver_id]
-            if driver.empty:
-                return False
-            total_cost += driver.iloc[0]['price']
-        
-        for constructor_id in constructor_ids:
-            constructor = self.df_constructors[self.df_constructors['id'] == constructor_id]
-            if constructor.empty:
-                return False
-            total_cost += constructor.iloc[0]['price']
+        indices = self._indices(driver_ids, constructor_ids)
+        if indices is None:
+            return False
         
-        if total_cost > budget:
+        # Verifica orçamento
+        if self._calculate_cost(driver_ids, constructor_ids) > budget:
             return False
         
         # Verifica regra: máximo 3 pilotos da mesma equipe
-        team_counts = {}
-        for driver_id in driver_ids:
-            driver = self.df_drivers[self.df_drivers['id'] == driver_id].iloc[0]
-            team_id = driver['team_id']
-            team_counts[team_id] = team_counts.get(team_id, 0) + 1
-            if team_counts[team_id] > 3:
-                return False
-        
-        return True
+        team_counts = np.bincount(self.driver_teams[indices[0]]) if indices[0] else np.zeros(0)
+        return bool((team_counts <= MAX_DRIVERS_PER_TEAM).all())
+    
+    def _score(self, total_points, total_sentiment, strategy: str):
+        """Score a partir dos totais de pontos e sentiment (escalares ou arrays)."""
+        if strategy == "points":
+            return total_points
+        elif strategy == "value":
+            return total_sentiment
+        elif strategy == "balanced":
+            # Normaliza pontos e sentiment para 0-1 e soma
+            normalized_points = total_points / self._max_points if self._max_points > 0 else 0
+            normalized_sentiment = total_sentiment / self._max_sentiment if self._max_sentiment > 0 else 0
+            
+            return normalized_points + normalized_sentiment
+        else:
+            raise ValueError(f"Estratégia inválida: {strategy}")
     
     def _calculate_score(
         self,
@@ -73,66 +158,120 @@ class TeamOptimizer:
         Returns:
             float: Score do time
         """
+        drivers, constructors = self._indices(driver_ids, constructor_ids)
         total_points = 0.0
         total_sentiment = 0.0
         
-        # Soma pontos e sentiment dos pilotos
-        for driver_id in driver_ids:
-            driver = self.df_drivers[self.df_drivers['id'] == driver_id].iloc[0]
-            total_points += driver.get('predicted_points', 0.0)
-            total_sentiment += driver.get('sentiment', 0.0)
+        # Soma pontos e sentiment dos pilotos e depois dos construtores
+        for i in drivers:
+            total_points += self.driver_points[i]
+            total_sentiment += self.driver_sentiment[i]
+        for c in constructors:
+            total_points += self.constructor_points[c]
+            total_sentiment += self.constructor_sentiment[c]
         
-        # Soma pontos e sentiment dos construtores
-        for constructor_id in constructor_ids:
-            constructor = self.df_constructors[self.df_constructors['id'] == constructor_id].iloc[0]
-            total_points += constructor.get('predicted_points', 0.0)
-            total_sentiment += constructor.get('sentiment', 0.0)
-        
-        if strategy == "points":
-            return total_points
-        elif strategy == "value":
-            return total_sentiment
-        elif strategy == "balanced":
-            # Normaliza pontos e sentiment para 0-1 e soma
-            max_points = self.df_drivers['predicted_points'].max() * 5 + self.df_constructors['predicted_points'].max() * 2
-            max_sentiment = (self.df_drivers['sentiment'].max() * 5 + self.df_constructors['sentiment'].max() * 2)
-            
-            normalized_points = total_points / max_points if max_points > 0 else 0
-            normalized_sentiment = total_sentiment / max_sentiment if max_sentiment > 0 else 0
-            
-            return normalized_points + normalized_sentiment
-        else:
-            raise ValueError(f"Estratégia inválida: {strategy}")
+        return float(self._score(total_points, total_sentiment, strategy))
     
     def _calculate_cost(self, driver_ids: List[str], constructor_ids: List[str]) -> float:
         """Calcula o custo total de um time."""
+        drivers, constructors = self._indices(driver_ids, constructor_ids)
         total_cost = 0.0
+        for i in drivers:
+            total_cost += self.driver_prices[i]
+        for c in constructors:
+            total_cost += self.constructor_prices[c]
+        return float(total_cost)
+    
+    def _candidate_index(self, max_drivers: int, max_constructors: int) -> Tuple[np.ndarray, List[Tuple[np.ndarray, ...]]]:
+        """
+        Índice de candidatos de um formato de time (montado na primeira
+        chamada e reutilizado pelas buscas seguintes).
         
-        for driver_id in driver_ids:
-            driver = self.df_drivers[self.df_drivers['id'] == driver_id].iloc[0]
-            total_cost += driver['price']
+        Returns:
+            Tupla (combinações de construtores, blocos); cada bloco tem
+            COMBINATION_CHUNK combinações de pilotos e é a tupla (combinações,
+            pontos e sentiment somados dos pilotos, acima do limite por
+            equipe, custo dos times (pilotos × construtores))
+        """
+        key = (max_drivers, max_constructors)
+        index = self._candidates.get(key)
+        if index is not None:
+            return index
         
-        for constructor_id in constructor_ids:
-            constructor = self.df_constructors[self.df_constructors['id'] == constructor_id].iloc[0]
-            total_cost += constructor['price']
+        constructor_combos = np.array(
+            list(itertools.combinations(range(len(self.constructor_ids)), max_constructors)), dtype=np.intp
+        ).reshape(-1, max_constructors)
+        chunks = []
+        if len(constructor_combos) and max_drivers > 0:
+            for driver_combos in _combination_chunks(len(self.driver_ids), max_drivers, COMBINATION_CHUNK):
+                # Mais de MAX_DRIVERS_PER_TEAM pilotos de uma equipe: com as equipes
+                # ordenadas, a mesma equipe aparece a MAX_DRIVERS_PER_TEAM posições de distância
+                teams = np.sort(self.driver_teams[driver_combos], axis=1)
+                too_many = np.zeros(len(driver_combos), dtype=bool)
+                for j in range(teams.shape[1] - MAX_DRIVERS_PER_TEAM):
+                    too_many |= teams[:, j] == teams[:, j + MAX_DRIVERS_PER_TEAM]
+                
+                # Somas na mesma ordem do cálculo time a time: pilotos e depois construtores
+                cost = _sequential_sum(self.driver_prices[driver_combos])[:, None]
+                for j in range(max_constructors):
+                    cost = cost + self.constructor_prices[constructor_combos[:, j]]
+                chunks.append((
+                    driver_combos,
+                    _sequential_sum(self.driver_points[driver_combos]),
+                    _sequential_sum(self.driver_sentiment[driver_combos]),
+                    too_many,
+                    cost
+                ))
         
-        return total_cost
+        self._candidates[key] = (constructor_combos, chunks)
+        return self._candidates[key]
+    
+    def _candidate_scores(self, max_drivers: int, max_constructors: int, strategy: str) -> List[np.ndarray]:
+        """
+        Score dos times de cada bloco do índice de candidatos (calculado uma
+        vez por estratégia); times acima do limite por equipe têm score -inf.
+        """
+        key = (max_drivers, max_constructors, strategy)
+        scores = self._scores.get(key)
+        if scores is not None:
+            return scores
+        
+        constructor_combos, chunks = self._candidate_index(max_drivers, max_constructors)
+        scores = []
+        for _, driver_points, driver_sentiment, too_many, cost in chunks:
+            points = driver_points[:, None]
+            sentiment = driver_sentiment[:, None]
+            for j in range(max_constructors):
+                column = constructor_combos[:, j]
+                points = points + self.constructor_points[column]
+                sentiment = sentiment + self.constructor_sentiment[column]
+            score = np.broadcast_to(self._score(points, sentiment, strategy), cost.shape)
+            scores.append(np.where(too_many[:, None], -np.inf, score))
+        
+        self._scores[key] = scores
+        return scores
     
     def find_best_team(
         self,
         budget: float = 100.0,
         strategy: Literal["points", "value", "balanced"] = "points",
         max_drivers: int = 5,
-        max_constructors: int = 2
+        max_constructors: int = 2,
+        top_k: int = 1
     ) -> Dict:
         """
         Encontra o melhor time possível dado um orçamento e estratégia.
         
+        Todas as combinações são avaliadas (em blocos vetorizados); entre
+        times de mesmo score vence o primeiro na ordem das combinações
+        (pilotos e depois construtores).
+        
         Args:
             budget: Orçamento disponível (default: 100.0)
             strategy: Estratégia de otimização ("points", "value", "balanced")
             max_drivers: Número máximo de pilotos (default: 5)
             max_constructors: Número máximo de construtores (default: 2)
+            top_k: Número de times a devolver em "top_teams" (default: 1, só o melhor)
         
         Returns:
             Dict com as seguintes chaves:
@@ -141,49 +280,67 @@ class TeamOptimizer:
                 - total_score: Score total do time
                 - total_cost: Custo total do time
                 - budget_remaining: Orçamento restante
+                - top_teams: Só com top_k > 1: os top_k melhores times (o
+                  primeiro é o próprio ótimo), cada um com as chaves acima e
+                  gap_to_best (score a menos que o ótimo)
         """
-        driver_ids = self.df_drivers['id'].tolist()
-        constructor_ids = self.df_constructors['id'].tolist()
-        
-        best_team = None
-        best_score = float('-inf')
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estratégia inválida: {strategy}")
+        if top_k < 1:
+            raise ValueError("top_k deve ser pelo menos 1")
         
-        # Gera todas as combinações possíveis
-        driver_combinations = list(itertools.combinations(driver_ids, max_drivers))
-        constructor_combinations = list(itertools.combinations(constructor_ids, max_constructors))
+        constructor_combos, chunks = self._candidate_index(max_drivers, max_constructors)
+        scores = self._candidate_scores(max_drivers, max_constructors, strategy)
         
-        # Combina todas as possibilidades
-        total_combinations = len(driver_combinations) * len(constructor_combinations)
+        # Heap mínimo (score, -posição na ordem das combinações, pilotos,
+        # construtores, custo): a raiz é o k-ésimo melhor e perde os empates
+        heap: List[Tuple] = []
+        num_constructor_combos = len(constructor_combos)
+        first_row = 0
         
-        for driver_combo in driver_combinations:
-            for constructor_combo in constructor_combinations:
-                driver_list = list(driver_combo)
-                constructor_list = list(constructor_combo)
-                
-                # Valida o time
-                if not self._validate_team(driver_list, constructor_list, budget):
+        for (driver_combos, _, _, _, cost), score in zip(chunks, scores):
+            flat_score = score.ravel()
+            
+            # Só os candidatos que podem entrar no heap: dentro do orçamento,
+            # válidos e >= k-ésimo score
+            threshold = heap[0][0] if len(heap) == top_k else -np.inf
+            candidates = np.flatnonzero(
+                (flat_score >= threshold) & (flat_score > -np.inf) & (cost.ravel() <= budget)
+            )
+            if candidates.size > top_k:
+                # Maior score primeiro; nos empates, a primeira combinação
+                candidates = candidates[np.lexsort((candidates, -flat_score[candidates]))[:top_k]]
+            
+            for index in candidates.tolist():
+                row, column = divmod(index, num_constructor_combos)
+                entry = (float(flat_score[index]), -(first_row * num_constructor_combos + index))
+                if len(heap) == top_k and entry <= heap[0][:2]:
                     continue
-                
-                # Calcula o score
-                score = self._calculate_score(driver_list, constructor_list, strategy)
-                
-                # Atualiza melhor time se necessário
-                if score > best_score:
-                    best_score = score
-                    best_team = {
-                        'drivers': driver_list,
-                        'constructors': constructor_list,
-                        'total_score': score,
-                        'total_cost': self._calculate_cost(driver_list, constructor_list),
-                        'budget_remaining': budget - self._calculate_cost(driver_list, constructor_list)
-                    }
-        
-        if best_team is None:
+                item = entry + (tuple(driver_combos[row].tolist()), column, float(cost[row, column]))
+                if len(heap) < top_k:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heapreplace(heap, item)
+            first_row += len(driver_combos)
+        
+        if not heap:
             raise ValueError(
                 f"Não foi possível encontrar um time válido com orçamento de ${budget}M. "
                 f"Tente aumentar o orçamento ou reduzir o número de pilotos/construtores."
             )
         
+        teams = []
+        for team_score, _, drivers, column, total_cost in sorted(heap, reverse=True):
+            teams.append({
+                'drivers': [self.driver_ids[i] for i in drivers],
+                'constructors': [self.constructor_ids[c] for c in constructor_combos[column]],
+                'total_score': team_score,
+                'total_cost': total_cost,
+                'budget_remaining': budget - total_cost,
+                'gap_to_best': (teams[0]['total_score'] if teams else team_score) - team_score
+            })
+        
+        best_team = {key: value for key, value in teams[0].items() if key != 'gap_to_best'}
+        if top_k > 1:
+            best_team['top_teams'] = teams
         return best_team
-
-
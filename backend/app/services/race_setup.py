@@ -1,12 +1,22 @@
 """
 Serviço para configurar parâmetros de corrida a partir de dados reais do FastF1.
 """
+import copy
+import threading
 import numpy as np
-from typing import List
+from collections import OrderedDict
+from typing import List, Tuple
 from fastapi import HTTPException
 
 from app.services.fastf1_adapter import get_session_data
 from app.simulation.models import DriverSim
+from app.simulation.timing import PHASE_SESSION_LOAD, phase
+
+# (ano, GP) memorizados por load_race_parameters
+RACE_PARAMETERS_CACHE_SIZE = 32
+
+SESSION_RACE = "Race"
+SESSION_QUALIFYING = "Qualifying"
 
 
 def get_race_parameters(year: int, gp_name: str) -> List[DriverSim]:
@@ -28,23 +38,34 @@ def get_race_parameters(year: int, gp_name: str) -> List[DriverSim]:
             - 503: Se não conseguir carregar dados do FastF1
             - 404: Se não houver dados suficientes (ex: poucos pilotos ou voltas)
     """
+    return _extract_race_parameters(year, gp_name)[0]
+
+
+def _extract_race_parameters(year: int, gp_name: str) -> Tuple[List[DriverSim], str]:
+    """
+    get_race_parameters com o tipo da sessão usada.
+    
+    Returns:
+        Tupla (pilotos, "Race" ou "Qualifying")
+    """
     # Tenta carregar sessão de Race primeiro, depois Qualifying
     session = None
     session_type = None
     
-    try:
-        session = get_session_data(year, gp_name, "R")
-        session_type = "Race"
-    except HTTPException:
-        # Se Race não existir, tenta Qualifying
+    with phase(PHASE_SESSION_LOAD):
         try:
-            session = get_session_data(year, gp_name, "Q")
-            session_type = "Qualifying"
-        except HTTPException as e:
-            raise HTTPException(
-                status_code=503,
-                detail=f"Não foi possível carregar dados de Race ou Qualifying para {year} {gp_name}: {str(e)}"
-            )
+            session = get_session_data(year, gp_name, "R")
+            session_type = SESSION_RACE
+        except HTTPException:
+            # Se Race não existir, tenta Qualifying
+            try:
+                session = get_session_data(year, gp_name, "Q")
+                session_type = SESSION_QUALIFYING
+            except HTTPException as e:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Não foi possível carregar dados de Race ou Qualifying para {year} {gp_name}: {str(e)}"
+                )
     
     # Verifica se a sessão tem dados
     if not hasattr(session, 'laps') or session.laps is None:
@@ -105,10 +126,12 @@ def get_race_parameters(year: int, gp_name: str) -> List[DriverSim]:
             tire_degradation = 0.1  # 0.1 segundos por volta
             pit_stop_loss = 24.0  # 24 segundos perdidos no pit stop
             
-            # Obtém nome completo do piloto (tenta obter da sessão)
+            # Obtém nome completo e equipe do piloto (tenta obter da sessão)
+            team = None
             try:
                 driver_info = session.get_driver(driver_code)
                 driver_name = driver_info.FullName if hasattr(driver_info, 'FullName') else driver_code
+                team = getattr(driver_info, 'TeamName', None) or None
             except:
                 # Se não conseguir, usa o código do piloto
                 driver_name = driver_code
@@ -119,7 +142,8 @@ def get_race_parameters(year: int, gp_name: str) -> List[DriverSim]:
                 base_lap_time=base_lap_time,
                 consistency=consistency,
                 tire_degradation=tire_degradation,
-                pit_stop_loss=pit_stop_loss
+                pit_stop_loss=pit_stop_loss,
+                team=team
             )
             
             drivers_list.append(driver_sim)
@@ -135,5 +159,51 @@ def get_race_parameters(year: int, gp_name: str) -> List[DriverSim]:
             detail=f"Dados insuficientes: apenas {len(drivers_list)} piloto(s) com voltas válidas encontrado(s) para {year} {gp_name}."
         )
     
-    return drivers_list
+    return drivers_list, session_type
+
+
+_race_parameters: "OrderedDict[Tuple[int, str], Tuple[DriverSim, ...]]" = OrderedDict()
+_race_parameters_lock = threading.Lock()
+
+
+def clear_race_parameters_cache() -> None:
+    """Descarta os parâmetros memorizados (ex: após atualizar os dados do FastF1)."""
+    with _race_parameters_lock:
+        _race_parameters.clear()
 
+
+def load_race_parameters(year: int, gp_name: str) -> List[DriverSim]:
+    """
+    Versão memorizada de get_race_parameters.
+    
+    A extração a partir da sessão de Race do FastF1 é feita uma vez por (ano,
+    GP) em cada processo; as chamadas seguintes devolvem cópias dos mesmos
+    pilotos. Parâmetros do Qualifying (Race ainda indisponível) e erros não
+    são memorizados, então a corrida é usada assim que seus dados existirem.
+    
+    Args:
+        year: Ano da temporada (ex: 2024, 2025)
+        gp_name: Nome do Grande Prêmio (ex: 'Bahrain', 'Monaco')
+    
+    Returns:
+        Lista de DriverSim (cópias, podem ser modificadas pelo chamador)
+    
+    Raises:
+        HTTPException: Os mesmos erros de get_race_parameters
+    """
+    key = (year, gp_name)
+    with _race_parameters_lock:
+        cached = _race_parameters.get(key)
+        if cached is not None:
+            _race_parameters.move_to_end(key)
+    
+    if cached is None:
+        drivers, session_type = _extract_race_parameters(year, gp_name)
+        cached = tuple(drivers)
+        if session_type == SESSION_RACE:
+            with _race_parameters_lock:
+                _race_parameters[key] = cached
+                while len(_race_parameters) > RACE_PARAMETERS_CACHE_SIZE:
+                    _race_parameters.popitem(last=False)
+    
+    return copy.deepcopy(list(cached))
@@ -0,0 +1,212 @@
+"""
+Cache de resultados de simulação endereçado por conteúdo.
+
+A chave é um hash SHA-256 de tudo o que determina o resultado: parâmetros de
+cada DriverSim, número de voltas, probabilidade de chuva, iterações, semente,
+opções da execução e propriedades dos pneus. Há dois níveis:
+
+- memória: LRU com número máximo de entradas, por processo;
+- disco: um arquivo JSON por chave, com remoção dos menos usados (mtime)
+  quando o tamanho total passa do limite.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from app.core.config import settings
+from .models import DriverSim
+from .tyres import TyreModel
+
+# Versão do formato das entradas; alterar invalida o cache em disco
+CACHE_FORMAT_VERSION = 1
+
+# Nível em que a entrada foi encontrada (reportado na resposta)
+CACHE_MEMORY = "memory"
+CACHE_DISK = "disk"
+CACHE_MISS = "miss"
+
+# Campos de DriverSim que determinam o resultado (o estado de pneus é da corrida)
+_DRIVER_FIELDS = ("name", "base_lap_time", "consistency", "tire_degradation", "pit_stop_loss", "team")
+
+
+def make_cache_key(
+    drivers: List[DriverSim],
+    total_laps: int,
+    weather_prob: float,
+    iterations: Optional[int],
+    seed: Optional[int],
+    **options: Any
+) -> str:
+    """
+    Calcula a chave de cache de uma simulação.
+
+    Args:
+        drivers: Pilotos da simulação (os parâmetros de cada um entram no hash)
+        total_laps: Número total de voltas
+        weather_prob: Probabilidade de chuva (0.0 a 1.0)
+        iterations: Iterações pedidas (None = padrão do endpoint)
+        seed: Semente pedida; None significa "qualquer semente", então um
+            resultado sem semente explícita é reaproveitado por outras
+            requisições sem semente
+        **options: Demais parâmetros que alteram o resultado (ex: pit_strategy)
+
+    Returns:
+        Hash hexadecimal SHA-256
+    """
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "drivers": [[getattr(driver, name) for name in _DRIVER_FIELDS] for driver in drivers],
+        "total_laps": total_laps,
+        "weather_prob": weather_prob,
+        "iterations": iterations,
+        "seed": seed,
+        "options": options,
+        "tyres": {
+            compound.value: properties
+            for compound, properties in TyreModel.properties_snapshot().items()
+        }
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache de dois níveis (memória LRU + disco) para resultados JSON.
+
+    Seguro para uso concorrente por várias threads do mesmo processo; no disco
+    as gravações são atômicas (arquivo temporário + rename), então processos
+    diferentes podem compartilhar o diretório.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        memory_entries: Optional[int] = None,
+        disk_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            directory: Diretório do nível em disco (padrão: settings.SIMULATION_CACHE_DIR;
+                string vazia desativa o disco)
+            memory_entries: Máximo de entradas em memória (padrão: settings.SIMULATION_CACHE_MEMORY_ENTRIES)
+            disk_bytes: Tamanho máximo do disco em bytes (padrão: settings.SIMULATION_CACHE_DISK_BYTES)
+        """
+        self.directory = settings.SIMULATION_CACHE_DIR if directory is None else directory
+        self.memory_entries = settings.SIMULATION_CACHE_MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self.disk_bytes = settings.SIMULATION_CACHE_DISK_BYTES if disk_bytes is None else disk_bytes
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Insere no nível de memória, descartando o menos usado se necessário."""
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Tuple[Optional[Any], str]:
+        """
+        Busca um resultado.
+
+        Args:
+            key: Chave de make_cache_key
+
+        Returns:
+            Tupla (valor ou None, nível: CACHE_MEMORY, CACHE_DISK ou CACHE_MISS)
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key], CACHE_MEMORY
+
+        if not self.directory:
+            return None, CACHE_MISS
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # Marca o uso para a remoção por LRU no disco
+            os.utime(path)
+        except (OSError, ValueError):
+            return None, CACHE_MISS
+
+        self._remember(key, value)
+        return value, CACHE_DISK
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Armazena um resultado (serializável em JSON) nos dois níveis.
+
+        Falhas de escrita no disco não interrompem a requisição: o valor
+        continua disponível no nível de memória.
+        """
+        self._remember(key, value)
+        if not self.directory:
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(value, f, separators=(",", ":"))
+            os.replace(temporary, self._path(key))
+            self._evict_disk()
+        except OSError:
+            pass
+
+    def _evict_disk(self) -> None:
+        """Remove os arquivos menos usados até o total caber em disk_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        """Esvazia os dois níveis."""
+        with self._lock:
+            self._memory.clear()
+        if self.directory and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Retorna o cache de resultados compartilhado do processo (criado na primeira chamada)."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
@@ -2,11 +2,11 @@
 Motor de simulação de corrida F1.
 """
 import random
-import copy
-from typing import List, Tuple
-from .models import DriverSim, RaceResult
-from .weather import WeatherEngine, WeatherCondition
-from .tyres import TyreModel, TyreCompound
+from typing import List, Optional, Tuple
+from .models import DriverSim, RaceResult, RaceState
+from .weather import WeatherEngine, WeatherCondition, WEATHER_CODES, WEATHER_MODELS, WEATHER_ORDER
+from .tyres import TyreModel, TyreCompound, COMPOUND_ORDER, COMPOUND_CODES
+from .strategy import PIT_STRATEGIES, best_plan
 
 # Sistema de pontuação F1 (baseado na posição final)
 F1_POINTS_SYSTEM = {
@@ -24,6 +24,49 @@ F1_POINTS_SYSTEM = {
 }
 
 
+# Códigos de composto usados no laço (índices de COMPOUND_ORDER)
+_SOFT, _MEDIUM, _HARD = (COMPOUND_CODES[c] for c in (TyreCompound.SOFT, TyreCompound.MEDIUM, TyreCompound.HARD))
+_INTER, _WET = COMPOUND_CODES[TyreCompound.INTER], COMPOUND_CODES[TyreCompound.WET]
+_DRY_CODES = [COMPOUND_CODES[c] for c in TyreModel.get_dry_compounds()]
+
+# Compostos possíveis na largada (estratégia reativa)
+_START_CODES = (_SOFT, _MEDIUM)
+
+
+def _next_tyre_code(used_mask: int, weather: WeatherCondition, laps_remaining: int) -> int:
+    """
+    Escolhe o código do próximo composto de pneu para troca.
+    
+    Args:
+        used_mask: Máscara de bits dos compostos já utilizados
+        weather: Condição climática
+        laps_remaining: Voltas restantes na corrida
+    
+    Returns:
+        Código (COMPOUND_CODES) do próximo composto a usar
+    """
+    # Se estiver chovendo, usa pneu de chuva (Intermediate em condições mistas)
+    if weather == WeatherCondition.WET:
+        return _WET
+    if weather == WeatherCondition.MIXED:
+        return _INTER
+    
+    # Se ainda não usou 2 compostos diferentes, escolhe o mais rápido que falta
+    if bin(used_mask).count("1") < 2:
+        for code in _DRY_CODES:
+            if not used_mask & (1 << code):
+                return code
+    
+    # Se já usou 2 compostos, escolhe o melhor para chegar ao fim
+    # Prefere HARD se faltam muitas voltas, senão MEDIUM ou SOFT
+    if laps_remaining > 25:
+        return _HARD
+    elif laps_remaining > 15:
+        return _MEDIUM
+    else:
+        return _SOFT
+
+
 def _choose_next_tyre(
     driver: DriverSim,
     weather: WeatherCondition,
@@ -42,188 +85,222 @@ def _choose_next_tyre(
     Returns:
         Próximo composto a usar
     """
-    # Se estiver chovendo, usa pneu de chuva
-    if weather != WeatherCondition.DRY:
-        if weather == WeatherCondition.WET:
-            return TyreCompound.WET
-        else:  # MIXED
-            # Em condições mistas, usa Intermediate
-            return TyreCompound.INTER
-    
-    # Em condições secas, escolhe baseado na estratégia
-    dry_compounds = TyreModel.get_dry_compounds()
-    
-    # Se ainda não usou 2 compostos diferentes, escolhe um que falta
-    if len(driver.compounds_used) < 2:
-        available = [c for c in dry_compounds if c not in driver.compounds_used]
-        if available:
-            # Escolhe o mais rápido disponível se faltam muitas voltas, senão o mais durável
-            if laps_remaining > 20:
-                # Prefere SOFT se faltam muitas voltas (pode trocar depois)
-                if TyreCompound.SOFT in available:
-                    return TyreCompound.SOFT
-                elif TyreCompound.MEDIUM in available:
-                    return TyreCompound.MEDIUM
-                else:
-                    return TyreCompound.HARD
-            else:
-                # Se faltam poucas voltas, escolhe o mais rápido
-                if TyreCompound.SOFT in available:
-                    return TyreCompound.SOFT
-                elif TyreCompound.MEDIUM in available:
-                    return TyreCompound.MEDIUM
-                else:
-                    return TyreCompound.HARD
-    
-    # Se já usou 2 compostos, escolhe o melhor para chegar ao fim
-    # Prefere HARD se faltam muitas voltas, senão MEDIUM ou SOFT
-    if laps_remaining > 25:
-        return TyreCompound.HARD
-    elif laps_remaining > 15:
-        return TyreCompound.MEDIUM
-    else:
-        return TyreCompound.SOFT
+    used_mask = 0
+    for compound in driver.compounds_used:
+        used_mask |= 1 << COMPOUND_CODES[compound]
+    return COMPOUND_ORDER[_next_tyre_code(used_mask, weather, laps_remaining)]
 
 
 def simulate_race(
     drivers: list[DriverSim],
     total_laps: int,
-    weather_prob: float = 0.0
+    weather_prob: float = 0.0,
+    seed: Optional[int] = None,
+    record_history: bool = True,
+    pit_strategy: str = "reactive",
+    state: Optional[RaceState] = None,
+    weather_model: str = "static"
 ) -> Tuple[list[RaceResult], WeatherCondition]:
     """
     Simula uma corrida F1 completa.
     
     Args:
-        drivers: Lista de pilotos para a simulação
+        drivers: Lista de pilotos para a simulação (não são modificados)
         total_laps: Número total de voltas da corrida
         weather_prob: Probabilidade de chuva (0.0 a 1.0, onde 1.0 = chuva garantida)
+        seed: Semente opcional; com a mesma semente a corrida é idêntica. Em uma
+            série de iterações use streams.iteration_seed(seed, i) para a iteração i.
+        record_history: Se False (modo resumo), não grava lap_history/position_history
+            nem ordena o grid a cada volta; só os totais, a volta mais rápida e os
+            pit stops são calculados. Os sorteios são os mesmos nos dois modos, então
+            a mesma semente reproduz a corrida com histórico completo.
+        pit_strategy: "reactive" (decide o pit volta a volta pelo desgaste) ou
+            "planned" (segue o melhor plano de strategy.best_plan, calculado antes
+            da largada para o clima e o pit_stop_loss de cada piloto)
+        state: RaceState(drivers) reaproveitado entre iterações (opcional); é
+            reinicializado no lugar no início da corrida
+        weather_model: "static" (uma condição para a corrida toda) ou "markov"
+            (condição por volta sorteada antes da largada, multiplicador da volta
+            comum a todos os pilotos, penalidade de pneu inadequado e pit stops
+            de crossover; na estratégia planejada, quem faz crossover passa a
+            decidir volta a volta)
     
     Returns:
-        Tupla (lista de RaceResult ordenada por tempo total, WeatherCondition)
+        Tupla (lista de RaceResult ordenada por tempo total, WeatherCondition
+        da corrida; no modelo "markov", a condição com mais voltas)
     """
-    # Determina a condição climática da corrida
-    weather_condition = WeatherEngine.determine_weather(weather_prob)
+    if pit_strategy not in PIT_STRATEGIES:
+        raise ValueError(f"Estratégia de pit inválida: {pit_strategy}")
+    if weather_model not in WEATHER_MODELS:
+        raise ValueError(f"Modelo de clima inválido: {weather_model}")
+    
+    if state is None:
+        state = RaceState(drivers)
+    elif state.names != [d.name for d in drivers]:
+        raise ValueError("O RaceState informado não corresponde aos pilotos da corrida")
     
-    # Cria cópias dos pilotos para não modificar os originais
-    race_drivers = []
-    for driver in drivers:
-        driver_copy = copy.deepcopy(driver)
+    # Gerador da corrida (módulo random global se não houver semente)
+    rng = random if seed is None else random.Random(seed)
+    
+    # Determina a condição climática da corrida (ou de cada volta, sorteadas antes da largada)
+    if weather_model == "markov":
+        timeline = WeatherEngine.weather_timeline(weather_prob, total_laps, rng=rng)
+        # Multiplicador de cada volta, comum a todos os pilotos
+        lap_impacts = [
+            1.0 if condition == WeatherCondition.DRY else rng.uniform(*WeatherEngine.IMPACT_RANGES[condition])
+            for condition in timeline
+        ]
+        mismatch_rows = WeatherEngine.mismatch_penalty_table().tolist()
+        weather_condition = timeline[0]
+    else:
+        timeline = None
+        weather_condition = WeatherEngine.determine_weather(weather_prob, rng=rng)
+    
+    # Pneu de largada e, na estratégia planejada, {volta da parada: próximo composto}
+    if pit_strategy == "planned":
+        planned_stops = []
+        start_compounds = []
+        for driver in drivers:
+            plan = best_plan(weather_condition, total_laps, driver.pit_stop_loss)
+            start_compounds.append(COMPOUND_CODES[plan.compounds[0]])
+            planned_stops.append({
+                lap: COMPOUND_CODES[compound]
+                for lap, compound in zip(plan.pit_laps, plan.compounds[1:])
+            })
+    else:
+        planned_stops = None
         # Inicializa com pneu inicial (SOFT ou MEDIUM)
-        driver_copy.current_tyre = random.choice([TyreCompound.SOFT, TyreCompound.MEDIUM])
-        driver_copy.tyre_laps = 0
-        driver_copy.compounds_used = {driver_copy.current_tyre}
-        race_drivers.append(driver_copy)
+        start_compounds = [rng.choice(_START_CODES) for _ in drivers]
+        if timeline is not None and weather_condition != WeatherCondition.DRY:
+            # Clima por volta: largada com pneu de chuva se já estiver chovendo
+            rain_code = _INTER if weather_condition == WeatherCondition.MIXED else _WET
+            start_compounds = [rain_code] * len(drivers)
     
-    # Estrutura para rastrear tempos e posições a cada volta
-    driver_times = {driver.name: 0.0 for driver in race_drivers}
-    driver_results = {}
+    # Pilotos que ainda seguem o plano (um crossover abandona o plano)
+    on_plan = [planned_stops is not None] * len(drivers)
     
-    # Prepara objetos RaceResult para cada piloto
-    for driver in race_drivers:
-        driver_results[driver.name] = RaceResult(
-            driver_name=driver.name,
-            total_time=0.0,
-            laps_completed=0,
-            pit_stops=0,
-            fastest_lap=float('inf'),
-            lap_history=[],
-            position_history=[]
-        )
+    state.reset(start_compounds)
+    num_drivers = len(state)
+    lap_histories = [[] for _ in range(num_drivers)]
+    position_histories = [[] for _ in range(num_drivers)]
+    
+    # Tabelas pré-calculadas de pneus, indexadas por código de composto
+    penalty_rows = [TyreModel.get_penalty_rows(2 * total_laps + 2)[c] for c in COMPOUND_ORDER]
+    speed_bonus = TyreModel.get_speed_bonus_vector().tolist()
+    worn_laps = (TyreModel.get_max_laps_vector() * 0.8).tolist()
+    
+    # Arrays do estado (referências locais para o laço interno)
+    base_lap_time = state.base_lap_time
+    consistency = state.consistency
+    pit_stop_loss = state.pit_stop_loss
+    compound = state.compound
+    tyre_age = state.tyre_age
+    total_time = state.total_time
+    fastest_lap = state.fastest_lap
     
     # Loop por cada volta
+    lap_weather = weather_condition
     for lap in range(1, total_laps + 1):
         laps_remaining = total_laps - lap + 1
+        if timeline is not None:
+            lap_weather = timeline[lap - 1]
+            mismatch = mismatch_rows[WEATHER_CODES[lap_weather]]
+            lap_impact = lap_impacts[lap - 1]
         
         # Para cada piloto, simula a volta
-        for driver in race_drivers:
-            result = driver_results[driver.name]
-            
-            # Calcula penalidade do pneu atual
-            tyre_penalty = TyreModel.get_lap_penalty(driver.current_tyre, driver.tyre_laps)
-            tyre_bonus = TyreModel.get_speed_bonus(driver.current_tyre)
+        for i in range(num_drivers):
+            code = compound[i]
             
             # Calcula o tempo da volta: base + variação aleatória + penalidade do pneu - bônus do pneu
             lap_time = (
-                random.gauss(driver.base_lap_time, driver.consistency) +
-                tyre_penalty -
-                tyre_bonus
+                rng.gauss(base_lap_time[i], consistency[i]) +
+                penalty_rows[code][tyre_age[i]] -
+                speed_bonus[code]
             )
             
-            # Aplica impacto do clima
-            lap_time = WeatherEngine.apply_weather_impact(lap_time, weather_condition, driver_skill=1.0)
-            
-            # Adiciona ao tempo total acumulado
-            driver_times[driver.name] += lap_time
+            # Aplica impacto do clima (no modelo por volta: pneu inadequado e multiplicador da volta)
+            if timeline is None:
+                lap_time = WeatherEngine.apply_weather_impact(lap_time, weather_condition, driver_skill=1.0, rng=rng)
+            else:
+                lap_time = (lap_time + mismatch[code]) * lap_impact
             
-            # Atualiza volta mais rápida
-            if lap_time < result.fastest_lap:
-                result.fastest_lap = lap_time
+            # Adiciona ao tempo total acumulado e atualiza volta mais rápida
+            total_time[i] += lap_time
+            if lap_time < fastest_lap[i]:
+                fastest_lap[i] = lap_time
             
             # Incrementa contador de voltas do pneu
-            driver.tyre_laps += 1
+            tyre_age[i] += 1
+            
+            # Crossover: pneu inadequado ao clima da volta custa mais que o pit até o fim
+            crossover = (
+                timeline is not None and lap < total_laps and
+                mismatch[code] * (laps_remaining - 1) > pit_stop_loss[i]
+            )
+            
+            # Estratégia planejada: para nas voltas definidas antes da largada
+            if on_plan[i]:
+                if not crossover:
+                    next_tyre = planned_stops[i].get(lap)
+                    if next_tyre is not None:
+                        state.pit(i, next_tyre)
+                    continue
+                on_plan[i] = False
             
             # Decisão de pit stop (exceto na última volta)
             if lap < total_laps:
                 # Calcula se vale a pena fazer pit stop
-                # Se a penalidade do pneu atual for muito alta, faz pit stop
-                current_penalty = TyreModel.get_lap_penalty(driver.current_tyre, driver.tyre_laps)
-                
                 # Estima penalidade média para as voltas restantes se continuar com este pneu
-                estimated_future_penalty = TyreModel.get_lap_penalty(
-                    driver.current_tyre,
-                    driver.tyre_laps + laps_remaining // 2
-                )
+                estimated_future_penalty = penalty_rows[code][tyre_age[i] + laps_remaining // 2]
                 
                 # Estima tempo médio por volta com pneu novo
-                next_tyre = _choose_next_tyre(driver, weather_condition, laps_remaining - 1, driver.pit_stop_loss)
-                new_tyre_penalty = TyreModel.get_lap_penalty(next_tyre, 0)
-                new_tyre_bonus = TyreModel.get_speed_bonus(next_tyre)
-                new_tyre_avg_time = driver.base_lap_time + new_tyre_penalty - new_tyre_bonus
+                next_tyre = _next_tyre_code(state.used_mask[i], lap_weather, laps_remaining - 1)
+                new_tyre_avg_time = base_lap_time[i] + penalty_rows[next_tyre][0] - speed_bonus[next_tyre]
                 
                 # Tempo médio por volta com pneu atual
-                current_avg_time = driver.base_lap_time + estimated_future_penalty - TyreModel.get_speed_bonus(driver.current_tyre)
+                current_avg_time = base_lap_time[i] + estimated_future_penalty - speed_bonus[code]
                 
                 # Se o custo de continuar (tempo perdido por volta * voltas restantes) 
                 # for maior que o custo do pit (tempo do pit + tempo melhor nas voltas restantes)
                 cost_to_continue = (current_avg_time - new_tyre_avg_time) * laps_remaining
-                cost_to_pit = driver.pit_stop_loss
+                cost_to_pit = pit_stop_loss[i]
                 
-                # Também considera se o pneu já está muito desgastado
-                tyre_props = TyreModel.TYRE_PROPERTIES.get(driver.current_tyre, {})
-                max_laps = tyre_props.get("max_laps", 30)
-                is_tyre_worn = driver.tyre_laps >= max_laps * 0.8
+                # Também considera se o pneu já está muito desgastado (80% da vida útil)
+                is_tyre_worn = tyre_age[i] >= worn_laps[code]
                 
                 # Faz pit stop se:
                 # 1. O pneu está muito desgastado (80% da vida útil), OU
-                # 2. O custo de continuar supera o custo do pit stop
-                if is_tyre_worn or (cost_to_continue > cost_to_pit and laps_remaining > 5):
-                    # Faz pit stop
-                    driver_times[driver.name] += driver.pit_stop_loss
-                    result.pit_stops += 1
-                    
-                    # Escolhe próximo pneu
-                    next_tyre = _choose_next_tyre(driver, weather_condition, laps_remaining - 1, driver.pit_stop_loss)
-                    driver.current_tyre = next_tyre
-                    driver.tyre_laps = 0
-                    driver.compounds_used.add(next_tyre)
+                # 2. O custo de continuar supera o custo do pit stop, OU
+                # 3. O pneu não serve para o clima da volta (crossover)
+                if is_tyre_worn or crossover or (cost_to_continue > cost_to_pit and laps_remaining > 5):
+                    state.pit(i, next_tyre)
+        
+        # Modo resumo: sem histórico volta a volta
+        if not record_history:
+            continue
         
         # Após cada volta, calcula posições atuais e grava histórico
         # Ordena pilotos por tempo total atual
-        sorted_drivers = sorted(driver_times.items(), key=lambda x: x[1])
+        sorted_drivers = sorted(range(num_drivers), key=total_time.__getitem__)
         
         # Atualiza posição e histórico de cada piloto
-        for position, (driver_name, _) in enumerate(sorted_drivers, start=1):
-            result = driver_results[driver_name]
-            result.position_history.append(position)
-            result.lap_history.append(driver_times[driver_name])
+        for position, i in enumerate(sorted_drivers, start=1):
+            position_histories[i].append(position)
+            lap_histories[i].append(total_time[i])
     
     # Finaliza resultados
-    results = []
-    for driver in race_drivers:
-        result = driver_results[driver.name]
-        result.total_time = driver_times[driver.name]
-        result.laps_completed = total_laps
-        results.append(result)
+    results = [
+        RaceResult(
+            driver_name=state.names[i],
+            total_time=total_time[i],
+            laps_completed=total_laps,
+            pit_stops=state.pit_stops[i],
+            fastest_lap=fastest_lap[i],
+            lap_history=lap_histories[i],
+            position_history=position_histories[i]
+        )
+        for i in range(num_drivers)
+    ]
     
     # Ordena por tempo total (menor tempo vence)
     results.sort(key=lambda x: x.total_time)
@@ -234,6 +311,10 @@ def simulate_race(
         result.fantasy_points = F1_POINTS_SYSTEM.get(position, 0)
         result.position = position
     
+    if timeline is not None:
+        # Condição com mais voltas (empate: a mais úmida), como no motor vetorizado
+        weather_condition = max(reversed(WEATHER_ORDER), key=timeline.count)
+    
     return results, weather_condition
 
 
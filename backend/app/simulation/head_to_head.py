@@ -0,0 +1,75 @@
+"""
+Confronto direto entre pilotos ("quem termina à frente?").
+
+A contagem é feita por comparação vetorizada das posições de cada lote
+(iterações × pilotos), no mesmo passo que vitórias e pódios; o resultado é
+uma matriz de contagens inteiras somável entre lotes e shards. A disputa entre
+companheiros de equipe é a submatriz de cada equipe.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Casas decimais das probabilidades na resposta
+PROBABILITY_DECIMALS = 4
+
+
+def ahead_counts(positions: np.ndarray) -> np.ndarray:
+    """
+    Corridas em que cada piloto terminou à frente de cada outro.
+
+    Args:
+        positions: Posições finais (iterações × pilotos)
+
+    Returns:
+        Array (pilotos × pilotos, int64): counts[a, b] = corridas em que a
+        terminou à frente de b (diagonal zero)
+    """
+    return (positions[:, :, None] < positions[:, None, :]).sum(axis=0, dtype=np.int64)
+
+
+def _probabilities(counts: np.ndarray, iterations: int) -> List[List[float]]:
+    return np.round(counts / max(iterations, 1), PROBABILITY_DECIMALS).tolist()
+
+
+def summarize_head_to_head(
+    driver_names: Sequence[str],
+    counts: np.ndarray,
+    iterations: int,
+    teams: Optional[Sequence[Optional[str]]] = None
+) -> Dict:
+    """
+    Bloco head_to_head da resposta de /run.
+
+    Args:
+        driver_names: Nomes dos pilotos (linhas e colunas de `counts`)
+        counts: Contagens de ahead_counts acumuladas
+        iterations: Número de corridas
+        teams: Equipe de cada piloto (None = sem equipe); sem equipes, não há
+            disputas entre companheiros
+
+    Returns:
+        {"drivers": [...], "matrix": [[...]], "teammate_battles": [{"team",
+        "drivers", "matrix"}]}, onde matrix[a][b] é a probabilidade de a
+        terminar à frente de b
+    """
+    battles = []
+    if teams is not None:
+        members: Dict[str, List[int]] = {}
+        for i, team in enumerate(teams):
+            if team is not None:
+                members.setdefault(team, []).append(i)
+        for team, index in members.items():
+            if len(index) < 2:
+                continue
+            battles.append({
+                "team": team,
+                "drivers": [driver_names[i] for i in index],
+                "matrix": _probabilities(counts[np.ix_(index, index)], iterations)
+            })
+
+    return {
+        "drivers": list(driver_names),
+        "matrix": _probabilities(counts, iterations),
+        "teammate_battles": battles
+    }
@@ -0,0 +1,180 @@
+"""
+Jobs de simulação executados em segundo plano.
+
+Um job recebe uma função que faz o trabalho pesado (que por sua vez usa o pool
+de processos do runner) e roda em um pool de threads próprio, fora do event
+loop da API. A função recebe um callback `progress` para publicar agregados
+parciais a cada rodada de iterações; o estado do job (status, parcial,
+resultado ou erro) pode ser consultado por id ou acompanhado por eventos.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+# Estados de um job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+
+class JobQueueFull(Exception):
+    """Jobs não concluídos (na fila ou em execução) já atingiram max_jobs."""
+
+
+@dataclass
+class SimulationJob:
+    """
+    Estado de um job de simulação.
+
+    Attributes:
+        id: Identificador do job
+        status: queued, running, done ou failed
+        created_at: Criação (time.time())
+        updated_at: Última atualização (time.time())
+        progress: Último agregado parcial publicado (ou None)
+        result: Resultado final (quando done)
+        error: {"status_code": int, "detail": str} (quando failed)
+        version: Incrementado a cada atualização (para detectar mudanças)
+    """
+    id: str
+    status: str = JOB_QUEUED
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    progress: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    version: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação serializável em JSON."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobManager:
+    """Registro de jobs em memória com execução em um pool de threads."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_jobs: Optional[int] = None
+    ):
+        """
+        Args:
+            max_workers: Jobs executados ao mesmo tempo (padrão: settings.SIMULATION_JOB_WORKERS)
+            ttl: Segundos que um job concluído fica disponível (padrão: settings.SIMULATION_JOB_TTL)
+            max_jobs: Máximo de jobs guardados e de jobs não concluídos
+                (padrão: settings.SIMULATION_MAX_JOBS)
+        """
+        self.ttl = settings.SIMULATION_JOB_TTL if ttl is None else ttl
+        self.max_jobs = settings.SIMULATION_MAX_JOBS if max_jobs is None else max_jobs
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.SIMULATION_JOB_WORKERS if max_workers is None else max_workers,
+            thread_name_prefix="simulation-job"
+        )
+        self._jobs: Dict[str, SimulationJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> SimulationJob:
+        """
+        Enfileira um job.
+
+        Args:
+            fn: Função executada no pool; recebe `progress=callback(parcial)`
+                além de `args`/`kwargs` e devolve o resultado final
+            *args, **kwargs: Argumentos de `fn`
+
+        Returns:
+            SimulationJob criado (status queued)
+
+        Raises:
+            JobQueueFull: Já há max_jobs jobs na fila ou em execução
+        """
+        now = time.time()
+        job = SimulationJob(id=uuid.uuid4().hex, created_at=now, updated_at=now)
+        with self._lock:
+            self._purge(now)
+            # Só jobs concluídos podem ser removidos: os pendentes limitam a fila
+            pending = sum(1 for queued in self._jobs.values() if not queued.finished)
+            if pending >= self.max_jobs:
+                raise JobQueueFull(f"Limite de {self.max_jobs} jobs pendentes atingido")
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[SimulationJob]:
+        """Retorna o job (ou None se não existir ou tiver expirado)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _update(self, job: SimulationJob, **changes: Any) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.updated_at = time.time()
+            job.version += 1
+
+    def _run(self, job: SimulationJob, fn: Callable, args: tuple, kwargs: dict) -> None:
+        self._update(job, status=JOB_RUNNING)
+        try:
+            result = fn(*args, progress=lambda partial: self._update(job, progress=partial), **kwargs)
+        except Exception as e:
+            # HTTPException e afins carregam status_code/detail
+            self._update(job, status=JOB_FAILED, error={
+                "status_code": getattr(e, "status_code", 500),
+                "detail": getattr(e, "detail", str(e))
+            })
+        else:
+            self._update(job, status=JOB_DONE, result=result)
+
+    def _purge(self, now: float) -> None:
+        """Remove jobs concluídos expirados e, se necessário, os concluídos mais antigos."""
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.updated_at > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished),
+            key=lambda job: job.updated_at
+        )
+        excess = len(self._jobs) - self.max_jobs + 1
+        for job in finished[:max(0, excess)]:
+            del self._jobs[job.id]
+
+    def shutdown(self) -> None:
+        """Encerra o pool de threads (jobs em execução terminam normalmente)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """Retorna o gerenciador de jobs compartilhado do processo (criado na primeira chamada)."""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager()
+    return _job_manager
@@ -1,8 +1,10 @@
 """
 Modelos de dados para simulação de corrida F1.
 """
+import copy
 from dataclasses import dataclass, field
-from typing import Set
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
 from .tyres import TyreCompound
 
 
@@ -21,6 +23,8 @@ class DriverSim:
         current_tyre: Composto de pneu atual
         tyre_laps: Número de voltas com o pneu atual
         compounds_used: Set de compostos já utilizados na corrida (para validar regra de 2 compostos)
+        team: Equipe (construtor) do piloto, usada na pontuação de Fantasy
+            (companheiro de equipe e construtores); None = sem equipe conhecida
     """
     name: str
     base_lap_time: float
@@ -30,6 +34,83 @@ class DriverSim:
     current_tyre: TyreCompound = TyreCompound.SOFT
     tyre_laps: int = 0
     compounds_used: Set[TyreCompound] = field(default_factory=set)
+    team: Optional[str] = None
+
+
+class RaceState:
+    """
+    Estado compacto dos carros durante uma corrida (um array por atributo).
+    
+    Substitui as cópias de DriverSim no laço do motor escalar: os parâmetros
+    fixos são lidos uma vez dos pilotos e o estado mutável (composto, idade do
+    pneu, compostos usados, tempos) é reinicializado no lugar a cada corrida
+    com reset(), sem alocar novos objetos por iteração.
+    
+    Attributes:
+        names: Nomes dos pilotos (define a ordem dos arrays)
+        base_lap_time: Tempo base de volta por piloto
+        consistency: Desvio padrão do tempo de volta por piloto
+        pit_stop_loss: Tempo perdido no pit stop por piloto
+        compound: Código do composto atual (COMPOUND_CODES)
+        tyre_age: Voltas com o pneu atual
+        used_mask: Máscara de bits dos compostos já utilizados (bit = código)
+        total_time: Tempo total acumulado
+        pit_stops: Número de pit stops realizados
+        fastest_lap: Volta mais rápida
+    """
+    __slots__ = (
+        "names", "base_lap_time", "consistency", "pit_stop_loss",
+        "compound", "tyre_age", "used_mask", "total_time", "pit_stops", "fastest_lap"
+    )
+    
+    def __init__(self, drivers: List[DriverSim]):
+        """
+        Args:
+            drivers: Pilotos da corrida (não são modificados)
+        """
+        num_drivers = len(drivers)
+        self.names = [d.name for d in drivers]
+        self.base_lap_time = [d.base_lap_time for d in drivers]
+        self.consistency = [d.consistency for d in drivers]
+        self.pit_stop_loss = [d.pit_stop_loss for d in drivers]
+        self.compound = [0] * num_drivers
+        self.tyre_age = [0] * num_drivers
+        self.used_mask = [0] * num_drivers
+        self.total_time = [0.0] * num_drivers
+        self.pit_stops = [0] * num_drivers
+        self.fastest_lap = [float('inf')] * num_drivers
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def reset(self, start_compounds: List[int]) -> None:
+        """
+        Reinicializa o estado mutável para uma nova corrida.
+        
+        Args:
+            start_compounds: Código do composto de largada de cada piloto
+        """
+        num_drivers = len(self.names)
+        self.compound[:] = start_compounds
+        self.tyre_age[:] = [0] * num_drivers
+        self.used_mask[:] = [1 << code for code in start_compounds]
+        self.total_time[:] = [0.0] * num_drivers
+        self.pit_stops[:] = [0] * num_drivers
+        self.fastest_lap[:] = [float('inf')] * num_drivers
+    
+    def pit(self, index: int, compound: int) -> None:
+        """
+        Registra um pit stop: soma o tempo perdido e coloca pneus novos.
+        
+        Args:
+            index: Índice do piloto
+            compound: Código do novo composto
+        """
+        self.total_time[index] += self.pit_stop_loss[index]
+        self.pit_stops[index] += 1
+        self.compound[index] = compound
+        self.tyre_age[index] = 0
+        self.used_mask[index] |= 1 << compound
 
 
 @dataclass
@@ -65,3 +146,175 @@ class RaceResult:
         if self.position_history is None:
             self.position_history = []
 
+
+@dataclass(frozen=True)
+class PitPlan:
+    """
+    Estratégia de pneus planejada antes da corrida.
+    
+    Attributes:
+        compounds: Composto de cada stint, em ordem (o primeiro é o pneu de largada)
+        pit_laps: Voltas ao final das quais o piloto para (uma por troca)
+        expected_time: Tempo estimado perdido com desgaste, bônus dos compostos e
+            pit stops (em segundos, sem o tempo base de volta)
+    """
+    compounds: Tuple[TyreCompound, ...]
+    pit_laps: Tuple[int, ...]
+    expected_time: float
+    
+    @property
+    def stops(self) -> int:
+        """Número de pit stops do plano."""
+        return len(self.pit_laps)
+
+
+@dataclass(frozen=True)
+class SweepScenario:
+    """
+    Cenário de uma varredura (sweep) de parâmetros da corrida.
+    
+    Attributes:
+        weather_prob: Probabilidade de chuva (0.0 a 1.0)
+        total_laps: Número total de voltas
+        pit_stop_loss: Tempo perdido no pit stop aplicado a todos os pilotos
+            (None = o valor de cada DriverSim)
+    """
+    weather_prob: float
+    total_laps: int
+    pit_stop_loss: Optional[float] = None
+
+
+@dataclass
+class FantasyDistribution:
+    """
+    Distribuição da pontuação de Fantasy por piloto e por construtor.
+    
+    As pontuações são inteiras e limitadas, então a distribuição é guardada
+    como histogramas exatos (contagem de corridas por pontuação), somáveis
+    entre lotes e shards com merge(); média e percentis saem dos histogramas.
+    
+    Attributes:
+        driver_names: Nomes dos pilotos (linhas de driver_counts)
+        constructor_names: Nomes dos construtores (linhas de constructor_counts)
+        offset: Pontuação da primeira coluna dos histogramas
+        driver_counts: Corridas por pontuação (pilotos × pontuações)
+        constructor_counts: Corridas por pontuação (construtores × pontuações)
+    """
+    driver_names: List[str]
+    constructor_names: List[str]
+    offset: int
+    driver_counts: np.ndarray
+    constructor_counts: np.ndarray
+    
+    def merge(self, other: "FantasyDistribution") -> "FantasyDistribution":
+        """Soma os histogramas de outro conjunto de corridas (mesmos pilotos e faixa)."""
+        if other.offset != self.offset or other.driver_counts.shape != self.driver_counts.shape:
+            raise ValueError("Não é possível combinar distribuições de Fantasy diferentes")
+        self.driver_counts += other.driver_counts
+        self.constructor_counts += other.constructor_counts
+        return self
+
+
+@dataclass
+class MonteCarloStats:
+    """
+    Estatísticas agregadas de um conjunto de corridas simuladas.
+    
+    Todos os contadores são inteiros, de modo que parciais (lotes ou shards)
+    podem ser somados com merge() sem perda de precisão.
+    
+    Attributes:
+        driver_names: Nomes dos pilotos (define a ordem dos arrays)
+        iterations: Número de corridas simuladas
+        wins: Vitórias por piloto
+        podiums: Pódios (P1-P3) por piloto
+        positions_sum: Soma das posições finais por piloto
+        points_sum: Soma dos pontos (F1_POINTS_SYSTEM) por piloto
+        weather_counts: Contagem de corridas por condição climática ({"DRY": n, ...})
+        group_size_sq: Soma dos quadrados dos tamanhos dos grupos de corridas
+            (pares antitéticos ou corridas isoladas)
+        wins_sq: Soma, por grupo, do quadrado das vitórias no grupo (por piloto)
+        wins_weighted: Soma, por grupo, de tamanho do grupo × vitórias no grupo
+        podiums_sq: Como wins_sq, para pódios
+        podiums_weighted: Como wins_weighted, para pódios
+        fantasy: Distribuição da pontuação de Fantasy (None se não calculada)
+        finishing_positions: Posição final de cada piloto em cada corrida
+            (iterações × pilotos, uint8, na ordem global das iterações); None
+            se não registrada
+        ahead_counts: Corridas em que cada piloto terminou à frente de cada
+            outro (pilotos × pilotos); None se não calculado
+    
+    Os momentos por grupo permitem estimar a variância das probabilidades de
+    vitória e pódio quando as corridas não são independentes (variáveis
+    antitéticas) e, com ela, o tamanho efetivo da amostra (precision.py).
+    """
+    driver_names: list[str]
+    iterations: int = 0
+    wins: np.ndarray = None
+    podiums: np.ndarray = None
+    positions_sum: np.ndarray = None
+    points_sum: np.ndarray = None
+    weather_counts: Dict[str, int] = field(default_factory=dict)
+    group_size_sq: int = 0
+    wins_sq: np.ndarray = None
+    wins_weighted: np.ndarray = None
+    podiums_sq: np.ndarray = None
+    podiums_weighted: np.ndarray = None
+    fantasy: Optional[FantasyDistribution] = None
+    finishing_positions: Optional[np.ndarray] = None
+    ahead_counts: Optional[np.ndarray] = None
+    
+    # Contadores por piloto (somados em merge)
+    _COUNTERS = (
+        "wins", "podiums", "positions_sum", "points_sum",
+        "wins_sq", "wins_weighted", "podiums_sq", "podiums_weighted"
+    )
+    
+    def __post_init__(self):
+        """Inicializa contadores zerados se não fornecidos."""
+        num_drivers = len(self.driver_names)
+        for name in self._COUNTERS:
+            if getattr(self, name) is None:
+                setattr(self, name, np.zeros(num_drivers, dtype=np.int64))
+    
+    def merge(self, other: "MonteCarloStats") -> "MonteCarloStats":
+        """
+        Soma as estatísticas de outro conjunto de corridas (mesmos pilotos).
+        
+        As posições finais de `other` (se registradas) são acrescentadas depois
+        das atuais, então os parciais devem ser combinados na ordem das iterações.
+        
+        Args:
+            other: Estatísticas parciais a acumular
+        
+        Returns:
+            A própria instância (para encadeamento)
+        """
+        if list(other.driver_names) != list(self.driver_names):
+            raise ValueError("Não é possível combinar estatísticas de grids diferentes")
+        
+        self.iterations += other.iterations
+        self.group_size_sq += other.group_size_sq
+        for name in self._COUNTERS:
+            counter = getattr(self, name)
+            counter += getattr(other, name)
+        for condition, count in other.weather_counts.items():
+            self.weather_counts[condition] = self.weather_counts.get(condition, 0) + count
+        if other.fantasy is not None:
+            if self.fantasy is None:
+                self.fantasy = copy.deepcopy(other.fantasy)
+            else:
+                self.fantasy.merge(other.fantasy)
+        if other.ahead_counts is not None:
+            if self.ahead_counts is None:
+                self.ahead_counts = other.ahead_counts.copy()
+            else:
+                self.ahead_counts += other.ahead_counts
+        if other.finishing_positions is not None:
+            # Parciais chegam na ordem das iterações (lotes, shards e rodadas)
+            if self.finishing_positions is None:
+                self.finishing_positions = other.finishing_positions.copy()
+            else:
+                self.finishing_positions = np.concatenate([self.finishing_positions, other.finishing_positions])
+        
+        return self
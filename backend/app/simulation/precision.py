@@ -0,0 +1,308 @@
+"""
+Precisão das estimativas Monte Carlo e parada antecipada adaptativa.
+
+As probabilidades de vitória e de pódio são proporções, então a precisão de
+cada uma é dada pelo intervalo de confiança de Wilson (bem comportado mesmo
+com probabilidades próximas de 0 ou 1). O modo adaptativo simula em rodadas
+até que a meia-largura dos intervalos dos pilotos do topo fique abaixo da
+tolerância pedida, ou até esgotar o tempo ou o limite de iterações.
+
+Com redução de variância (streams.VarianceReduction), as corridas deixam de
+ser independentes; os intervalos usam então o tamanho efetivo da amostra,
+estimado pela variância entre pares antitéticos. Os ganhos da estratificação
+do clima não são creditados nessa estimativa (que fica conservadora).
+"""
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from .models import DriverSim, MonteCarloStats
+from .runner import STOP_COMPLETED, STOP_MAX_ITERATIONS, STOP_TIME_BUDGET, run_in_rounds
+from .streams import INDEPENDENT_SAMPLING, SEED_BLOCK_SIZE, VarianceReduction
+
+# Número de pilotos do topo (por vitórias) cuja precisão define a parada
+DEFAULT_TOP_DRIVERS = 3
+
+# Iterações da primeira rodada do modo adaptativo
+INITIAL_ROUND = 4 * SEED_BLOCK_SIZE
+
+# Motivos de parada reportados (além de runner.STOP_TIME_BUDGET e STOP_MAX_ITERATIONS)
+STOP_TOLERANCE = "tolerance"
+STOP_FIXED = "fixed_iterations"
+
+# Limite do tamanho efetivo da amostra, em múltiplos das iterações (quando a
+# variância estimada é nula, ex: pares antitéticos sempre divididos)
+MAX_ESS_RATIO = 100.0
+
+
+def z_score(confidence: float) -> float:
+    """Quantil da normal padrão para um intervalo bilateral com o nível de confiança dado."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def wilson_interval(
+    successes: np.ndarray,
+    trials: int,
+    confidence: float = 0.95,
+    effective_trials: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intervalo de confiança de Wilson para proporções.
+
+    Args:
+        successes: Contagem de sucessos por piloto
+        trials: Número de corridas
+        confidence: Nível de confiança (ex: 0.95)
+        effective_trials: Tamanho efetivo da amostra por piloto (opcional; com
+            corridas correlacionadas, substitui `trials` na largura do intervalo)
+
+    Returns:
+        Tupla (limite inferior, limite superior), arrays do mesmo formato de `successes`
+    """
+    z = z_score(confidence)
+    p = np.asarray(successes, dtype=np.float64) / trials
+    if effective_trials is not None:
+        trials = np.asarray(effective_trials, dtype=np.float64)
+    denominator = 1.0 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    half_width = z * np.sqrt(p * (1.0 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return center - half_width, center + half_width
+
+
+def effective_sample_size(
+    stats: MonteCarloStats,
+    successes: np.ndarray,
+    successes_sq: np.ndarray,
+    successes_weighted: np.ndarray
+) -> np.ndarray:
+    """
+    Tamanho efetivo da amostra de uma proporção estimada por grupos de corridas.
+
+    Compara a variância entre grupos (pares antitéticos ou corridas isoladas)
+    com a de corridas independentes: ESS = n × n p (1 - p) / Σ (w_g - p n_g)².
+    Com corridas independentes, ESS = n.
+
+    Args:
+        stats: Estatísticas agregadas (iterações e group_size_sq)
+        successes: Contagem de sucessos por piloto (ex: stats.wins)
+        successes_sq: Momentos por grupo correspondentes (ex: stats.wins_sq)
+        successes_weighted: Idem (ex: stats.wins_weighted)
+
+    Returns:
+        Array de tamanhos efetivos por piloto (limitado a MAX_ESS_RATIO × n; igual
+        a n quando p é 0 ou 1)
+    """
+    n = stats.iterations
+    p = np.asarray(successes, dtype=np.float64) / n
+    residual = successes_sq - 2.0 * p * successes_weighted + p * p * stats.group_size_sq
+    independent = n * p * (1.0 - p)
+
+    ratio = np.full(p.shape, MAX_ESS_RATIO)
+    np.divide(independent, residual, out=ratio, where=residual > 1e-9)
+    ratio = np.minimum(ratio, MAX_ESS_RATIO)
+    return np.where(independent > 0, n * ratio, float(n))
+
+
+def effective_sample_sizes(stats: MonteCarloStats) -> Tuple[np.ndarray, np.ndarray]:
+    """Tamanhos efetivos por piloto das probabilidades de vitória e de pódio."""
+    return (
+        effective_sample_size(stats, stats.wins, stats.wins_sq, stats.wins_weighted),
+        effective_sample_size(stats, stats.podiums, stats.podiums_sq, stats.podiums_weighted)
+    )
+
+
+@dataclass
+class PrecisionReport:
+    """
+    Precisão alcançada por uma execução Monte Carlo.
+
+    Attributes:
+        confidence: Nível de confiança dos intervalos
+        tolerance: Meia-largura máxima pedida (None no modo de iterações fixas)
+        max_half_width: Maior meia-largura entre os intervalos dos pilotos do topo
+        converged: Se a tolerância foi atingida
+        stop_reason: Motivo da parada (tolerance, time_budget, max_iterations ou fixed_iterations)
+        rounds: Número de rodadas simuladas
+        drivers: Intervalos por piloto do topo:
+            {nome: {"win": [inf, sup], "podium": [inf, sup]}}
+        effective_sample_size: Menor tamanho efetivo da amostra entre as
+            probabilidades avaliadas (igual às iterações sem redução de variância)
+    """
+    confidence: float
+    tolerance: Optional[float]
+    max_half_width: float
+    converged: bool
+    stop_reason: str
+    rounds: int = 1
+    drivers: Dict[str, Dict[str, List[float]]] = field(default_factory=dict)
+    effective_sample_size: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Representação serializável em JSON (valores arredondados)."""
+        return {
+            "confidence": self.confidence,
+            "tolerance": self.tolerance,
+            "max_half_width": round(self.max_half_width, 4),
+            "converged": self.converged,
+            "stop_reason": self.stop_reason,
+            "rounds": self.rounds,
+            "effective_sample_size": round(self.effective_sample_size),
+            "drivers": {
+                name: {kind: [round(bound, 4) for bound in bounds] for kind, bounds in intervals.items()}
+                for name, intervals in self.drivers.items()
+            }
+        }
+
+
+def _top_driver_intervals(
+    stats: MonteCarloStats,
+    confidence: float,
+    top_drivers: int
+) -> Tuple[float, Dict[str, Dict[str, List[float]]], float]:
+    """
+    Intervalos de vitória e pódio dos pilotos com mais vitórias.
+
+    Returns:
+        Tupla (maior meia-largura, {nome: {"win": [inf, sup], "podium": [inf, sup]}},
+        menor tamanho efetivo da amostra)
+    """
+    top = np.argsort(-stats.wins, kind="stable")[:top_drivers]
+    win_ess, podium_ess = (ess[top] for ess in effective_sample_sizes(stats))
+    win_low, win_high = wilson_interval(stats.wins[top], stats.iterations, confidence, win_ess)
+    podium_low, podium_high = wilson_interval(stats.podiums[top], stats.iterations, confidence, podium_ess)
+
+    max_half_width = float(max(np.max(win_high - win_low), np.max(podium_high - podium_low)) / 2.0)
+    intervals = {
+        stats.driver_names[index]: {
+            "win": [float(win_low[k]), float(win_high[k])],
+            "podium": [float(podium_low[k]), float(podium_high[k])]
+        }
+        for k, index in enumerate(top)
+    }
+    # Probabilidades 0 ou 1 não têm variância (ESS = n) e não entram no mínimo
+    counts = np.concatenate([stats.wins[top], stats.podiums[top]])
+    ess = np.concatenate([win_ess, podium_ess])[(counts > 0) & (counts < stats.iterations)]
+    return max_half_width, intervals, float(ess.min()) if ess.size else float(stats.iterations)
+
+
+def measure_precision(
+    stats: MonteCarloStats,
+    confidence: float = 0.95,
+    tolerance: Optional[float] = None,
+    stop_reason: str = STOP_FIXED,
+    rounds: int = 1,
+    top_drivers: int = DEFAULT_TOP_DRIVERS
+) -> PrecisionReport:
+    """
+    Calcula a precisão alcançada por um conjunto de corridas simuladas.
+
+    Args:
+        stats: Estatísticas agregadas
+        confidence: Nível de confiança dos intervalos
+        tolerance: Meia-largura máxima pedida (opcional)
+        stop_reason: Motivo da parada a reportar
+        rounds: Número de rodadas simuladas
+        top_drivers: Quantos pilotos do topo (por vitórias) avaliar
+
+    Returns:
+        PrecisionReport com os intervalos dos pilotos do topo
+    """
+    max_half_width, intervals, ess = _top_driver_intervals(stats, confidence, top_drivers)
+    return PrecisionReport(
+        confidence=confidence,
+        tolerance=tolerance,
+        max_half_width=max_half_width,
+        converged=tolerance is not None and max_half_width <= tolerance,
+        stop_reason=stop_reason,
+        rounds=rounds,
+        drivers=intervals,
+        effective_sample_size=ess
+    )
+
+
+def _next_round_size(stats: MonteCarloStats, tolerance: float, confidence: float, top_drivers: int) -> int:
+    """
+    Estima quantas iterações adicionais levam a meia-largura até a tolerância.
+
+    Usa a aproximação normal n = z² p (1 - p) / tol² para o pior intervalo dos
+    pilotos do topo, corrigida pela razão iterações / tamanho efetivo; a
+    rodada é limitada ao dobro das iterações já feitas.
+    """
+    top = np.argsort(-stats.wins, kind="stable")[:top_drivers]
+    p = np.concatenate([stats.wins[top], stats.podiums[top]]) / stats.iterations
+    ess = np.concatenate([sizes[top] for sizes in effective_sample_sizes(stats)])
+    design_effect = stats.iterations / ess
+    needed = z_score(confidence) ** 2 * float(np.max(p * (1.0 - p) * design_effect)) / tolerance ** 2
+
+    return int(min(max(needed - stats.iterations, SEED_BLOCK_SIZE), stats.iterations))
+
+
+def run_until_precise(
+    drivers: List[DriverSim],
+    total_laps: int,
+    tolerance: float,
+    weather_prob: float = 0.0,
+    seed: Optional[int] = None,
+    confidence: float = 0.95,
+    max_iterations: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    top_drivers: int = DEFAULT_TOP_DRIVERS,
+    pit_strategy: str = "reactive",
+    on_round: Optional[Callable[[MonteCarloStats], None]] = None,
+    variance_reduction: VarianceReduction = INDEPENDENT_SAMPLING,
+    weather_model: str = "static",
+    fantasy: bool = False,
+    record_positions: bool = False,
+    head_to_head: bool = False
+) -> Tuple[MonteCarloStats, PrecisionReport]:
+    """
+    Simula em rodadas até que os intervalos dos pilotos do topo fiquem estreitos.
+
+    As rodadas são executadas por runner.run_in_rounds, então o resultado com N
+    iterações é idêntico ao de uma execução fixa com N iterações e a mesma semente.
+
+    Args:
+        drivers: Lista de pilotos para a simulação
+        total_laps: Número total de voltas da corrida
+        tolerance: Meia-largura máxima dos intervalos de vitória e pódio (ex: 0.01 = ±1 p.p.)
+        weather_prob: Probabilidade de chuva (0.0 a 1.0)
+        seed: Semente da execução (None = entropia do sistema)
+        confidence: Nível de confiança dos intervalos
+        max_iterations: Limite de iterações (padrão: settings.SIMULATION_MAX_ITERATIONS)
+        time_budget: Tempo máximo em segundos (padrão: settings.SIMULATION_ADAPTIVE_TIME_BUDGET)
+        top_drivers: Quantos pilotos do topo (por vitórias) devem atingir a tolerância
+        pit_strategy: "reactive" ou "planned" (ver engine.simulate_race)
+        on_round: Função chamada com as estatísticas acumuladas a cada rodada
+        variance_reduction: Técnicas de redução de variância (ver streams.VarianceReduction);
+            com variáveis antitéticas, a tolerância costuma ser atingida com menos iterações
+        weather_model: "static" ou "markov" (ver engine.simulate_race)
+        fantasy: Inclui a distribuição da pontuação de Fantasy (MonteCarloStats.fantasy)
+        record_positions: Inclui a matriz de posições finais (MonteCarloStats.finishing_positions)
+        head_to_head: Inclui as contagens de confronto direto (MonteCarloStats.ahead_counts)
+
+    Returns:
+        Tupla (MonteCarloStats acumulado, PrecisionReport)
+    """
+    if time_budget is None:
+        time_budget = settings.SIMULATION_ADAPTIVE_TIME_BUDGET
+
+    def next_round(stats: MonteCarloStats) -> Optional[int]:
+        max_half_width, _, _ = _top_driver_intervals(stats, confidence, top_drivers)
+        if max_half_width <= tolerance:
+            return None
+        return _next_round_size(stats, tolerance, confidence, top_drivers)
+
+    stats, stop_reason, rounds = run_in_rounds(
+        drivers, total_laps, time_budget, weather_prob, seed=seed,
+        max_iterations=max_iterations, pit_strategy=pit_strategy,
+        first_round=INITIAL_ROUND, next_round=next_round, on_round=on_round,
+        variance_reduction=variance_reduction, weather_model=weather_model, fantasy=fantasy,
+        record_positions=record_positions, head_to_head=head_to_head
+    )
+    if stop_reason == STOP_COMPLETED:
+        stop_reason = STOP_TOLERANCE
+
+    return stats, measure_precision(stats, confidence, tolerance, stop_reason, rounds, top_drivers)
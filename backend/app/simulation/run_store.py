@@ -0,0 +1,257 @@
+"""
+Armazenamento e consulta das matrizes de posições finais das execuções.
+
+Cada execução de /run com store_positions grava a posição final de cada piloto
+em cada corrida (iterações × pilotos, uint8: 100.000 corridas de 20 pilotos
+ocupam ~2 MB) em `<run_id>.npy`, com os nomes dos pilotos e os parâmetros da
+execução em `<run_id>.json`. As consultas abrem a matriz com memory-map e
+respondem confronto direto, histograma de posições e probabilidades de top-N
+sem refazer a simulação.
+"""
+import json
+import os
+import re
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from .head_to_head import ahead_counts
+
+# Corridas processadas por bloco no confronto direto (limita a matriz booleana temporária)
+HEAD_TO_HEAD_CHUNK = 8192
+
+_RUN_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class StoredRun:
+    """
+    Execução armazenada.
+
+    Attributes:
+        run_id: Identificador da execução
+        driver_names: Nomes dos pilotos (colunas da matriz)
+        positions: Posição final (1 = vencedor) de cada piloto em cada corrida
+            (iterações × pilotos, uint8; memory-map somente leitura)
+        metadata: Parâmetros da execução (pista, semente, iterações etc.)
+    """
+    run_id: str
+    driver_names: List[str]
+    positions: np.ndarray
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def columns(self, drivers: Optional[Sequence[str]] = None) -> List[int]:
+        """
+        Colunas da matriz dos pilotos pedidos (todos, se None).
+
+        Raises:
+            KeyError: Piloto que não participou da execução
+        """
+        if drivers is None:
+            return list(range(len(self.driver_names)))
+        missing = [name for name in drivers if name not in self.driver_names]
+        if missing:
+            raise KeyError(f"Pilotos fora da execução: {', '.join(missing)}")
+        return [self.driver_names.index(name) for name in drivers]
+
+
+def position_counts(positions: np.ndarray) -> np.ndarray:
+    """
+    Número de corridas em cada posição, por piloto (um só bincount).
+
+    Args:
+        positions: Posições finais (iterações × pilotos)
+
+    Returns:
+        Array (pilotos × posições): counts[i, p - 1] = corridas de i em P`p`
+    """
+    num_drivers = positions.shape[1]
+    keys = positions.astype(np.int64) - 1 + np.arange(num_drivers) * num_drivers
+    return np.bincount(keys.ravel(), minlength=num_drivers * num_drivers).reshape(num_drivers, num_drivers)
+
+
+def top_n_probabilities(positions: np.ndarray, n: int) -> np.ndarray:
+    """Probabilidade de cada piloto terminar entre os `n` primeiros."""
+    iterations = max(positions.shape[0], 1)
+    return (positions <= n).sum(axis=0) / iterations
+
+
+def joint_top_n_probability(positions: np.ndarray, n: int, columns: Sequence[int]) -> float:
+    """Probabilidade de todos os pilotos de `columns` terminarem entre os `n` primeiros na mesma corrida."""
+    if positions.shape[0] == 0:
+        return 0.0
+    return float((positions[:, list(columns)] <= n).all(axis=1).mean())
+
+
+def head_to_head_matrix(positions: np.ndarray, columns: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Matriz de confronto direto.
+
+    Args:
+        positions: Posições finais (iterações × pilotos)
+        columns: Pilotos considerados (padrão: todos)
+
+    Returns:
+        Array (k × k): h[a, b] = fração das corridas em que o piloto a
+        terminou à frente do piloto b (diagonal zero)
+    """
+    if columns is not None:
+        positions = positions[:, list(columns)]
+    iterations, num_drivers = positions.shape
+    ahead = np.zeros((num_drivers, num_drivers), dtype=np.int64)
+    for start in range(0, iterations, HEAD_TO_HEAD_CHUNK):
+        ahead += ahead_counts(np.asarray(positions[start:start + HEAD_TO_HEAD_CHUNK]))
+    return ahead / max(iterations, 1)
+
+
+class RunStore:
+    """
+    Diretório de matrizes de posições finais, com remoção das menos usadas
+    (mtime) quando o tamanho total passa do limite.
+
+    As gravações são atômicas (arquivo temporário + rename), como no cache de
+    resultados.
+    """
+
+    def __init__(self, directory: Optional[str] = None, disk_bytes: Optional[int] = None):
+        """
+        Args:
+            directory: Diretório das execuções (padrão: settings.SIMULATION_RUNS_DIR)
+            disk_bytes: Tamanho máximo em bytes (padrão: settings.SIMULATION_RUNS_DISK_BYTES)
+        """
+        self.directory = settings.SIMULATION_RUNS_DIR if directory is None else directory
+        self.disk_bytes = settings.SIMULATION_RUNS_DISK_BYTES if disk_bytes is None else disk_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, run_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{run_id}.{extension}")
+
+    def _write(self, path: str, write: Any) -> None:
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            write(f)
+        os.replace(temporary, path)
+
+    def save(self, positions: np.ndarray, driver_names: List[str], metadata: Optional[Dict] = None) -> str:
+        """
+        Grava a matriz de uma execução.
+
+        Args:
+            positions: Posições finais (iterações × pilotos)
+            driver_names: Nomes dos pilotos (colunas)
+            metadata: Parâmetros da execução (serializáveis em JSON)
+
+        Returns:
+            run_id da execução
+
+        Raises:
+            OSError: Falha de escrita no diretório
+        """
+        run_id = uuid.uuid4().hex
+        positions = np.ascontiguousarray(positions, dtype=np.uint8)
+        document = {
+            "run_id": run_id,
+            "drivers": list(driver_names),
+            "iterations": int(positions.shape[0]),
+            "metadata": metadata or {}
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        # A matriz antes dos metadados: uma execução só existe quando o .json existe
+        self._write(self._path(run_id, "npy"), lambda f: np.save(f, positions))
+        self._write(self._path(run_id, "json"), lambda f: f.write(json.dumps(document).encode("utf-8")))
+        with self._lock:
+            self._evict()
+        return run_id
+
+    def exists(self, run_id: str) -> bool:
+        """Indica se a execução está armazenada."""
+        return bool(_RUN_ID.match(run_id)) and os.path.exists(self._path(run_id, "json"))
+
+    def load(self, run_id: str) -> StoredRun:
+        """
+        Abre uma execução (a matriz como memory-map somente leitura).
+
+        Raises:
+            KeyError: Execução inexistente (ou removida por limite de tamanho)
+        """
+        if not _RUN_ID.match(run_id):
+            raise KeyError(run_id)
+        try:
+            with open(self._path(run_id, "json"), "r", encoding="utf-8") as f:
+                document = json.load(f)
+            positions = np.load(self._path(run_id, "npy"), mmap_mode="r")
+            # Marca o uso para a remoção por LRU
+            os.utime(self._path(run_id, "json"))
+        except (OSError, ValueError):
+            raise KeyError(run_id)
+
+        return StoredRun(
+            run_id=run_id,
+            driver_names=document["drivers"],
+            positions=positions,
+            metadata=document.get("metadata", {})
+        )
+
+    def _evict(self) -> None:
+        """Remove as execuções menos usadas até o total caber em disk_bytes."""
+        # run_id -> [mtime do .json (None se ainda não existe), mtime do .npy, tamanho]
+        runs: Dict[str, List] = {}
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                run_id, _, extension = entry.name.partition(".")
+                if extension not in ("npy", "json") or not _RUN_ID.match(run_id):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                run = runs.setdefault(run_id, [None, 0.0, 0])
+                if extension == "json":
+                    run[0] = stat.st_mtime
+                else:
+                    run[1] = stat.st_mtime
+                run[2] += stat.st_size
+                total += stat.st_size
+
+        def last_used(run: List) -> float:
+            # Sem .json, a matriz pode ser de um save() em andamento em outra
+            # thread: vale a idade do .npy, para não ser a primeira removida
+            return run[0] if run[0] is not None else run[1]
+
+        for run_id, (_, _, size) in sorted(runs.items(), key=lambda item: last_used(item[1])):
+            if total <= self.disk_bytes:
+                break
+            for extension in ("json", "npy"):
+                try:
+                    os.remove(self._path(run_id, extension))
+                except OSError:
+                    pass
+            total -= size
+
+    def clear(self) -> None:
+        """Remove todas as execuções."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith((".npy", ".json")):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+_run_store: Optional[RunStore] = None
+
+
+def get_run_store() -> RunStore:
+    """Retorna o armazenamento de execuções compartilhado do processo (criado na primeira chamada)."""
+    global _run_store
+    if _run_store is None:
+        _run_store = RunStore()
+    return _run_store
@@ -0,0 +1,332 @@
+"""
+Execução de simulações Monte Carlo em shards num pool de processos.
+
+As iterações são divididas em shards alinhados aos blocos de sementes; cada
+shard roda o motor vetorizado em um processo do pool com os subfluxos
+aleatórios dos seus blocos, e os contadores parciais (inteiros) são somados em
+um único MonteCarloStats. Com a mesma semente, o resultado é idêntico ao de
+uma execução em série, qualquer que seja o número de shards.
+"""
+import atexit
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from app.core.config import settings
+from .models import DriverSim, MonteCarloStats, SweepScenario
+from .streams import INDEPENDENT_SAMPLING, SEED_BLOCK_SIZE, VarianceReduction, resolve_seed
+from .tyres import TyreModel
+from .vectorized import simulate_races_batch, simulate_sweep_batch
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# Motivos de parada das execuções em rodadas
+STOP_COMPLETED = "completed"
+STOP_TIME_BUDGET = "time_budget"
+STOP_MAX_ITERATIONS = "max_iterations"
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Retorna o pool de processos compartilhado (criado na primeira chamada)."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.SIMULATION_WORKERS)
+        atexit.register(shutdown_executor)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Encerra o pool de processos compartilhado (se existir)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _run_shard(
+    drivers: List[DriverSim],
+    total_laps: int,
+    first_iteration: int,
+    iterations: int,
+    weather_prob: float,
+    seed: int,
+    tyre_properties: dict,
+    pit_strategy: str = "reactive",
+    variance_reduction: VarianceReduction = INDEPENDENT_SAMPLING,
+    weather_model: str = "static",
+    fantasy: bool = False,
+    record_positions: bool = False,
+    head_to_head: bool = False
+) -> MonteCarloStats:
+    """Executa um shard de iterações (função de nível de módulo para ser serializável)."""
+    # Processos do pool podem ter sido criados antes de uma calibração dos pneus
+    if TyreModel.TYRE_PROPERTIES != tyre_properties:
+        TyreModel.TYRE_PROPERTIES = tyre_properties
+
+    return simulate_races_batch(
+        drivers, total_laps, iterations, weather_prob, seed=seed, first_iteration=first_iteration,
+        pit_strategy=pit_strategy, variance_reduction=variance_reduction, weather_model=weather_model,
+        fantasy=fantasy, record_positions=record_positions, head_to_head=head_to_head
+    )
+
+
+def _run_sweep_shard(
+    drivers: List[DriverSim],
+    scenarios: List[SweepScenario],
+    first_iteration: int,
+    iterations: int,
+    seed: int,
+    tyre_properties: dict,
+    pit_strategy: str = "reactive"
+) -> List[MonteCarloStats]:
+    """Executa um shard de iterações de uma varredura de cenários."""
+    if TyreModel.TYRE_PROPERTIES != tyre_properties:
+        TyreModel.TYRE_PROPERTIES = tyre_properties
+
+    return simulate_sweep_batch(
+        drivers, scenarios, iterations,
+        seed=seed, first_iteration=first_iteration, pit_strategy=pit_strategy
+    )
+
+
+def split_iterations(iterations: int, num_shards: int) -> List[Tuple[int, int]]:
+    """
+    Divide as iterações em shards alinhados a SEED_BLOCK_SIZE.
+
+    Os blocos de sementes são distribuídos da forma mais uniforme possível; só
+    o último shard pode terminar com um bloco incompleto.
+
+    Args:
+        iterations: Total de iterações
+        num_shards: Número máximo de shards
+
+    Returns:
+        Lista de (primeira iteração, número de iterações) de cada shard
+    """
+    num_blocks = math.ceil(iterations / SEED_BLOCK_SIZE)
+    num_shards = max(1, min(num_shards, num_blocks))
+    base, extra = divmod(num_blocks, num_shards)
+
+    shards = []
+    start = 0
+    for i in range(num_shards):
+        blocks = base + (1 if i < extra else 0)
+        stop = min(start + blocks * SEED_BLOCK_SIZE, iterations)
+        shards.append((start, stop - start))
+        start = stop
+    return shards
+
+
+def run_monte_carlo(
+    drivers: List[DriverSim],
+    total_laps: int,
+    iterations: int,
+    weather_prob: float = 0.0,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    pit_strategy: str = "reactive",
+    first_iteration: int = 0,
+    variance_reduction: VarianceReduction = INDEPENDENT_SAMPLING,
+    weather_model: str = "static",
+    fantasy: bool = False,
+    record_positions: bool = False,
+    head_to_head: bool = False
+) -> MonteCarloStats:
+    """
+    Executa a simulação Monte Carlo dividindo as iterações entre processos.
+
+    Requisições pequenas (menos de SIMULATION_MIN_SHARD_SIZE iterações por
+    worker) usam menos shards, e um único shard roda no próprio processo,
+    evitando o custo de serialização entre processos. O número de shards não
+    altera o resultado para uma mesma semente.
+
+    Args:
+        drivers: Lista de pilotos para a simulação
+        total_laps: Número total de voltas da corrida
+        iterations: Número total de iterações Monte Carlo
+        weather_prob: Probabilidade de chuva (0.0 a 1.0)
+        seed: Semente da execução (None = entropia do sistema)
+        workers: Número máximo de shards (padrão: settings.SIMULATION_WORKERS)
+        pit_strategy: "reactive" ou "planned" (ver engine.simulate_race)
+        first_iteration: Índice global da primeira iteração (múltiplo de
+            SEED_BLOCK_SIZE); permite continuar uma execução em rodadas
+        variance_reduction: Técnicas de redução de variância (ver streams.VarianceReduction)
+        weather_model: "static" ou "markov" (ver engine.simulate_race)
+        fantasy: Inclui a distribuição da pontuação de Fantasy (MonteCarloStats.fantasy)
+        record_positions: Inclui a matriz de posições finais (MonteCarloStats.finishing_positions)
+        head_to_head: Inclui as contagens de confronto direto (MonteCarloStats.ahead_counts)
+
+    Returns:
+        MonteCarloStats com os contadores de todos os shards somados
+    """
+    if workers is None:
+        workers = settings.SIMULATION_WORKERS
+
+    seed = resolve_seed(seed)
+    num_shards = max(1, min(workers, math.ceil(iterations / settings.SIMULATION_MIN_SHARD_SIZE)))
+    shards = split_iterations(iterations, num_shards)
+    tyre_properties = TyreModel.properties_snapshot()
+
+    if len(shards) == 1:
+        return _run_shard(
+            drivers, total_laps, first_iteration, iterations, weather_prob, seed, tyre_properties,
+            pit_strategy, variance_reduction, weather_model, fantasy, record_positions, head_to_head
+        )
+
+    executor = _get_executor()
+    futures = [
+        executor.submit(
+            _run_shard, drivers, total_laps, first_iteration + start, size,
+            weather_prob, seed, tyre_properties, pit_strategy, variance_reduction, weather_model, fantasy,
+            record_positions, head_to_head
+        )
+        for start, size in shards
+    ]
+
+    stats = MonteCarloStats(driver_names=[d.name for d in drivers])
+    for future in futures:
+        stats.merge(future.result())
+
+    return stats
+
+
+def run_sweep(
+    drivers: List[DriverSim],
+    scenarios: List[SweepScenario],
+    iterations: int,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    pit_strategy: str = "reactive"
+) -> List[MonteCarloStats]:
+    """
+    Executa uma varredura de cenários com números aleatórios comuns, em shards.
+
+    Cada shard simula todos os cenários sobre os mesmos sorteios (ver
+    vectorized.simulate_sweep_batch); os parciais são somados por cenário.
+    Como em run_monte_carlo, o número de shards não altera o resultado.
+
+    Args:
+        drivers: Lista de pilotos para a simulação
+        scenarios: Cenários da varredura
+        iterations: Número de corridas por cenário
+        seed: Semente da execução (None = entropia do sistema)
+        workers: Número máximo de shards (padrão: settings.SIMULATION_WORKERS)
+        pit_strategy: "reactive" ou "planned" (ver engine.simulate_race)
+
+    Returns:
+        Lista de MonteCarloStats, na ordem de `scenarios`
+    """
+    if workers is None:
+        workers = settings.SIMULATION_WORKERS
+
+    seed = resolve_seed(seed)
+    num_shards = max(1, min(workers, math.ceil(iterations / settings.SIMULATION_MIN_SHARD_SIZE)))
+    shards = split_iterations(iterations, num_shards)
+    tyre_properties = TyreModel.properties_snapshot()
+
+    if len(shards) == 1:
+        return _run_sweep_shard(drivers, scenarios, 0, iterations, seed, tyre_properties, pit_strategy)
+
+    executor = _get_executor()
+    futures = [
+        executor.submit(_run_sweep_shard, drivers, scenarios, start, size, seed, tyre_properties, pit_strategy)
+        for start, size in shards
+    ]
+
+    results = [MonteCarloStats(driver_names=[d.name for d in drivers]) for _ in scenarios]
+    for future in futures:
+        for stats, partial in zip(results, future.result()):
+            stats.merge(partial)
+
+    return results
+
+
+def run_in_rounds(
+    drivers: List[DriverSim],
+    total_laps: int,
+    time_budget: Optional[float],
+    weather_prob: float = 0.0,
+    seed: Optional[int] = None,
+    max_iterations: Optional[int] = None,
+    pit_strategy: str = "reactive",
+    first_round: int = SEED_BLOCK_SIZE,
+    next_round: Optional[Callable[[MonteCarloStats], Optional[int]]] = None,
+    on_round: Optional[Callable[[MonteCarloStats], None]] = None,
+    variance_reduction: VarianceReduction = INDEPENDENT_SAMPLING,
+    weather_model: str = "static",
+    fantasy: bool = False,
+    record_positions: bool = False,
+    head_to_head: bool = False
+) -> Tuple[MonteCarloStats, str, int]:
+    """
+    Executa a simulação em rodadas até esgotar o tempo ou o limite de iterações.
+
+    Cada rodada continua o fluxo aleatório da anterior (first_iteration), então
+    o resultado com N iterações é idêntico ao de run_monte_carlo com N
+    iterações e a mesma semente. O tamanho de cada rodada é limitado ao que
+    cabe no tempo restante, pelo ritmo observado nas rodadas anteriores; a
+    primeira rodada sempre é executada.
+
+    Args:
+        drivers: Lista de pilotos para a simulação
+        total_laps: Número total de voltas da corrida
+        time_budget: Tempo máximo em segundos (None = sem limite de tempo)
+        weather_prob: Probabilidade de chuva (0.0 a 1.0)
+        seed: Semente da execução (None = entropia do sistema)
+        max_iterations: Limite de iterações (padrão: settings.SIMULATION_MAX_ITERATIONS)
+        pit_strategy: "reactive" ou "planned" (ver engine.simulate_race)
+        first_round: Iterações da primeira rodada
+        next_round: Função que recebe as estatísticas acumuladas e devolve o
+            tamanho desejado da próxima rodada, ou None para encerrar
+            (padrão: dobra as iterações a cada rodada)
+        on_round: Função chamada com as estatísticas acumuladas ao fim de cada
+            rodada (ex: publicar resultados parciais)
+        variance_reduction: Técnicas de redução de variância (ver streams.VarianceReduction)
+        weather_model: "static" ou "markov" (ver engine.simulate_race)
+        fantasy: Inclui a distribuição da pontuação de Fantasy (MonteCarloStats.fantasy)
+        record_positions: Inclui a matriz de posições finais (MonteCarloStats.finishing_positions)
+        head_to_head: Inclui as contagens de confronto direto (MonteCarloStats.ahead_counts)
+
+    Returns:
+        Tupla (MonteCarloStats acumulado, motivo da parada, número de rodadas)
+    """
+    if max_iterations is None:
+        max_iterations = settings.SIMULATION_MAX_ITERATIONS
+    if next_round is None:
+        next_round = lambda stats: stats.iterations
+
+    seed = resolve_seed(seed)
+    started = time.perf_counter()
+    stats = MonteCarloStats(driver_names=[d.name for d in drivers])
+    round_size = min(first_round, max_iterations)
+    rounds = 0
+
+    while True:
+        stats.merge(run_monte_carlo(
+            drivers, total_laps, round_size, weather_prob, seed=seed,
+            pit_strategy=pit_strategy, first_iteration=stats.iterations,
+            variance_reduction=variance_reduction, weather_model=weather_model, fantasy=fantasy,
+            record_positions=record_positions, head_to_head=head_to_head
+        ))
+        rounds += 1
+        if on_round is not None:
+            on_round(stats)
+
+        requested = next_round(stats)
+        if requested is None:
+            return stats, STOP_COMPLETED, rounds
+        if stats.iterations >= max_iterations:
+            return stats, STOP_MAX_ITERATIONS, rounds
+
+        requested = math.ceil(requested / SEED_BLOCK_SIZE) * SEED_BLOCK_SIZE
+        round_size = min(requested, max_iterations - stats.iterations)
+
+        # Iterações que cabem no tempo restante (blocos inteiros de sementes)
+        elapsed = time.perf_counter() - started
+        if time_budget is not None and elapsed > 0:
+            affordable = int((time_budget - elapsed) * stats.iterations / elapsed)
+            affordable = affordable // SEED_BLOCK_SIZE * SEED_BLOCK_SIZE
+            if affordable < SEED_BLOCK_SIZE:
+                return stats, STOP_TIME_BUDGET, rounds
+            round_size = min(round_size, affordable)
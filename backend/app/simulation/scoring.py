@@ -0,0 +1,299 @@
+"""
+Pontuação de Fantasy vetorizada para corridas simuladas.
+
+Aplica as regras de corrida e de construtores de app/core (as mesmas usadas
+por fantasy_service.calculate_driver_weekend_score) a arrays (iterações ×
+pilotos) de grid, posição final, volta mais rápida e abandono, sem laços em
+Python sobre as iterações. As tabelas de pontos são montadas chamando as
+próprias funções de regra, então uma mudança nas regras vale para os dois
+caminhos.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core import regras_corrida, regras_construtores
+from .models import DriverSim, FantasyDistribution
+
+# Bônus e penalidades da corrida (valores das funções de regra)
+FASTEST_LAP_POINTS = regras_corrida.calculate_race_bonuses(True, False, False)
+BEAT_TEAMMATE_POINTS = regras_corrida.calculate_race_bonuses(False, False, True)
+FINISHED_POINTS = regras_corrida.calculate_completion_points("Finished")
+DNF_POINTS = regras_corrida.calculate_completion_points("Retired")
+DOUBLE_PODIUM_POINTS = regras_construtores.calculate_constructor_bonuses(True, False)
+DOUBLE_DNF_POINTS = regras_construtores.calculate_constructor_penalty(True)
+
+# Percentis reportados por padrão
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def position_points_table(num_drivers: int) -> np.ndarray:
+    """Pontos por posição final, indexados pela posição (índice 0 não usado)."""
+    return np.array(
+        [regras_corrida.calculate_race_position_points(p) for p in range(num_drivers + 1)], dtype=np.int64
+    )
+
+
+def overtake_points_table(num_drivers: int) -> np.ndarray:
+    """
+    Pontos de ultrapassagem por posições ganhas, indexados por
+    grid - chegada + num_drivers - 1 (diferenças de -(N-1) a N-1).
+    """
+    diffs = range(-(num_drivers - 1), num_drivers)
+    # Um par (grid, chegada) válido de cada diferença: largando em max(d, 0) + 1
+    return np.array(
+        [regras_corrida.calculate_race_overtake_points(max(d, 0) + 1, max(d, 0) + 1 - d) for d in diffs],
+        dtype=np.int64
+    )
+
+
+def expected_grid(drivers: List[DriverSim]) -> np.ndarray:
+    """
+    Grid de largada estimado: pilotos ordenados pelo tempo base de volta.
+
+    A simulação não tem classificação; o ritmo médio é usado como estimativa
+    do grid para a pontuação de ultrapassagens.
+
+    Returns:
+        Posição de largada (1..N) de cada piloto, na ordem de `drivers`
+    """
+    order = np.argsort([d.base_lap_time for d in drivers], kind="stable")
+    grid = np.empty(len(drivers), dtype=np.int64)
+    grid[order] = np.arange(1, len(drivers) + 1)
+    return grid
+
+
+def team_index(drivers: List[DriverSim]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Índice da equipe de cada piloto.
+
+    Returns:
+        Tupla (índice da equipe por piloto, -1 sem equipe; nomes das equipes
+        na ordem de primeira aparição)
+    """
+    names: List[str] = []
+    index = np.full(len(drivers), -1, dtype=np.int64)
+    for i, driver in enumerate(drivers):
+        if driver.team is None:
+            continue
+        if driver.team not in names:
+            names.append(driver.team)
+        index[i] = names.index(driver.team)
+    return index, names
+
+
+def _teammates(team: np.ndarray) -> np.ndarray:
+    """Companheiro de equipe de cada piloto (o primeiro outro piloto da equipe; -1 se não houver)."""
+    mate = np.full(len(team), -1, dtype=np.int64)
+    for i, t in enumerate(team):
+        if t < 0:
+            continue
+        others = np.flatnonzero((team == t) & (np.arange(len(team)) != i))
+        if others.size:
+            mate[i] = others[0]
+    return mate
+
+
+def score_races(
+    grid: np.ndarray,
+    finish: np.ndarray,
+    fastest_lap: np.ndarray,
+    dnf: np.ndarray,
+    team: np.ndarray,
+    num_teams: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pontuação de Fantasy de cada piloto e construtor em cada corrida.
+
+    Piloto: pontos da posição + ultrapassagens (posições ganhas) + volta mais
+    rápida + superar o companheiro + conclusão (terminou ou abandono).
+    Construtor: soma dos seus pilotos + pódio duplo + penalidade de abandono
+    duplo (pit stops e classificação não são simulados).
+
+    Args:
+        grid: Posição de largada (pilotos,) ou (iterações × pilotos)
+        finish: Posição final (iterações × pilotos), 1 = vencedor
+        fastest_lap: Volta mais rápida da corrida (iterações × pilotos, bool)
+        dnf: Abandono (iterações × pilotos, bool)
+        team: Índice da equipe de cada piloto (pilotos,), -1 sem equipe
+        num_teams: Número de construtores (padrão: maior índice + 1)
+
+    Returns:
+        Tupla (pontos dos pilotos (iterações × pilotos), pontos dos
+        construtores (iterações × construtores)), inteiros
+    """
+    iterations, num_drivers = finish.shape
+    if num_teams is None:
+        num_teams = int(team.max()) + 1 if team.size else 0
+
+    points = position_points_table(num_drivers).take(finish)
+    points += overtake_points_table(num_drivers).take(grid - finish + num_drivers - 1)
+    points += np.where(fastest_lap, FASTEST_LAP_POINTS, 0)
+    points += np.where(dnf, DNF_POINTS, FINISHED_POINTS)
+
+    mate = _teammates(team)
+    has_mate = mate >= 0
+    if has_mate.any():
+        beat = has_mate & (finish < finish[:, np.where(has_mate, mate, 0)])
+        points += np.where(beat, BEAT_TEAMMATE_POINTS, 0)
+
+    # Matriz de pertinência (pilotos × construtores): somas por equipe via produto
+    membership = np.zeros((num_drivers, num_teams), dtype=np.int64)
+    members = np.flatnonzero(team >= 0)
+    membership[members, team[members]] = 1
+    team_size = membership.sum(axis=0)
+
+    constructor_points = points @ membership
+    double = team_size >= 2
+    constructor_points += np.where(((finish <= 3) @ membership == team_size) & double, DOUBLE_PODIUM_POINTS, 0)
+    constructor_points += np.where((dnf.astype(np.int64) @ membership == team_size) & double, DOUBLE_DNF_POINTS, 0)
+
+    return points, constructor_points
+
+
+def points_range(num_drivers: int, max_team_size: int) -> Tuple[int, int]:
+    """
+    Faixa possível de pontuação (mínimo, máximo) de pilotos e construtores.
+
+    Usada para dimensionar os histogramas de forma independente do lote.
+    """
+    position_points = position_points_table(num_drivers)[1:]
+    overtakes = overtake_points_table(num_drivers)
+    bonus = max(FASTEST_LAP_POINTS, 0) + max(BEAT_TEAMMATE_POINTS, 0)
+    driver_min = int(position_points.min()) + int(overtakes.min()) + min(DNF_POINTS, FINISHED_POINTS, 0)
+    driver_max = int(position_points.max()) + int(overtakes.max()) + bonus + max(DNF_POINTS, FINISHED_POINTS, 0)
+
+    team_size = max(max_team_size, 1)
+    low = min(driver_min, team_size * driver_min + min(DOUBLE_DNF_POINTS, 0))
+    high = max(driver_max, team_size * driver_max + max(DOUBLE_PODIUM_POINTS, 0))
+    return low, high
+
+
+def histogram_counts(points: np.ndarray, offset: int, width: int) -> np.ndarray:
+    """
+    Histograma de cada coluna de `points` (uma linha por coluna), com um só bincount.
+
+    Args:
+        points: Pontuações inteiras (iterações × entidades)
+        offset: Pontuação da primeira coluna do histograma
+        width: Número de colunas (pontuações) do histograma
+
+    Returns:
+        Array (entidades × width) com o número de corridas por pontuação
+    """
+    entities = points.shape[1]
+    keys = (points - offset) + np.arange(entities) * width
+    return np.bincount(keys.ravel(), minlength=entities * width).reshape(entities, width)
+
+
+class FantasyScorer:
+    """
+    Pontuação de Fantasy dos lotes do motor vetorizado.
+
+    Guarda o que não depende das corridas (grid, equipes, faixa dos
+    histogramas) e converte cada lote em uma FantasyDistribution.
+    """
+
+    def __init__(self, drivers: List[DriverSim]):
+        """
+        Args:
+            drivers: Pilotos da simulação (o grid é estimado por expected_grid)
+        """
+        self.driver_names = [d.name for d in drivers]
+        self.grid = expected_grid(drivers)
+        self.team, self.constructor_names = team_index(drivers)
+        team_sizes = np.bincount(self.team[self.team >= 0], minlength=len(self.constructor_names))
+        low, high = points_range(len(drivers), int(team_sizes.max()) if team_sizes.size else 1)
+        self.offset = low
+        self.width = high - low + 1
+
+    def distribution(self, finish: np.ndarray, best_lap: np.ndarray, dnf: Optional[np.ndarray] = None) -> FantasyDistribution:
+        """
+        Histogramas da pontuação de um lote de corridas.
+
+        Args:
+            finish: Posição final (iterações × pilotos)
+            best_lap: Melhor volta de cada piloto (iterações × pilotos)
+            dnf: Abandonos (iterações × pilotos); None = todos terminaram
+
+        Returns:
+            FantasyDistribution do lote
+        """
+        if dnf is None:
+            dnf = np.zeros(finish.shape, dtype=bool)
+        fastest_lap = np.zeros(finish.shape, dtype=bool)
+        np.put_along_axis(fastest_lap, best_lap.argmin(axis=1)[:, None], True, axis=1)
+
+        driver_points, constructor_points = score_races(
+            self.grid, finish, fastest_lap, dnf, self.team, len(self.constructor_names)
+        )
+        return FantasyDistribution(
+            driver_names=list(self.driver_names),
+            constructor_names=list(self.constructor_names),
+            offset=self.offset,
+            driver_counts=histogram_counts(driver_points, self.offset, self.width),
+            constructor_counts=histogram_counts(constructor_points, self.offset, self.width)
+        )
+
+
+def _summarize_counts(
+    names: Sequence[str],
+    counts: np.ndarray,
+    offset: int,
+    percentiles: Sequence[float]
+) -> List[Dict]:
+    """Média, percentis e histograma (aparado às pontuações observadas) de cada linha."""
+    if not len(names):
+        return []
+    values = np.arange(counts.shape[1]) + offset
+    totals = counts.sum(axis=1)
+    means = counts @ values / np.maximum(totals, 1)
+
+    # Percentil q: menor pontuação com frequência acumulada >= q% das corridas
+    # (ao menos uma), como np.percentile(..., method="inverted_cdf")
+    cumulative = counts.cumsum(axis=1)
+    quantiles = {
+        q: values[(cumulative >= np.maximum(np.ceil(totals * q / 100.0), 1)[:, None]).argmax(axis=1)]
+        for q in percentiles
+    }
+
+    summary = []
+    for i, name in enumerate(names):
+        observed = np.flatnonzero(counts[i])
+        first, last = (observed[0], observed[-1]) if observed.size else (0, -1)
+        summary.append({
+            "name": name,
+            "mean": round(float(means[i]), 2),
+            "percentiles": {f"p{q:g}": int(quantiles[q][i]) for q in percentiles},
+            "histogram": {
+                "min_points": int(values[first]) if observed.size else None,
+                "counts": counts[i, first:last + 1].tolist()
+            }
+        })
+    return summary
+
+
+def summarize_fantasy(
+    distribution: FantasyDistribution,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES
+) -> Dict[str, List[Dict]]:
+    """
+    Resumo da distribuição de Fantasy para a resposta da API.
+
+    Args:
+        distribution: Histogramas acumulados
+        percentiles: Percentis reportados (0-100)
+
+    Returns:
+        {"drivers": [...], "constructors": [...]}, cada item com "name",
+        "mean", "percentiles" ({"p50": ...}) e "histogram" ({"min_points", "counts"}:
+        counts[k] = corridas com min_points + k pontos)
+    """
+    return {
+        "drivers": _summarize_counts(
+            distribution.driver_names, distribution.driver_counts, distribution.offset, percentiles
+        ),
+        "constructors": _summarize_counts(
+            distribution.constructor_names, distribution.constructor_counts, distribution.offset, percentiles
+        )
+    }
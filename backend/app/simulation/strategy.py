@@ -0,0 +1,166 @@
+"""
+Planejador de estratégias de pit stop.
+
+Calcula antes da corrida os melhores planos de 1, 2 e 3 paradas para uma
+combinação (clima, número de voltas, tempo perdido no pit), por programação
+dinâmica sobre sequências de compostos. Em pista seca os planos respeitam a
+regra dos dois compostos. Os motores de simulação, no modo "planned", apenas
+consultam as voltas de parada do plano em vez de decidir o pit volta a volta.
+"""
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+
+from .models import PitPlan
+from .tyres import TyreModel, TyreCompound, COMPOUND_CODES
+from .weather import WeatherCondition
+
+# Estratégias de pit stop aceitas pelos motores de simulação
+PIT_STRATEGIES = ("reactive", "planned")
+
+# Maior número de paradas considerado pelo planejador
+MAX_STOPS = 3
+
+
+def _allowed_compounds(weather: WeatherCondition) -> List[TyreCompound]:
+    """Compostos utilizáveis na condição climática (mesma regra de engine._choose_next_tyre)."""
+    if weather == WeatherCondition.WET:
+        return [TyreCompound.WET]
+    if weather == WeatherCondition.MIXED:
+        return [TyreCompound.INTER]
+    return TyreModel.get_dry_compounds()
+
+
+def _stint_costs(compound: TyreCompound, max_length: int) -> np.ndarray:
+    """
+    Tempo perdido em um stint com pneu novo, pelo modelo de tempo de volta do motor.
+
+    Returns:
+        Array onde o índice L é o custo acumulado de L voltas (penalidade - bônus)
+    """
+    penalties = TyreModel.get_penalty_rows(max_length + 1)[compound][:max_length]
+    deltas = np.array(penalties) - TyreModel.get_speed_bonus(compound)
+    return np.concatenate([[0.0], np.cumsum(deltas)])
+
+
+@lru_cache(maxsize=256)
+def _plan_strategies(
+    weather: WeatherCondition,
+    total_laps: int,
+    pit_stop_loss: float,
+    properties_version: int
+) -> Dict[int, PitPlan]:
+    """
+    Programação dinâmica sobre stints.
+
+    best[s, m, t] é o menor custo para cobrir as t primeiras voltas com s stints,
+    tendo usado o conjunto de compostos m (máscara de bits). Cada transição
+    acrescenta um stint de L voltas (até o max_laps do composto) com um composto.
+    `properties_version` só entra na chave do cache.
+    """
+    compounds = _allowed_compounds(weather)
+    max_laps = TyreModel.get_max_laps_vector()
+    costs = [
+        _stint_costs(compound, min(int(max_laps[COMPOUND_CODES[compound]]), total_laps))
+        for compound in compounds
+    ]
+
+    num_stints = MAX_STOPS + 1
+    num_masks = 1 << len(compounds)
+    shape = (num_stints + 1, num_masks, total_laps + 1)
+
+    best = np.full(shape, np.inf)
+    back_mask = np.zeros(shape, dtype=np.int64)
+    back_compound = np.zeros(shape, dtype=np.int64)
+    back_length = np.zeros(shape, dtype=np.int64)
+    best[0, 0, 0] = 0.0
+
+    for stints in range(num_stints):
+        pit_cost = pit_stop_loss if stints > 0 else 0.0
+        for mask in range(num_masks):
+            previous = best[stints, mask]
+            if not np.isfinite(previous).any():
+                continue
+            for index, stint_cost in enumerate(costs):
+                new_mask = mask | (1 << index)
+                for length in range(1, len(stint_cost)):
+                    candidate = previous[:total_laps + 1 - length] + stint_cost[length] + pit_cost
+                    target = best[stints + 1, new_mask, length:]
+                    better = candidate < target
+                    if not better.any():
+                        continue
+                    target[better] = candidate[better]
+                    back_mask[stints + 1, new_mask, length:][better] = mask
+                    back_compound[stints + 1, new_mask, length:][better] = index
+                    back_length[stints + 1, new_mask, length:][better] = length
+
+    # Em pista seca, exige pelo menos dois compostos diferentes
+    min_compounds = 2 if weather == WeatherCondition.DRY else 1
+
+    plans = {}
+    for stops in range(1, MAX_STOPS + 1):
+        stints = stops + 1
+        valid_masks = [m for m in range(num_masks) if bin(m).count("1") >= min_compounds]
+        if not valid_masks:
+            continue
+        mask = min(valid_masks, key=lambda m: best[stints, m, total_laps])
+        if not np.isfinite(best[stints, mask, total_laps]):
+            continue
+
+        # Reconstrói o plano a partir dos ponteiros
+        sequence = []
+        lap, current_mask = total_laps, mask
+        for s in range(stints, 0, -1):
+            length = int(back_length[s, current_mask, lap])
+            sequence.append((compounds[back_compound[s, current_mask, lap]], length))
+            current_mask = int(back_mask[s, current_mask, lap])
+            lap -= length
+        sequence.reverse()
+
+        pit_laps = tuple(int(lap) for lap in np.cumsum([length for _, length in sequence])[:-1])
+        plans[stops] = PitPlan(
+            compounds=tuple(compound for compound, _ in sequence),
+            pit_laps=pit_laps,
+            expected_time=float(best[stints, mask, total_laps])
+        )
+
+    return plans
+
+
+def plan_strategies(
+    weather: WeatherCondition,
+    total_laps: int,
+    pit_stop_loss: float
+) -> Dict[int, PitPlan]:
+    """
+    Calcula os melhores planos de 1, 2 e 3 paradas.
+
+    O resultado é memorizado por (clima, voltas, tempo de pit) e recalculado
+    automaticamente se as propriedades dos pneus mudarem.
+
+    Args:
+        weather: Condição climática da corrida
+        total_laps: Número total de voltas
+        pit_stop_loss: Tempo perdido em cada pit stop (segundos)
+
+    Returns:
+        Dict {número de paradas: PitPlan}; planos inviáveis (ex: stints mais
+        longos que a vida dos pneus) não aparecem
+    """
+    return _plan_strategies(weather, total_laps, float(pit_stop_loss), TyreModel.properties_version())
+
+
+def best_plan(weather: WeatherCondition, total_laps: int, pit_stop_loss: float) -> PitPlan:
+    """
+    Retorna o plano de menor tempo estimado entre os de 1, 2 e 3 paradas.
+
+    Raises:
+        ValueError: Se nenhum plano for viável para o número de voltas
+    """
+    plans = plan_strategies(weather, total_laps, pit_stop_loss)
+    if not plans:
+        raise ValueError(
+            f"Nenhuma estratégia com até {MAX_STOPS} paradas cobre {total_laps} voltas em condição {weather.value}"
+        )
+    return min(plans.values(), key=lambda plan: plan.expected_time)
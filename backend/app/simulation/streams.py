@@ -0,0 +1,184 @@
+"""
+Fluxos de números aleatórios reprodutíveis para a simulação.
+
+Cada iteração (ou bloco de iterações) recebe um subfluxo próprio derivado da
+semente da execução via SeedSequence. Como o sorteio de uma iteração não
+depende de como as iterações foram divididas entre lotes, shards ou processos,
+execuções em série e em paralelo com a mesma semente produzem agregados
+idênticos.
+
+Opcionalmente, os sorteios usam técnicas de redução de variância
+(VarianceReduction): variáveis antitéticas (cada par de iterações
+consecutivas recebe sorteios espelhados) e amostragem estratificada dos
+uniformes do clima dentro de cada bloco.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Iterações por subfluxo no motor vetorizado. Lotes e shards devem começar em
+# múltiplos deste valor para que a divisão não altere os sorteios.
+SEED_BLOCK_SIZE = 256
+
+
+@dataclass(frozen=True)
+class VarianceReduction:
+    """
+    Técnicas de redução de variância do motor vetorizado.
+
+    Attributes:
+        antithetic: Iterações 2k e 2k+1 de cada bloco usam sorteios espelhados
+            (normal z → -z, uniforme u → 1 - u, inteiro x → low + high - 1 - x)
+        stratified_weather: Os uniformes que decidem o clima são estratificados
+            dentro de cada bloco (um por estrato de largura 1/n, em ordem aleatória),
+            então a proporção de corridas com chuva acompanha a probabilidade pedida
+    """
+    antithetic: bool = False
+    stratified_weather: bool = False
+
+
+# Amostragem independente (sem redução de variância)
+INDEPENDENT_SAMPLING = VarianceReduction()
+
+
+def stratified_uniforms(generator: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Uniformes estratificados: um sorteio em cada intervalo [k/n, (k+1)/n), embaralhados.
+
+    Args:
+        generator: Gerador NumPy
+        size: Número de sorteios (n)
+
+    Returns:
+        Array (size,) de uniformes em [0, 1)
+    """
+    return (generator.permutation(size) + generator.random(size)) / size
+
+
+def resolve_seed(seed: Optional[int]) -> int:
+    """
+    Retorna a semente da execução, gerando uma nova (entropia do sistema) se None.
+
+    Args:
+        seed: Semente fornecida pelo usuário (ou None)
+
+    Returns:
+        Semente inteira (63 bits quando gerada), que pode ser devolvida ao
+        cliente para reproduzir a execução
+    """
+    if seed is not None:
+        return int(seed)
+    return int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0]) >> 1
+
+
+def iteration_seed(seed: int, iteration: int) -> int:
+    """
+    Deriva a semente do subfluxo de uma iteração individual.
+
+    Usada com engine.simulate_race: a iteração `i` de uma execução com semente
+    `seed` é sempre simulate_race(..., seed=iteration_seed(seed, i)).
+
+    Args:
+        seed: Semente da execução
+        iteration: Índice da iteração (0, 1, 2, ...)
+
+    Returns:
+        Semente inteira de 64 bits da iteração
+    """
+    state = np.random.SeedSequence(seed, spawn_key=(iteration,)).generate_state(2, dtype=np.uint32)
+    return int(state[0]) | (int(state[1]) << 32)
+
+
+def block_generator(seed: int, block_index: int) -> np.random.Generator:
+    """Gerador NumPy do subfluxo de um bloco de SEED_BLOCK_SIZE iterações."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block_index,)))
+
+
+class BlockedGenerator:
+    """
+    Gerador para um intervalo de iterações composto por subfluxos de bloco.
+
+    Implementa o subconjunto da API de np.random.Generator usado pelo motor
+    vetorizado. O primeiro eixo de cada `size` é o eixo das iterações; as
+    linhas de cada bloco são sorteadas pelo gerador daquele bloco.
+    """
+
+    def __init__(self, seed: int, first_iteration: int, iterations: int, antithetic: bool = False):
+        """
+        Args:
+            seed: Semente da execução
+            first_iteration: Índice global da primeira iteração (múltiplo de SEED_BLOCK_SIZE)
+            iterations: Número de iterações cobertas
+            antithetic: Sorteia metade das linhas de cada bloco e espelha a outra
+                metade (linha 2k+1 = espelho da linha 2k; com um número ímpar de
+                iterações, a última linha fica sem par)
+        """
+        if first_iteration % SEED_BLOCK_SIZE != 0:
+            raise ValueError(
+                f"first_iteration deve ser múltiplo de {SEED_BLOCK_SIZE} (recebido: {first_iteration})"
+            )
+
+        self.iterations = iterations
+        self.antithetic = antithetic
+        self._blocks = []
+        for start in range(0, iterations, SEED_BLOCK_SIZE):
+            block_index = (first_iteration + start) // SEED_BLOCK_SIZE
+            stop = min(start + SEED_BLOCK_SIZE, iterations)
+            self._blocks.append((slice(start, stop), block_generator(seed, block_index)))
+
+    def _check_size(self, size) -> tuple:
+        size = (size,) if np.isscalar(size) else tuple(size)
+        if size[0] != self.iterations:
+            raise ValueError(f"O primeiro eixo deve ter {self.iterations} iterações (recebido: {size[0]})")
+        return size
+
+    def _fill(self, out: np.ndarray, draw, mirror) -> np.ndarray:
+        """Preenche `out` bloco a bloco com draw(generator, saída), espelhando os pares se antitético."""
+        for rows, generator in self._blocks:
+            block = out[rows]
+            if not self.antithetic:
+                draw(generator, block)
+                continue
+            count = block.shape[0]
+            primary = np.empty(((count + 1) // 2,) + block.shape[1:], dtype=block.dtype)
+            draw(generator, primary)
+            block[0::2] = primary
+            block[1::2] = mirror(primary[:count // 2])
+        return out
+
+    def random(self, size) -> np.ndarray:
+        """Uniformes em [0, 1) com formato `size`."""
+        return self._fill(
+            np.empty(self._check_size(size)),
+            lambda generator, out: generator.random(out=out),
+            lambda u: 1.0 - u
+        )
+
+    def standard_normal(self, size) -> np.ndarray:
+        """Normais padrão com formato `size`."""
+        return self._fill(
+            np.empty(self._check_size(size)),
+            lambda generator, out: generator.standard_normal(out=out),
+            np.negative
+        )
+
+    def integers(self, low: int, high: int, size) -> np.ndarray:
+        """Inteiros em [low, high) com formato `size`."""
+        def draw(generator, out):
+            out[...] = generator.integers(low, high, size=out.shape)
+
+        return self._fill(
+            np.empty(self._check_size(size), dtype=np.int64), draw, lambda x: low + high - 1 - x
+        )
+
+    def stratified(self, size: int) -> np.ndarray:
+        """
+        Uniformes estratificados dentro de cada bloco (ver stratified_uniforms).
+
+        Não são espelhados no modo antitético: a estratificação já equilibra o bloco.
+        """
+        out = np.empty(self._check_size(size))
+        for rows, generator in self._blocks:
+            out[rows] = stratified_uniforms(generator, rows.stop - rows.start)
+        return out
@@ -0,0 +1,164 @@
+"""
+Medição do tempo das fases de uma requisição de simulação.
+
+Um PhaseTimer é ativado no início da requisição (activate) e cada trecho do
+caminho crítico é envolvido em `with phase("nome"):`, mesmo em módulos que não
+conhecem a requisição (ex: race_setup). Fases aninhadas são descontadas da
+fase externa, então os tempos são exclusivos e somam o total medido. Sem
+timer ativo, phase() não faz nada.
+
+Ao final, as durações alimentam histogramas do processo (PhaseHistograms),
+expostos no formato de texto do Prometheus.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Fases de /simulation/run
+PHASE_SESSION_LOAD = "session_load"
+PHASE_PARAMETERS = "parameters"
+PHASE_SIMULATION = "simulation"
+PHASE_AGGREGATION = "aggregation"
+PHASE_SERIALIZATION = "serialization"
+
+PHASES = (PHASE_SESSION_LOAD, PHASE_PARAMETERS, PHASE_SIMULATION, PHASE_AGGREGATION, PHASE_SERIALIZATION)
+
+# Limites superiores (segundos) dos buckets dos histogramas
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_timer: contextvars.ContextVar[Optional["PhaseTimer"]] = contextvars.ContextVar(
+    "simulation_phase_timer", default=None
+)
+
+
+class PhaseTimer:
+    """Durações exclusivas (segundos) das fases de uma requisição."""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        # Pilha de [início, tempo das fases internas] das fases abertas
+        self._stack: List[List[float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Mede o bloco como fase `name` (somando, se a fase se repetir)."""
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.durations[name] = self.durations.get(name, 0.0) + elapsed - frame[1]
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    @property
+    def total(self) -> float:
+        """Soma das durações de todas as fases."""
+        return sum(self.durations.values())
+
+    def to_dict(self) -> Dict[str, float]:
+        """Durações em milissegundos, na ordem de PHASES (fases não executadas ficam de fora)."""
+        ordered = sorted(self.durations, key=lambda name: PHASES.index(name) if name in PHASES else len(PHASES))
+        timings = {name: round(self.durations[name] * 1000.0, 2) for name in ordered}
+        timings["total"] = round(self.total * 1000.0, 2)
+        return timings
+
+    def server_timing(self) -> str:
+        """Valor do cabeçalho Server-Timing (ex: "simulation;dur=812.4, total;dur=830.1")."""
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.to_dict().items())
+
+
+@contextmanager
+def activate(timer: PhaseTimer) -> Iterator[PhaseTimer]:
+    """Torna `timer` o timer ativo no contexto atual (thread ou tarefa)."""
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Mede o bloco no timer ativo (sem timer ativo, não faz nada)."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
+
+
+class PhaseHistograms:
+    """
+    Histogramas cumulativos das durações por fase, compartilhados pelo processo.
+
+    Seguras para uso concorrente (requisições em threads diferentes).
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = HISTOGRAM_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # fase -> [contagem por bucket (+Inf no fim), soma, contagem]
+        self._series: Dict[str, list] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Registra uma duração da fase `name`."""
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def observe_timer(self, timer: PhaseTimer) -> None:
+        """Registra todas as fases de uma requisição."""
+        for name, seconds in timer.durations.items():
+            self.observe(name, seconds)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Estado atual dos histogramas.
+
+        Returns:
+            {fase: {"buckets": {limite: contagem acumulada, ..., "+Inf": n}, "sum": s, "count": n}}
+        """
+        with self._lock:
+            result = {}
+            for name, (counts, total, count) in self._series.items():
+                cumulative, buckets = 0, {}
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    buckets["+Inf" if bound == float("inf") else f"{bound:g}"] = cumulative
+                result[name] = {"buckets": buckets, "sum": total, "count": count}
+            return result
+
+    def render_prometheus(self, metric: str = "simulation_phase_seconds") -> str:
+        """Histogramas no formato de texto do Prometheus (um rótulo `phase` por fase)."""
+        lines = [
+            f"# HELP {metric} Duração das fases das requisições de simulação (segundos)",
+            f"# TYPE {metric} histogram",
+        ]
+        for name, series in sorted(self.snapshot().items()):
+            for bound, count in series["buckets"].items():
+                lines.append(f'{metric}_bucket{{phase="{name}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_sum{{phase="{name}"}} {series["sum"]:.6f}')
+            lines.append(f'{metric}_count{{phase="{name}"}} {series["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+_histograms: Optional[PhaseHistograms] = None
+
+
+def get_phase_histograms() -> PhaseHistograms:
+    """Retorna os histogramas compartilhados do processo (criados na primeira chamada)."""
+    global _histograms
+    if _histograms is None:
+        _histograms = PhaseHistograms()
+    return _histograms
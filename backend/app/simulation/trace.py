@@ -0,0 +1,117 @@
+"""
+Codificação do Race Trace (corrida representativa) da resposta de /run.
+
+Formatos (parâmetro trace_format):
+- "full": lista de dicts por piloto com lap_history (tempo acumulado) e
+  position_history, o formato original
+- "columnar": arrays por campo (pilotos × voltas): intervalo para o líder em
+  float32 (arredondado a ms) e posições em uint8, como listas JSON
+- "packed": os mesmos arrays como buffers base64 little-endian; as posições
+  são codificadas por diferença entre voltas (módulo 256), o que deixa o
+  buffer quase todo em zeros e comprime bem com gzip
+"""
+import base64
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .models import RaceResult
+
+TRACE_FULL = "full"
+TRACE_COLUMNAR = "columnar"
+TRACE_PACKED = "packed"
+TRACE_FORMATS = (TRACE_FULL, TRACE_COLUMNAR, TRACE_PACKED)
+
+
+def _trace_arrays(lap_histories: List[list], position_histories: List[list]) -> Tuple[np.ndarray, np.ndarray]:
+    """Intervalo para o líder (float32) e posições (uint8), pilotos × voltas."""
+    if not lap_histories:
+        return np.zeros((0, 0), dtype=np.float32), np.zeros((0, 0), dtype=np.uint8)
+    cumulative = np.array(lap_histories, dtype=np.float64).reshape(len(lap_histories), -1)
+    gaps = (cumulative - cumulative.min(axis=0)).astype(np.float32)
+    positions = np.array(position_histories, dtype=np.uint8).reshape(len(position_histories), -1)
+    return gaps, positions
+
+
+def build_race_trace(results: List[RaceResult], total_laps: int, trace_format: str = TRACE_FULL) -> Dict:
+    """
+    Monta o bloco race_trace da resposta.
+
+    Args:
+        results: Resultados da corrida representativa (com histórico)
+        total_laps: Número de voltas
+        trace_format: "full", "columnar" ou "packed"
+
+    Returns:
+        Dict do race_trace no formato pedido (todos têm "total_laps"; os
+        compactos têm "format", "drivers" e "laps")
+    """
+    if trace_format not in TRACE_FORMATS:
+        raise ValueError(f"Formato de Race Trace inválido: {trace_format}")
+
+    if trace_format == TRACE_FULL:
+        return {
+            'lap_data': [
+                {
+                    'driver': result.driver_name,
+                    'lap_history': result.lap_history,
+                    'position_history': result.position_history
+                }
+                for result in results
+            ],
+            'total_laps': total_laps
+        }
+
+    gaps, positions = _trace_arrays(
+        [result.lap_history for result in results], [result.position_history for result in results]
+    )
+    trace = {
+        "format": trace_format,
+        "total_laps": total_laps,
+        "laps": int(positions.shape[1]),
+        "drivers": [result.driver_name for result in results],
+    }
+    if trace_format == TRACE_COLUMNAR:
+        # Arredonda depois de converter: float32 vira ruído em float (1.2339999675750732)
+        trace["gap_to_leader"] = np.round(gaps.astype(np.float64), 3).tolist()
+        trace["positions"] = positions.tolist()
+        return trace
+
+    # Diferença entre voltas consecutivas; a primeira coluna guarda a posição inicial
+    position_deltas = np.diff(positions, axis=1, prepend=np.uint8(0))
+    trace["gap_to_leader"] = base64.b64encode(gaps.astype("<f4").tobytes()).decode("ascii")
+    trace["positions"] = base64.b64encode(position_deltas.tobytes()).decode("ascii")
+    trace["positions_encoding"] = "delta"
+    return trace
+
+
+def decode_race_trace(trace: Dict) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Decodifica um race_trace em qualquer formato.
+
+    Returns:
+        Tupla (pilotos, intervalo para o líder em segundos (pilotos × voltas,
+        float32), posições (pilotos × voltas, uint8))
+    """
+    trace_format = trace.get("format", TRACE_FULL)
+    if trace_format == TRACE_FULL:
+        lap_data = trace.get("lap_data", [])
+        gaps, positions = _trace_arrays(
+            [d["lap_history"] for d in lap_data], [d["position_history"] for d in lap_data]
+        )
+        return [d["driver"] for d in lap_data], gaps, positions
+
+    drivers = list(trace["drivers"])
+    shape = (len(drivers), trace["laps"])
+    if trace_format == TRACE_COLUMNAR:
+        return (
+            drivers,
+            np.array(trace["gap_to_leader"], dtype=np.float32).reshape(shape),
+            np.array(trace["positions"], dtype=np.uint8).reshape(shape)
+        )
+
+    gaps = np.frombuffer(base64.b64decode(trace["gap_to_leader"]), dtype="<f4").reshape(shape)
+    deltas = np.frombuffer(base64.b64decode(trace["positions"]), dtype=np.uint8).reshape(shape)
+    # Soma acumulada módulo 256 desfaz a codificação por diferença
+    positions = np.cumsum(deltas, axis=1, dtype=np.uint8)
+    return drivers, gaps.astype(np.float32), positions
@@ -2,7 +2,9 @@
 Módulo de simulação de pneus para corridas F1.
 """
 from enum import Enum
-from typing import Dict
+from typing import Dict, List
+
+import numpy as np
 
 
 class TyreCompound(Enum):
@@ -14,11 +16,109 @@ class TyreCompound(Enum):
     WET = "WET"      # Wet (chuva pesada)
 
 
-class TyreModel:
+# Ordem compacta dos compostos nas tabelas (o código de um composto é o seu índice)
+COMPOUND_ORDER = [
+    TyreCompound.SOFT,
+    TyreCompound.MEDIUM,
+    TyreCompound.HARD,
+    TyreCompound.INTER,
+    TyreCompound.WET
+]
+COMPOUND_CODES = {compound: code for code, compound in enumerate(COMPOUND_ORDER)}
+
+# Idade mínima (em voltas) coberta pelas tabelas pré-calculadas
+DEFAULT_TABLE_AGE = 128
+
+
+def _invalidate_tables() -> None:
+    """Marca as tabelas pré-calculadas do TyreModel como desatualizadas."""
+    TyreModel._properties_version += 1
+
+
+class _TrackedDict(dict):
+    """
+    Dict que invalida as tabelas do TyreModel a cada alteração.
+    
+    Dicts aninhados (as propriedades de cada composto) também são rastreados,
+    então tanto TYRE_PROPERTIES[c] = {...} quanto TYRE_PROPERTIES[c]["max_laps"] = 25
+    disparam a reconstrução das tabelas.
+    """
+    
+    def __init__(self, data=()):
+        super().__init__()
+        for key, value in dict(data).items():
+            super().__setitem__(key, self._wrap(value))
+    
+    @staticmethod
+    def _wrap(value):
+        if isinstance(value, dict) and not isinstance(value, _TrackedDict):
+            return _TrackedDict(value)
+        return value
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, self._wrap(value))
+        _invalidate_tables()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        _invalidate_tables()
+    
+    def __ior__(self, other):
+        self.update(other)
+        return self
+    
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            super().__setitem__(key, self._wrap(value))
+        _invalidate_tables()
+    
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+    
+    def pop(self, *args):
+        value = super().pop(*args)
+        _invalidate_tables()
+        return value
+    
+    def popitem(self):
+        item = super().popitem()
+        _invalidate_tables()
+        return item
+    
+    def clear(self):
+        super().clear()
+        _invalidate_tables()
+    
+    def __reduce__(self):
+        # Serializa como dict comum (ex: envio para processos do pool)
+        return (dict, (self.to_dict(),))
+    
+    def to_dict(self) -> dict:
+        """Cópia profunda como dicts comuns."""
+        return {
+            key: value.to_dict() if isinstance(value, _TrackedDict) else value
+            for key, value in self.items()
+        }
+
+
+class _TyreModelMeta(type):
+    """Metaclasse que rastreia a substituição de TYRE_PROPERTIES."""
+    
+    def __setattr__(cls, name, value):
+        if name == "TYRE_PROPERTIES":
+            value = _TrackedDict(value)
+        super().__setattr__(name, value)
+        if name == "TYRE_PROPERTIES":
+            _invalidate_tables()
+
+
+class TyreModel(metaclass=_TyreModelMeta):
     """Modelo de comportamento dos pneus."""
     
     # Atributos por composto: (speed_bonus em segundos, degradation_rate em segundos/volta)
-    TYRE_PROPERTIES: Dict[TyreCompound, Dict[str, float]] = {
+    TYRE_PROPERTIES: Dict[TyreCompound, Dict[str, float]] = _TrackedDict({
         TyreCompound.SOFT: {
             "speed_bonus": -1.0,      # 1 segundo mais rápido que HARD
             "degradation_rate": 0.15,  # Degrada 0.15s por volta
@@ -44,13 +144,118 @@ class TyreModel:
             "degradation_rate": 0.06,  # Degrada 0.06s por volta
             "max_laps": 40
         }
-    }
+    })
+    
+    # Tabelas pré-calculadas (reconstruídas quando TYRE_PROPERTIES muda)
+    _properties_version: int = 0
+    _tables_version: int = -1
+    _penalty_table: np.ndarray = None
+    _penalty_rows: Dict[TyreCompound, List[float]] = None
+    _speed_bonus_vector: np.ndarray = None
+    _max_laps_vector: np.ndarray = None
+    
+    @staticmethod
+    def calibrate(compound: TyreCompound, **properties: float) -> None:
+        """
+        Atualiza propriedades de um composto (ex: após calibração com dados reais).
+        
+        Args:
+            compound: Composto a calibrar
+            **properties: Propriedades a atualizar (speed_bonus, degradation_rate, max_laps)
+        """
+        if compound in TyreModel.TYRE_PROPERTIES:
+            TyreModel.TYRE_PROPERTIES[compound].update(properties)
+        else:
+            TyreModel.TYRE_PROPERTIES[compound] = dict(properties)
+    
+    @staticmethod
+    def properties_version() -> int:
+        """Versão das propriedades (muda a cada alteração de TYRE_PROPERTIES; útil como chave de cache)."""
+        return TyreModel._properties_version
+    
+    @staticmethod
+    def properties_snapshot() -> Dict[TyreCompound, Dict[str, float]]:
+        """Cópia das propriedades como dicts comuns (para enviar a outros processos)."""
+        return TyreModel.TYRE_PROPERTIES.to_dict()
+    
+    @staticmethod
+    def _ensure_tables(max_age: int = DEFAULT_TABLE_AGE) -> None:
+        """Reconstrói as tabelas se as propriedades mudaram ou se `max_age` não é coberta."""
+        if (
+            TyreModel._tables_version == TyreModel._properties_version
+            and TyreModel._penalty_table.shape[1] >= max_age
+        ):
+            return
+        
+        version = TyreModel._properties_version
+        if TyreModel._tables_version == version:
+            max_age = max(max_age, 2 * TyreModel._penalty_table.shape[1])
+        max_age = max(max_age, DEFAULT_TABLE_AGE)
+        
+        penalty_table = np.array([
+            [TyreModel._compute_lap_penalty(compound, laps) for laps in range(max_age)]
+            for compound in COMPOUND_ORDER
+        ])
+        properties = [TyreModel.TYRE_PROPERTIES.get(c, {}) for c in COMPOUND_ORDER]
+        
+        TyreModel._penalty_table = penalty_table
+        TyreModel._penalty_rows = {
+            compound: penalty_table[code].tolist()
+            for compound, code in COMPOUND_CODES.items()
+            if compound in TyreModel.TYRE_PROPERTIES
+        }
+        TyreModel._speed_bonus_vector = np.array([p.get("speed_bonus", 0.0) for p in properties])
+        TyreModel._max_laps_vector = np.array([p.get("max_laps", 30) for p in properties], dtype=float)
+        TyreModel._tables_version = version
+    
+    @staticmethod
+    def get_penalty_table(max_age: int = DEFAULT_TABLE_AGE) -> np.ndarray:
+        """
+        Tabela pré-calculada de penalidades (composto × idade do pneu).
+        
+        Args:
+            max_age: Idade mínima (em voltas) que a tabela deve cobrir
+        
+        Returns:
+            Array (len(COMPOUND_ORDER), >= max_age), indexado por código de composto
+            e voltas de uso; mesmo valor de get_lap_penalty
+        """
+        TyreModel._ensure_tables(max_age)
+        return TyreModel._penalty_table
+    
+    @staticmethod
+    def get_penalty_rows(max_age: int = DEFAULT_TABLE_AGE) -> Dict[TyreCompound, List[float]]:
+        """
+        Penalidades pré-calculadas por composto, como listas (uso no laço escalar).
+        
+        Args:
+            max_age: Idade mínima (em voltas) que as listas devem cobrir
+        
+        Returns:
+            Dict {composto: [penalidade com 0 voltas, 1 volta, ...]}
+        """
+        TyreModel._ensure_tables(max_age)
+        return TyreModel._penalty_rows
+    
+    @staticmethod
+    def get_speed_bonus_vector() -> np.ndarray:
+        """Bônus de velocidade indexado por código de composto (COMPOUND_CODES)."""
+        TyreModel._ensure_tables()
+        return TyreModel._speed_bonus_vector
+    
+    @staticmethod
+    def get_max_laps_vector() -> np.ndarray:
+        """Durabilidade máxima (max_laps) indexada por código de composto."""
+        TyreModel._ensure_tables()
+        return TyreModel._max_laps_vector
     
     @staticmethod
     def get_lap_penalty(compound: TyreCompound, laps_used: int) -> float:
         """
         Calcula a penalidade de tempo (em segundos) devido ao desgaste do pneu.
         
+        Consulta a tabela pré-calculada; idades fora da tabela são calculadas na hora.
+        
         Args:
             compound: Composto do pneu
             laps_used: Número de voltas que o pneu já rodou
@@ -58,6 +263,19 @@ class TyreModel:
         Returns:
             Penalidade de tempo em segundos (quanto mais, pior)
         """
+        if TyreModel._tables_version != TyreModel._properties_version:
+            TyreModel._ensure_tables()
+        
+        row = TyreModel._penalty_rows.get(compound)
+        if row is None:
+            return 0.0
+        if 0 <= laps_used < len(row):
+            return row[laps_used]
+        return TyreModel._compute_lap_penalty(compound, laps_used)
+    
+    @staticmethod
+    def _compute_lap_penalty(compound: TyreCompound, laps_used: int) -> float:
+        """Curva de desgaste (linear + aceleração após 70% da vida útil)."""
         if compound not in TyreModel.TYRE_PROPERTIES:
             return 0.0
         
@@ -0,0 +1,622 @@
+"""
+Motor de simulação vetorizado (NumPy) para Monte Carlo de corridas F1.
+
+Simula um bloco (iterações × pilotos) de corridas de uma só vez, volta a volta,
+com o estado de cada carro guardado em arrays. Reproduz as mesmas regras de
+engine.simulate_race (pneus, clima e decisão de pit stop), que continua sendo
+a implementação de referência.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .models import DriverSim, MonteCarloStats, SweepScenario
+from .tyres import TyreModel, COMPOUND_ORDER
+from .weather import WeatherEngine, WeatherCondition, WEATHER_CODES, WEATHER_MODELS, WEATHER_ORDER
+from .engine import F1_POINTS_SYSTEM
+from .streams import BlockedGenerator, INDEPENDENT_SAMPLING, SEED_BLOCK_SIZE, VarianceReduction, resolve_seed
+from .strategy import PIT_STRATEGIES, best_plan
+from .scoring import FantasyScorer
+from .head_to_head import ahead_counts
+
+# Códigos dos compostos (índices de COMPOUND_ORDER nas tabelas do TyreModel)
+SOFT, MEDIUM, HARD, INTER, WET = range(len(COMPOUND_ORDER))
+
+# Número de compostos distintos em cada máscara de bits de compostos usados
+_POPCOUNT = np.array([bin(mask).count("1") for mask in range(1 << len(COMPOUND_ORDER))], dtype=np.int8)
+
+# Tamanho padrão do lote de iterações (mantém os arrays de trabalho no cache da CPU;
+# múltiplo de SEED_BLOCK_SIZE)
+DEFAULT_BATCH_SIZE = 4 * SEED_BLOCK_SIZE
+
+
+def _build_tyre_tables(max_age: int):
+    """
+    Monta, a partir das tabelas pré-calculadas do TyreModel, as tabelas achatadas
+    usadas no laço vetorizado.
+
+    O estado do pneu de cada carro é um único índice `codigo * max_age + idade`,
+    e avançar uma volta é somar 1 ao índice.
+
+    Returns:
+        Tupla (lap_delta, is_worn, speed_bonus):
+            - lap_delta: penalidade de desgaste menos bônus de velocidade
+            - is_worn: pneu com 80% ou mais da vida útil
+            - speed_bonus: bônus de velocidade por código de composto
+    """
+    penalty = TyreModel.get_penalty_table(max_age)[:, :max_age]
+    speed_bonus = TyreModel.get_speed_bonus_vector()
+    max_laps = TyreModel.get_max_laps_vector()
+    ages = np.arange(max_age)[None, :]
+
+    lap_delta = (penalty - speed_bonus[:, None]).ravel()
+    is_worn = (ages >= max_laps[:, None] * 0.8).ravel()
+    return lap_delta, is_worn, speed_bonus
+
+
+def _next_tyre_table(laps_remaining: int) -> np.ndarray:
+    """
+    Versão tabelada de engine._choose_next_tyre.
+
+    Args:
+        laps_remaining: Voltas restantes na corrida
+
+    Returns:
+        Array (climas × máscaras de compostos usados) com o código do próximo composto
+    """
+    # Já usou 2 compostos: escolhe o melhor para chegar ao fim
+    if laps_remaining > 25:
+        finishing = HARD
+    elif laps_remaining > 15:
+        finishing = MEDIUM
+    else:
+        finishing = SOFT
+
+    masks = np.arange(len(_POPCOUNT))
+
+    # Ainda não usou 2 compostos: o mais rápido seco que falta
+    missing = np.where(
+        (masks & (1 << SOFT)) == 0, SOFT,
+        np.where((masks & (1 << MEDIUM)) == 0, MEDIUM, HARD)
+    )
+
+    table = np.empty((len(WEATHER_ORDER), len(masks)), dtype=np.int64)
+    table[WEATHER_CODES[WeatherCondition.DRY]] = np.where(_POPCOUNT < 2, missing, finishing)
+    table[WEATHER_CODES[WeatherCondition.MIXED]] = INTER
+    table[WEATHER_CODES[WeatherCondition.WET]] = WET
+    return table.ravel()
+
+
+def _planned_schedule(
+    pit_stop_losses: List[float],
+    total_laps: int,
+    weather_codes: np.ndarray
+) -> Tuple[np.ndarray, Dict[int, np.ndarray]]:
+    """
+    Tabelas da estratégia planejada (strategy.best_plan) por clima e piloto.
+
+    Args:
+        pit_stop_losses: Tempo perdido no pit stop de cada piloto
+        total_laps: Número total de voltas
+        weather_codes: Códigos dos climas presentes no lote (só estes são planejados)
+
+    Returns:
+        Tupla (start, schedule):
+            - start: array (climas × pilotos) com o composto de largada
+            - schedule: {volta: array (climas × pilotos) com o próximo composto,
+              ou -1 se o piloto não para nessa volta}
+    """
+    shape = (len(WEATHER_ORDER), len(pit_stop_losses))
+    start = np.full(shape, SOFT, dtype=np.int64)
+    schedule: Dict[int, np.ndarray] = {}
+
+    for weather_code in np.unique(weather_codes):
+        for index, pit_stop_loss in enumerate(pit_stop_losses):
+            plan = best_plan(WEATHER_ORDER[weather_code], total_laps, pit_stop_loss)
+            start[weather_code, index] = COMPOUND_ORDER.index(plan.compounds[0])
+            for lap, compound in zip(plan.pit_laps, plan.compounds[1:]):
+                if lap not in schedule:
+                    schedule[lap] = np.full(shape, -1, dtype=np.int64)
+                schedule[lap][weather_code, index] = COMPOUND_ORDER.index(compound)
+
+    return start, schedule
+
+
+class _ScenarioState:
+    """
+    Estado vetorizado (iterações × pilotos) das corridas de um cenário.
+
+    Os sorteios de cada volta são feitos por quem chama e passados a
+    run_lap(), de modo que vários cenários podem consumir os mesmos números
+    aleatórios (varreduras com números aleatórios comuns).
+    """
+
+    def __init__(
+        self,
+        drivers: List[DriverSim],
+        total_laps: int,
+        weather: np.ndarray,
+        compound: Optional[np.ndarray],
+        pit_strategy: str = "reactive",
+        pit_stop_loss: Optional[float] = None,
+        timeline: Optional[np.ndarray] = None,
+        lap_impact: Optional[np.ndarray] = None,
+        track_best_lap: bool = False
+    ):
+        """
+        Args:
+            drivers: Lista de pilotos
+            total_laps: Número total de voltas
+            weather: Código do clima de cada corrida (iterações,); com `timeline`,
+                o clima da largada
+            compound: Composto de largada sorteado (iterações × pilotos); ignorado
+                na estratégia planejada
+            pit_strategy: "reactive" ou "planned"
+            pit_stop_loss: Tempo de pit stop para todos os pilotos (None = o de cada piloto)
+            timeline: Clima de cada volta (iterações × voltas), no modelo "markov"
+            lap_impact: Multiplicador de cada volta (iterações × voltas), comum a
+                todos os pilotos (obrigatório se a linha do tempo tiver chuva)
+            track_best_lap: Guarda a melhor volta de cada carro (best_lap), para
+                o bônus de volta mais rápida da pontuação de Fantasy
+        """
+        shape = (len(weather), len(drivers))
+        self.total_laps = total_laps
+        self.weather = weather
+
+        # Idade máxima consultada: vida do pneu na corrida + metade das voltas (estimativa futura)
+        self.max_age = 2 * total_laps + 2
+        self.lap_delta, self.is_worn, self.speed_bonus = _build_tyre_tables(self.max_age)
+
+        self.base_lap_time = np.array([d.base_lap_time for d in drivers])
+        self.consistency = np.array([d.consistency for d in drivers])
+        losses = [d.pit_stop_loss if pit_stop_loss is None else pit_stop_loss for d in drivers]
+        self.pit_stop_loss = np.broadcast_to(np.array(losses, dtype=np.float64), shape)
+
+        # Clima de cada corrida (uma condição por iteração)
+        self.weather_col = weather[:, None]
+        self.weather_key = np.broadcast_to(self.weather_col.astype(np.int64) * len(_POPCOUNT), shape)
+        self.has_rain = bool(np.any(weather != WEATHER_CODES[WeatherCondition.DRY]))
+
+        # Modelo "markov": clima por volta e penalidade de pneu inadequado,
+        # achatada como as tabelas de pneus (clima * passo + estado do pneu)
+        self.timeline = timeline
+        self.lap_impact = lap_impact
+        if timeline is not None:
+            self.mismatch_stride = len(COMPOUND_ORDER) * self.max_age
+            self.mismatch = np.repeat(WeatherEngine.mismatch_penalty_table(), self.max_age, axis=1).ravel()
+            if compound is not None:
+                # Largada com pneu de chuva se já estiver chovendo
+                compound = np.where(self.weather_col == WEATHER_CODES[WeatherCondition.MIXED], INTER, compound)
+                compound = np.where(self.weather_col == WEATHER_CODES[WeatherCondition.WET], WET, compound)
+
+        # Estado inicial: pneu novo, sorteado (ou o da estratégia planejada)
+        if pit_strategy == "planned":
+            start, self.schedule = _planned_schedule(losses, total_laps, weather)
+            compound = start[weather]
+            # Carros que ainda seguem o plano (um crossover abandona o plano)
+            self.on_plan = np.ones(shape, dtype=bool)
+        else:
+            self.schedule = None
+        self.tyre_state = compound * self.max_age
+        self.used_mask = 1 << compound
+        self.total_time = np.zeros(shape)
+        self.best_lap = np.full(shape, np.inf) if track_best_lap else None
+
+    def _reactive_decision(
+        self,
+        weather_key: np.ndarray,
+        laps_remaining: int,
+        full: bool = False
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Decisão de pit volta a volta (desgaste ou custo de continuar).
+
+        Returns:
+            Tupla (pit, próximo composto); o próximo composto só é calculado
+            para todos os carros se faltarem mais de 5 voltas ou com `full`
+        """
+        tyre_state = self.tyre_state
+        pit = self.is_worn.take(tyre_state)
+        next_tyre = None
+        if laps_remaining > 5 or full:
+            next_tyre = _next_tyre_table(laps_remaining - 1).take(weather_key + self.used_mask)
+        if laps_remaining > 5:
+            # Diferença de ritmo médio entre continuar e trocar (o tempo base se cancela)
+            cost_to_continue = self.lap_delta.take(tyre_state + laps_remaining // 2)
+            cost_to_continue += self.speed_bonus.take(next_tyre)
+            cost_to_continue *= laps_remaining
+            pit |= cost_to_continue > self.pit_stop_loss
+        return pit, next_tyre
+
+    def run_lap(self, lap: int, noise: np.ndarray, impact_draws: Optional[np.ndarray]) -> None:
+        """
+        Simula uma volta de todas as corridas do cenário.
+
+        Args:
+            lap: Número da volta (1..total_laps; voltas além do fim são ignoradas)
+            noise: Normais padrão (iterações × pilotos) da variação do tempo de volta
+            impact_draws: Uniformes (iterações × pilotos) do impacto do clima
+                (obrigatório se houver chuva no cenário; ignorado no modelo "markov")
+        """
+        if lap > self.total_laps:
+            return
+        laps_remaining = self.total_laps - lap + 1
+        max_age = self.max_age
+        tyre_state = self.tyre_state
+
+        # Tempo da volta: base + variação aleatória + penalidade do pneu - bônus do pneu
+        lap_time = noise * self.consistency
+        lap_time += self.base_lap_time
+        lap_time += self.lap_delta.take(tyre_state)
+
+        if self.timeline is not None:
+            # Clima da volta: penalidade de pneu inadequado e multiplicador comum ao grid
+            weather_now = self.timeline[:, lap - 1, None].astype(np.int64)
+            mismatch_key = weather_now * self.mismatch_stride
+            lap_time += self.mismatch.take(mismatch_key + tyre_state)
+            if self.lap_impact is not None:
+                lap_time *= self.lap_impact[:, lap - 1, None]
+            weather_key = np.broadcast_to(weather_now * len(_POPCOUNT), lap_time.shape)
+        else:
+            # Impacto do clima (sorteado por piloto/volta, como na referência)
+            if self.has_rain:
+                lap_time *= WeatherEngine.impact_from_uniforms(self.weather_col, impact_draws)
+            weather_key = self.weather_key
+
+        self.total_time += lap_time
+        if self.best_lap is not None:
+            np.minimum(self.best_lap, lap_time, out=self.best_lap)
+        tyre_state += 1
+
+        # Decisão de pit stop (exceto na última volta)
+        if lap == self.total_laps:
+            return
+
+        # Crossover: pneu inadequado ao clima atual custa mais que o pit até o fim
+        crossover = None
+        if self.timeline is not None:
+            crossover = self.mismatch.take(mismatch_key + tyre_state) * (laps_remaining - 1) > self.pit_stop_loss
+
+        next_tyre = None
+        if self.schedule is not None and crossover is None:
+            # Estratégia planejada: só para nas voltas do plano
+            planned = self.schedule.get(lap)
+            if planned is None:
+                return
+            next_tyre = planned[self.weather]
+            pit = next_tyre >= 0
+        elif self.schedule is not None:
+            # Plano com clima variável: quem faz crossover passa a decidir volta a volta
+            self.on_plan &= ~crossover
+            pit, next_tyre = self._reactive_decision(weather_key, laps_remaining, full=True)
+            pit &= ~self.on_plan
+            pit |= crossover
+            planned = self.schedule.get(lap)
+            if planned is not None:
+                planned_next = planned[self.weather]
+                planned_stop = self.on_plan & (planned_next >= 0)
+                pit |= planned_stop
+                next_tyre = np.where(planned_stop, planned_next, next_tyre)
+        else:
+            pit, next_tyre = self._reactive_decision(weather_key, laps_remaining)
+            if crossover is not None:
+                pit |= crossover
+
+        # Aplica as trocas apenas nos carros que param (poucos por volta)
+        stops = np.flatnonzero(pit)
+        if stops.size == 0:
+            return
+
+        if next_tyre is not None:
+            new_tyre = next_tyre.ravel()[stops]
+        else:
+            new_tyre = _next_tyre_table(laps_remaining - 1).take(
+                weather_key.ravel()[stops] + self.used_mask.ravel()[stops]
+            )
+
+        self.total_time.ravel()[stops] += self.pit_stop_loss.ravel()[stops]
+        tyre_state.ravel()[stops] = new_tyre * max_age
+        self.used_mask.ravel()[stops] |= 1 << new_tyre
+
+
+def _simulate_batch(
+    drivers: List[DriverSim],
+    total_laps: int,
+    iterations: int,
+    weather_prob: float,
+    rng: BlockedGenerator,
+    pit_strategy: str = "reactive",
+    stratified_weather: bool = False,
+    weather_model: str = "static",
+    scorer: Optional[FantasyScorer] = None,
+    record_positions: bool = False,
+    head_to_head: bool = False
+) -> MonteCarloStats:
+    """Simula um lote de `iterations` corridas e devolve as estatísticas do lote."""
+    shape = (iterations, len(drivers))
+
+    timeline = lap_impact = None
+    if weather_model == "markov":
+        # Linha do tempo do clima e multiplicadores por volta sorteados antes da largada
+        timeline = WeatherEngine.weather_timeline_batch(
+            weather_prob, iterations, total_laps, rng, stratified=stratified_weather
+        )
+        if np.any(timeline != WEATHER_CODES[WeatherCondition.DRY]):
+            lap_impact = WeatherEngine.impact_from_uniforms(timeline, rng.random((iterations, total_laps)))
+        weather = timeline[:, 0]
+    else:
+        weather = WeatherEngine.determine_weather_batch(weather_prob, iterations, rng, stratified=stratified_weather)
+
+    compound = None if pit_strategy == "planned" else rng.integers(SOFT, MEDIUM + 1, size=shape)
+    state = _ScenarioState(
+        drivers, total_laps, weather, compound, pit_strategy, timeline=timeline, lap_impact=lap_impact,
+        track_best_lap=scorer is not None
+    )
+    # No modelo "markov" o impacto já está em lap_impact (sem sorteio por piloto)
+    per_driver_impact = state.has_rain and timeline is None
+
+    for lap in range(1, total_laps + 1):
+        noise = rng.standard_normal(shape)
+        impact_draws = rng.random(shape) if per_driver_impact else None
+        state.run_lap(lap, noise, impact_draws)
+
+    if timeline is not None:
+        weather = WeatherEngine.predominant_weather(timeline)
+    return _aggregate(
+        drivers, state.total_time, weather, paired=rng.antithetic, scorer=scorer, best_lap=state.best_lap,
+        record_positions=record_positions, head_to_head=head_to_head
+    )
+
+
+def _simulate_sweep_batch(
+    drivers: List[DriverSim],
+    scenarios: List[SweepScenario],
+    iterations: int,
+    rng: BlockedGenerator,
+    pit_strategy: str = "reactive"
+) -> List[MonteCarloStats]:
+    """
+    Simula um lote de corridas para vários cenários com os mesmos sorteios.
+
+    Clima (via os mesmos uniformes), pneu de largada, variação de cada volta e
+    impacto da chuva são sorteados uma vez e aplicados a todos os cenários.
+    """
+    shape = (iterations, len(drivers))
+
+    rain_draws = rng.random(iterations)
+    split_draws = rng.random(iterations)
+    compound = rng.integers(SOFT, MEDIUM + 1, size=shape)
+
+    states = [
+        _ScenarioState(
+            drivers, scenario.total_laps,
+            WeatherEngine.weather_from_uniforms(scenario.weather_prob, rain_draws, split_draws),
+            compound, pit_strategy, scenario.pit_stop_loss
+        )
+        for scenario in scenarios
+    ]
+    has_rain = any(state.has_rain for state in states)
+
+    for lap in range(1, max(scenario.total_laps for scenario in scenarios) + 1):
+        noise = rng.standard_normal(shape)
+        impact_draws = rng.random(shape) if has_rain else None
+        for state in states:
+            state.run_lap(lap, noise, impact_draws)
+
+    return [_aggregate(drivers, state.total_time, state.weather) for state in states]
+
+
+def _group_moments(indicator: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Momentos por par antitético (linhas 2k e 2k+1) de um indicador 0/1.
+
+    Args:
+        indicator: Array (iterações × pilotos) de 0/1 (ex: vitória)
+
+    Returns:
+        Tupla (soma dos quadrados das contagens por grupo,
+        soma de tamanho do grupo × contagem), por piloto
+    """
+    paired = indicator.shape[0] - indicator.shape[0] % 2
+    counts = indicator[0:paired:2] + indicator[1:paired:2]
+    counts_sq = (counts * counts).sum(axis=0)
+    weighted = 2 * counts.sum(axis=0)
+    if paired < indicator.shape[0]:
+        # Última corrida sem par: grupo de tamanho 1
+        counts_sq += indicator[-1]
+        weighted += indicator[-1]
+    return counts_sq, weighted
+
+
+def _aggregate(
+    drivers: List[DriverSim],
+    total_time: np.ndarray,
+    weather: np.ndarray,
+    paired: bool = False,
+    scorer: Optional[FantasyScorer] = None,
+    best_lap: Optional[np.ndarray] = None,
+    record_positions: bool = False,
+    head_to_head: bool = False
+) -> MonteCarloStats:
+    """
+    Converte os tempos totais (iterações × pilotos) em estatísticas agregadas.
+
+    Com `paired`, os momentos por grupo (MonteCarloStats.wins_sq etc.) são
+    calculados por par antitético; sem ele, cada corrida é um grupo. Com
+    `scorer` (e a melhor volta de cada carro), inclui a distribuição da
+    pontuação de Fantasy; com `record_positions`, a matriz de posições finais;
+    com `head_to_head`, as contagens de confronto direto.
+    """
+    iterations, num_drivers = total_time.shape
+
+    # Ordem de chegada (índices dos pilotos) e posição final de cada piloto
+    order = np.argsort(total_time, axis=1, kind="stable")
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, num_drivers + 1), axis=1)
+
+    points_table = np.array([F1_POINTS_SYSTEM.get(p, 0) for p in range(num_drivers + 1)], dtype=np.int64)
+    weather_counts = np.bincount(weather, minlength=len(WEATHER_ORDER))
+    wins = np.bincount(order[:, 0], minlength=num_drivers)
+    podiums = np.bincount(order[:, :3].ravel(), minlength=num_drivers)
+
+    if paired:
+        wins_sq, wins_weighted = _group_moments((positions == 1).astype(np.int64))
+        podiums_sq, podiums_weighted = _group_moments((positions <= 3).astype(np.int64))
+        group_size_sq = 4 * (iterations // 2) + iterations % 2
+    else:
+        # Grupos de uma corrida: contagem² = contagem (indicador 0/1)
+        wins_sq, wins_weighted = wins.copy(), wins.copy()
+        podiums_sq, podiums_weighted = podiums.copy(), podiums.copy()
+        group_size_sq = iterations
+
+    return MonteCarloStats(
+        driver_names=[d.name for d in drivers],
+        iterations=iterations,
+        wins=wins,
+        podiums=podiums,
+        positions_sum=positions.sum(axis=0),
+        points_sum=points_table[positions].sum(axis=0),
+        weather_counts={
+            condition.value: int(count)
+            for condition, count in zip(WEATHER_ORDER, weather_counts)
+            if count > 0
+        },
+        group_size_sq=group_size_sq,
+        wins_sq=wins_sq,
+        wins_weighted=wins_weighted,
+        podiums_sq=podiums_sq,
+        podiums_weighted=podiums_weighted,
+        fantasy=scorer.distribution(positions, best_lap) if scorer is not None else None,
+        finishing_positions=positions.astype(np.uint8) if record_positions else None,
+        ahead_counts=ahead_counts(positions) if head_to_head else None
+    )
+
+
+def simulate_races_batch(
+    drivers: List[DriverSim],
+    total_laps: int,
+    iterations: int,
+    weather_prob: float = 0.0,
+    seed: Optional[int] = None,
+    first_iteration: int = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pit_strategy: str = "reactive",
+    variance_reduction: VarianceReduction = INDEPENDENT_SAMPLING,
+    weather_model: str = "static",
+    fantasy: bool = False,
+    record_positions: bool = False,
+    head_to_head: bool = False
+) -> MonteCarloStats:
+    """
+    Simula `iterations` corridas em blocos vetorizados e agrega as estatísticas.
+
+    Cada bloco de SEED_BLOCK_SIZE iterações usa o subfluxo aleatório do seu
+    índice global, então o resultado para uma semente não depende de
+    `batch_size` nem de como as iterações foram divididas entre chamadas
+    (também com redução de variância: os pares antitéticos e os estratos do
+    clima ficam dentro de cada bloco).
+
+    Args:
+        drivers: Lista de pilotos para a simulação
+        total_laps: Número total de voltas da corrida
+        iterations: Número de corridas (iterações Monte Carlo)
+        weather_prob: Probabilidade de chuva (0.0 a 1.0)
+        seed: Semente da execução (None = entropia do sistema)
+        first_iteration: Índice global da primeira iteração (múltiplo de SEED_BLOCK_SIZE)
+        batch_size: Iterações simuladas por bloco (múltiplo de SEED_BLOCK_SIZE)
+        pit_strategy: "reactive" ou "planned" (ver engine.simulate_race)
+        variance_reduction: Variáveis antitéticas e/ou clima estratificado
+            (ver streams.VarianceReduction)
+        weather_model: "static" (uma condição por corrida) ou "markov" (clima
+            volta a volta, ver weather.py); no "markov", weather_counts conta a
+            condição predominante de cada corrida
+        fantasy: Calcula a distribuição da pontuação de Fantasy (MonteCarloStats.fantasy,
+            ver scoring.py)
+        record_positions: Guarda a posição final de cada piloto em cada corrida
+            (MonteCarloStats.finishing_positions, uint8)
+        head_to_head: Conta quantas vezes cada piloto terminou à frente de cada
+            outro (MonteCarloStats.ahead_counts, ver head_to_head.py)
+
+    Returns:
+        MonteCarloStats com vitórias, pódios, soma de posições/pontos e climas
+    """
+    if batch_size <= 0 or batch_size % SEED_BLOCK_SIZE != 0:
+        raise ValueError(f"batch_size deve ser múltiplo de {SEED_BLOCK_SIZE} (recebido: {batch_size})")
+    if pit_strategy not in PIT_STRATEGIES:
+        raise ValueError(f"Estratégia de pit inválida: {pit_strategy}")
+    if weather_model not in WEATHER_MODELS:
+        raise ValueError(f"Modelo de clima inválido: {weather_model}")
+
+    seed = resolve_seed(seed)
+    stats = MonteCarloStats(driver_names=[d.name for d in drivers])
+    scorer = FantasyScorer(drivers) if fantasy else None
+    position_batches = []
+
+    for offset in range(0, iterations, batch_size):
+        batch = min(batch_size, iterations - offset)
+        rng = BlockedGenerator(seed, first_iteration + offset, batch, antithetic=variance_reduction.antithetic)
+        partial = _simulate_batch(
+            drivers, total_laps, batch, weather_prob, rng, pit_strategy,
+            variance_reduction.stratified_weather, weather_model, scorer, record_positions, head_to_head
+        )
+        # Concatena as posições uma vez no fim, em vez de a cada lote
+        if record_positions:
+            position_batches.append(partial.finishing_positions)
+            partial.finishing_positions = None
+        stats.merge(partial)
+
+    if record_positions:
+        stats.finishing_positions = (
+            np.concatenate(position_batches) if position_batches
+            else np.zeros((0, len(drivers)), dtype=np.uint8)
+        )
+    return stats
+
+
+def simulate_sweep_batch(
+    drivers: List[DriverSim],
+    scenarios: List[SweepScenario],
+    iterations: int,
+    seed: Optional[int] = None,
+    first_iteration: int = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pit_strategy: str = "reactive"
+) -> List[MonteCarloStats]:
+    """
+    Simula uma varredura de cenários com números aleatórios comuns.
+
+    Todos os cenários usam os mesmos sorteios em cada iteração, então as
+    diferenças entre cenários refletem só a mudança de parâmetro (curvas
+    mais suaves) e os sorteios, que dominam o custo, são feitos uma vez só.
+    Como em simulate_races_batch, o resultado não depende de `batch_size`
+    nem da divisão em shards.
+
+    Args:
+        drivers: Lista de pilotos para a simulação
+        scenarios: Cenários da varredura (probabilidade de chuva, voltas, pit stop)
+        iterations: Número de corridas por cenário
+        seed: Semente da execução (None = entropia do sistema)
+        first_iteration: Índice global da primeira iteração (múltiplo de SEED_BLOCK_SIZE)
+        batch_size: Iterações simuladas por bloco (múltiplo de SEED_BLOCK_SIZE)
+        pit_strategy: "reactive" ou "planned" (ver engine.simulate_race)
+
+    Returns:
+        Lista de MonteCarloStats, na ordem de `scenarios`
+    """
+    if batch_size <= 0 or batch_size % SEED_BLOCK_SIZE != 0:
+        raise ValueError(f"batch_size deve ser múltiplo de {SEED_BLOCK_SIZE} (recebido: {batch_size})")
+    if pit_strategy not in PIT_STRATEGIES:
+        raise ValueError(f"Estratégia de pit inválida: {pit_strategy}")
+    if not scenarios:
+        raise ValueError("A varredura precisa de pelo menos um cenário")
+
+    seed = resolve_seed(seed)
+    results = [MonteCarloStats(driver_names=[d.name for d in drivers]) for _ in scenarios]
+
+    for offset in range(0, iterations, batch_size):
+        batch = min(batch_size, iterations - offset)
+        rng = BlockedGenerator(seed, first_iteration + offset, batch)
+        for stats, partial in zip(results, _simulate_sweep_batch(drivers, scenarios, batch, rng, pit_strategy)):
+            stats.merge(partial)
+
+    return results
@@ -1,8 +1,24 @@
 """
 Módulo de simulação de clima para corridas F1.
+
+Há dois modelos de clima:
+
+- "static": uma condição sorteada para a corrida inteira (modelo original);
+- "markov": a condição evolui volta a volta por uma cadeia de Markov
+  (DRY ↔ MIXED ↔ WET). A linha do tempo de cada corrida é sorteada antes da
+  largada, o multiplicador de tempo de cada volta é o mesmo para todos os
+  pilotos e pneus inadequados à condição custam tempo (ver
+  TYRE_MISMATCH_PENALTY), o que leva a pit stops de troca de pneu
+  (crossover) quando a chuva chega ou vai embora.
 """
 import random
 from enum import Enum
+from typing import List, Optional
+
+import numpy as np
+
+from .streams import stratified_uniforms
+from .tyres import TyreCompound, COMPOUND_ORDER
 
 
 class WeatherCondition(Enum):
@@ -12,14 +28,45 @@ class WeatherCondition(Enum):
     WET = "WET"
 
 
+# Códigos compactos das condições climáticas (índices usados pelo motor vetorizado)
+WEATHER_ORDER = [WeatherCondition.DRY, WeatherCondition.MIXED, WeatherCondition.WET]
+WEATHER_CODES = {condition: code for code, condition in enumerate(WEATHER_ORDER)}
+
+# Modelos de clima aceitos pelos motores de simulação
+WEATHER_MODELS = ("static", "markov")
+
+# Perda de tempo por volta (s) com um composto inadequado à condição (modelo "markov")
+TYRE_MISMATCH_PENALTY = {
+    WeatherCondition.DRY: {TyreCompound.INTER: 3.0, TyreCompound.WET: 6.0},
+    WeatherCondition.MIXED: {
+        TyreCompound.SOFT: 5.0, TyreCompound.MEDIUM: 5.0, TyreCompound.HARD: 5.0, TyreCompound.WET: 2.0
+    },
+    WeatherCondition.WET: {
+        TyreCompound.SOFT: 12.0, TyreCompound.MEDIUM: 12.0, TyreCompound.HARD: 12.0, TyreCompound.INTER: 3.0
+    }
+}
+
+
 class WeatherEngine:
     """Motor de simulação de impacto climático."""
     
+    # Faixa do multiplicador de tempo de volta por condição (mínimo, máximo)
+    IMPACT_RANGES = {
+        WeatherCondition.DRY: (1.0, 1.0),
+        WeatherCondition.MIXED: (1.05, 1.10),
+        WeatherCondition.WET: (1.15, 1.20)
+    }
+    
+    # Modelo "markov": escala da probabilidade de o clima mudar de estado a cada
+    # volta (ver transition_matrix)
+    CHANGE_RATE = 0.02
+    
     @staticmethod
     def apply_weather_impact(
         lap_time: float,
         condition: WeatherCondition,
-        driver_skill: float = 1.0
+        driver_skill: float = 1.0,
+        rng: Optional[random.Random] = None
     ) -> float:
         """
         Aplica o impacto do clima no tempo de volta.
@@ -28,10 +75,14 @@ class WeatherEngine:
             lap_time: Tempo de volta base (em segundos)
             condition: Condição climática (DRY, MIXED, WET)
             driver_skill: Fator de habilidade do piloto (1.0 = padrão, >1.0 = melhor na chuva)
+            rng: Gerador a usar (opcional, padrão: módulo random global)
         
         Returns:
             Tempo de volta ajustado pelo clima (em segundos)
         """
+        if rng is None:
+            rng = random
+        
         if condition == WeatherCondition.DRY:
             # Condições secas: sem alteração
             return lap_time
@@ -39,7 +90,7 @@ class WeatherEngine:
         elif condition == WeatherCondition.WET:
             # Condições molhadas: aumenta tempo em 15% a 20% (randomizado)
             # Aumenta a variabilidade (simulado com multiplicador maior)
-            rain_multiplier = random.uniform(1.15, 1.20)
+            rain_multiplier = rng.uniform(*WeatherEngine.IMPACT_RANGES[WeatherCondition.WET])
             # Pilotos com mais habilidade na chuva sofrem menos penalidade
             adjusted_multiplier = 1.0 + (rain_multiplier - 1.0) / driver_skill
             return lap_time * adjusted_multiplier
@@ -47,7 +98,7 @@ class WeatherEngine:
         elif condition == WeatherCondition.MIXED:
             # Condições mistas: aumenta tempo em 5% a 10%
             # Alta variabilidade (simula Safety Car e condições variáveis)
-            mixed_multiplier = random.uniform(1.05, 1.10)
+            mixed_multiplier = rng.uniform(*WeatherEngine.IMPACT_RANGES[WeatherCondition.MIXED])
             adjusted_multiplier = 1.0 + (mixed_multiplier - 1.0) / driver_skill
             return lap_time * adjusted_multiplier
         
@@ -55,16 +106,26 @@ class WeatherEngine:
         return lap_time
     
     @staticmethod
-    def determine_weather(rain_probability: float) -> WeatherCondition:
+    def determine_weather(
+        rain_probability: float,
+        seed: Optional[int] = None,
+        rng: Optional[random.Random] = None
+    ) -> WeatherCondition:
         """
         Determina a condição climática baseado na probabilidade de chuva.
         
         Args:
             rain_probability: Probabilidade de chuva (0.0 a 1.0, onde 1.0 = chuva garantida)
+            seed: Semente opcional (sorteio reprodutível)
+            rng: Gerador a usar (opcional, tem prioridade sobre seed;
+                padrão: módulo random global)
         
         Returns:
             WeatherCondition determinada
         """
+        if rng is None:
+            rng = random if seed is None else random.Random(seed)
+        
         if rain_probability <= 0.0:
             return WeatherCondition.DRY
         
@@ -72,7 +133,7 @@ class WeatherEngine:
             return WeatherCondition.WET
         
         # Gera um número aleatório entre 0 e 1
-        random_value = random.random()
+        random_value = rng.random()
         
         if random_value <= rain_probability:
             # Chuva determinada
@@ -83,12 +144,241 @@ class WeatherEngine:
                 return WeatherCondition.WET
             elif rain_probability > 0.3:
                 # 60% WET, 40% MIXED
-                return WeatherCondition.WET if random.random() < 0.6 else WeatherCondition.MIXED
+                return WeatherCondition.WET if rng.random() < 0.6 else WeatherCondition.MIXED
             else:
                 # Mais provável MIXED para probabilidades baixas
-                return WeatherCondition.MIXED if random.random() < 0.7 else WeatherCondition.WET
+                return WeatherCondition.MIXED if rng.random() < 0.7 else WeatherCondition.WET
         
         # Sem chuva
         return WeatherCondition.DRY
-
-
+    
+    @staticmethod
+    def determine_weather_batch(
+        rain_probability: float,
+        size: int,
+        rng: Optional[np.random.Generator] = None,
+        stratified: bool = False
+    ) -> np.ndarray:
+        """
+        Versão vetorizada de determine_weather para várias corridas de uma vez.
+        
+        Segue exatamente as mesmas regras de determine_weather, mas sorteia a
+        condição de `size` corridas com um único gerador NumPy.
+        
+        Args:
+            rain_probability: Probabilidade de chuva (0.0 a 1.0)
+            size: Número de corridas (iterações)
+            rng: Gerador NumPy ou streams.BlockedGenerator (opcional, cria um novo
+                se não fornecido)
+            stratified: Usa uniformes estratificados (por bloco de sementes, com
+                BlockedGenerator): a fração de corridas com chuva fica a menos de
+                1/n da probabilidade pedida, em vez de variar binomialmente
+        
+        Returns:
+            Array (size,) com os códigos de WEATHER_CODES de cada corrida
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        
+        # Probabilidades 0 e 1 não consomem sorteios
+        if rain_probability <= 0.0 or rain_probability >= 1.0:
+            empty = np.zeros(size)
+            return WeatherEngine.weather_from_uniforms(rain_probability, empty, empty)
+        
+        if stratified:
+            draw = rng.stratified if hasattr(rng, "stratified") else lambda n: stratified_uniforms(rng, n)
+        else:
+            draw = rng.random
+        rain_draws = draw(size)
+        split_draws = draw(size)
+        return WeatherEngine.weather_from_uniforms(rain_probability, rain_draws, split_draws)
+    
+    @staticmethod
+    def weather_from_uniforms(
+        rain_probability: float,
+        rain_draws: np.ndarray,
+        split_draws: np.ndarray
+    ) -> np.ndarray:
+        """
+        Converte sorteios uniformes já feitos em condições climáticas.
+        
+        Mesmas regras de determine_weather_batch; permite aplicar os mesmos
+        sorteios a várias probabilidades de chuva (números aleatórios comuns).
+        
+        Args:
+            rain_probability: Probabilidade de chuva (0.0 a 1.0)
+            rain_draws: Uniformes em [0, 1) que decidem se chove (um por corrida)
+            split_draws: Uniformes em [0, 1) que decidem entre MIXED e WET
+        
+        Returns:
+            Array com os códigos de WEATHER_CODES de cada corrida
+        """
+        dry = WEATHER_CODES[WeatherCondition.DRY]
+        mixed = WEATHER_CODES[WeatherCondition.MIXED]
+        wet = WEATHER_CODES[WeatherCondition.WET]
+        size = len(rain_draws)
+        
+        if rain_probability <= 0.0:
+            return np.full(size, dry, dtype=np.int8)
+        
+        if rain_probability >= 1.0:
+            return np.full(size, wet, dtype=np.int8)
+        
+        is_rain = rain_draws <= rain_probability
+        
+        if rain_probability > 0.7:
+            rain_codes = np.full(size, wet, dtype=np.int8)
+        elif rain_probability > 0.3:
+            # 60% WET, 40% MIXED
+            rain_codes = np.where(split_draws < 0.6, wet, mixed).astype(np.int8)
+        else:
+            # Mais provável MIXED para probabilidades baixas
+            rain_codes = np.where(split_draws < 0.7, mixed, wet).astype(np.int8)
+        
+        return np.where(is_rain, rain_codes, dry).astype(np.int8)
+    
+    @staticmethod
+    def transition_matrix(rain_probability: float, change_rate: Optional[float] = None) -> np.ndarray:
+        """
+        Matriz de transição por volta do modelo "markov".
+        
+        O clima só muda para estados vizinhos (DRY ↔ MIXED ↔ WET): piora com
+        probabilidade change_rate × p e melhora com change_rate × (1 - p),
+        então p = 0 nunca chove e p = 1 nunca seca.
+        
+        Args:
+            rain_probability: Probabilidade de chuva (0.0 a 1.0)
+            change_rate: Escala das mudanças por volta (padrão: CHANGE_RATE)
+        
+        Returns:
+            Array (3, 3) em que [i, j] é a probabilidade de ir de WEATHER_ORDER[i]
+            para WEATHER_ORDER[j] na volta seguinte
+        """
+        if change_rate is None:
+            change_rate = WeatherEngine.CHANGE_RATE
+        p = min(max(rain_probability, 0.0), 1.0)
+        worsen = change_rate * p
+        improve = change_rate * (1.0 - p)
+        return np.array([
+            [1.0 - worsen, worsen, 0.0],
+            [improve, 1.0 - worsen - improve, worsen],
+            [0.0, improve, 1.0 - improve]
+        ])
+    
+    @staticmethod
+    def weather_timeline(
+        rain_probability: float,
+        total_laps: int,
+        rng: Optional[random.Random] = None
+    ) -> List[WeatherCondition]:
+        """
+        Sorteia a condição de cada volta de uma corrida (modelo "markov").
+        
+        A primeira volta segue as regras de determine_weather; as seguintes,
+        a matriz de transition_matrix.
+        
+        Args:
+            rain_probability: Probabilidade de chuva (0.0 a 1.0)
+            total_laps: Número de voltas
+            rng: Gerador a usar (opcional, padrão: módulo random global)
+        
+        Returns:
+            Lista com a condição de cada volta
+        """
+        if rng is None:
+            rng = random
+        
+        condition = WeatherEngine.determine_weather(rain_probability, rng=rng)
+        timeline = [condition]
+        if rain_probability <= 0.0 or rain_probability >= 1.0:
+            return timeline * total_laps
+        
+        cumulative = np.cumsum(WeatherEngine.transition_matrix(rain_probability), axis=1).tolist()
+        code = WEATHER_CODES[condition]
+        for _ in range(total_laps - 1):
+            draw = rng.random()
+            code = next((j for j, bound in enumerate(cumulative[code]) if draw < bound), code)
+            timeline.append(WEATHER_ORDER[code])
+        return timeline
+    
+    @staticmethod
+    def weather_timeline_batch(
+        rain_probability: float,
+        size: int,
+        total_laps: int,
+        rng: Optional[np.random.Generator] = None,
+        stratified: bool = False
+    ) -> np.ndarray:
+        """
+        Versão vetorizada de weather_timeline.
+        
+        Args:
+            rain_probability: Probabilidade de chuva (0.0 a 1.0)
+            size: Número de corridas (iterações)
+            total_laps: Número de voltas
+            rng: Gerador NumPy ou streams.BlockedGenerator (opcional)
+            stratified: Estratifica o sorteio da condição inicial (ver determine_weather_batch)
+        
+        Returns:
+            Array (size, total_laps) com os códigos de WEATHER_CODES de cada volta
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        
+        timeline = np.empty((size, total_laps), dtype=np.int8)
+        timeline[:, 0] = WeatherEngine.determine_weather_batch(rain_probability, size, rng, stratified)
+        if rain_probability <= 0.0 or rain_probability >= 1.0:
+            timeline[:, 1:] = timeline[:, :1]
+            return timeline
+        
+        cumulative = np.cumsum(WeatherEngine.transition_matrix(rain_probability), axis=1)
+        draws = rng.random((size, max(total_laps - 1, 0)))
+        for lap in range(1, total_laps):
+            bounds = cumulative[timeline[:, lap - 1]]
+            timeline[:, lap] = (draws[:, lap - 1, None] >= bounds[:, :-1]).sum(axis=1)
+        return timeline
+    
+    @staticmethod
+    def mismatch_penalty_table() -> np.ndarray:
+        """
+        TYRE_MISMATCH_PENALTY em forma de array.
+        
+        Returns:
+            Array (climas × compostos), na ordem de WEATHER_ORDER e COMPOUND_ORDER
+        """
+        return np.array([
+            [TYRE_MISMATCH_PENALTY[condition].get(compound, 0.0) for compound in COMPOUND_ORDER]
+            for condition in WEATHER_ORDER
+        ])
+    
+    @staticmethod
+    def predominant_weather(timeline: np.ndarray) -> np.ndarray:
+        """
+        Condição com mais voltas em cada corrida (empate: a mais úmida).
+        
+        Args:
+            timeline: Array (corridas × voltas) de códigos de WEATHER_CODES
+        
+        Returns:
+            Array (corridas,) de códigos
+        """
+        counts = np.stack([(timeline == code).sum(axis=1) for code in range(len(WEATHER_ORDER))], axis=1)
+        return (len(WEATHER_ORDER) - 1 - np.argmax(counts[:, ::-1], axis=1)).astype(np.int8)
+    
+    @staticmethod
+    def impact_from_uniforms(weather_codes: np.ndarray, draws: np.ndarray) -> np.ndarray:
+        """
+        Converte uniformes já sorteados em multiplicadores de tempo de volta.
+        
+        Args:
+            weather_codes: Códigos de WEATHER_CODES (compatível com `draws` via broadcast)
+            draws: Uniformes em [0, 1)
+        
+        Returns:
+            Array de multiplicadores no formato de `draws`
+        """
+        lows = np.array([WeatherEngine.IMPACT_RANGES[c][0] for c in WEATHER_ORDER])
+        highs = np.array([WeatherEngine.IMPACT_RANGES[c][1] for c in WEATHER_ORDER])
+        
+        low = lows[weather_codes]
+        return low + (highs[weather_codes] - low) * draws
@@ -0,0 +1,260 @@
+"""
+Benchmark do caminho crítico da simulação (engine, pneus e clima).
+
+Executa cenários canônicos com grids sintéticos de DriverSim (sem FastF1 nem
+rede), mede o tempo, a vazão (voltas de piloto por segundo) e o pico de
+memória, e compara com um baseline em JSON. Uma vazão abaixo de
+(1 - threshold) × baseline, ou um pico de memória acima de
+(1 + threshold) × baseline (e da folga MEMORY_SLACK_MB), é uma regressão e o
+script termina com código 1.
+
+Uso (a partir de backend/):
+    python benchmarks/simulation_benchmark.py
+    python benchmarks/simulation_benchmark.py --scenarios 2x50 mc_10k --repeat 5
+    python benchmarks/simulation_benchmark.py --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Adiciona o diretório backend ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.simulation.engine import simulate_race
+from app.simulation.models import DriverSim
+from app.simulation.precision import measure_precision
+from app.simulation.runner import run_monte_carlo
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 3
+# Folga absoluta do pico de memória (picos pequenos variam mais que o threshold)
+MEMORY_SLACK_MB = 0.5
+BENCHMARK_SEED = 2024
+
+
+@dataclass(frozen=True)
+class BenchmarkScenario:
+    """
+    Cenário de benchmark.
+
+    Attributes:
+        name: Identificador do cenário (chave no baseline)
+        num_drivers: Pilotos do grid sintético
+        total_laps: Voltas da corrida
+        weather_prob: Probabilidade de chuva (0.0 a 1.0)
+        races: Corridas simuladas por medição
+        monte_carlo: True = run_monte_carlo (motor vetorizado) + agregação da
+            API (measure_precision); False = engine.simulate_race corrida a corrida
+    """
+    name: str
+    num_drivers: int
+    total_laps: int
+    weather_prob: float
+    races: int
+    monte_carlo: bool = False
+
+    @property
+    def driver_laps(self) -> int:
+        """Voltas de piloto simuladas por medição."""
+        return self.races * self.num_drivers * self.total_laps
+
+
+SCENARIOS = (
+    BenchmarkScenario("2x50", 2, 50, 0.0, races=2000),
+    BenchmarkScenario("20x58", 20, 58, 0.0, races=200),
+    BenchmarkScenario("20x78_wet", 20, 78, 1.0, races=100),
+    BenchmarkScenario("mc_10k", 20, 58, 0.3, races=10000, monte_carlo=True),
+)
+
+
+def synthetic_grid(num_drivers: int) -> List[DriverSim]:
+    """Grid sintético: ritmo e consistência piorando do primeiro ao último, duas vagas por equipe."""
+    return [
+        DriverSim(
+            name=f"D{i + 1:02d}",
+            base_lap_time=80.0 + 0.15 * i,
+            consistency=0.3 + 0.03 * i,
+            tire_degradation=0.1,
+            pit_stop_loss=22.0,
+            team=f"Team {i // 2 + 1}"
+        )
+        for i in range(num_drivers)
+    ]
+
+
+def _workload(scenario: BenchmarkScenario) -> Callable[[], None]:
+    """Função que executa uma medição do cenário."""
+    drivers = synthetic_grid(scenario.num_drivers)
+
+    if scenario.monte_carlo:
+        def run() -> None:
+            # Um shard no próprio processo: mede o motor, não o pool de processos
+            stats = run_monte_carlo(
+                drivers, scenario.total_laps, scenario.races, scenario.weather_prob,
+                seed=BENCHMARK_SEED, workers=1
+            )
+            measure_precision(stats).to_dict()
+        return run
+
+    def run() -> None:
+        rng = random.Random(BENCHMARK_SEED)
+        for _ in range(scenario.races):
+            simulate_race(
+                drivers, scenario.total_laps, scenario.weather_prob,
+                seed=rng.getrandbits(64), record_history=False
+            )
+    return run
+
+
+def measure(scenario: BenchmarkScenario, repeat: int = DEFAULT_REPEAT) -> Dict[str, float]:
+    """
+    Mede um cenário.
+
+    O tempo é o melhor de `repeat` execuções (menos sensível a ruído do
+    sistema); o pico de memória vem de uma execução extra com tracemalloc,
+    que não entra na medição de tempo.
+
+    Returns:
+        {"seconds", "driver_laps_per_second", "peak_memory_mb"}
+    """
+    run = _workload(scenario)
+    run()  # Aquecimento (imports, tabelas de pneus, caches)
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": round(best, 4),
+        "driver_laps_per_second": round(scenario.driver_laps / best, 1),
+        "peak_memory_mb": round(peak / 2 ** 20, 3)
+    }
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """
+    Compara as medições com o baseline.
+
+    Args:
+        results: Medições por cenário (ver measure)
+        baseline: Medições de referência por cenário
+        threshold: Variação relativa tolerada (ex: 0.25 = 25%); o pico de
+            memória tem ainda a folga absoluta MEMORY_SLACK_MB
+
+    Returns:
+        Lista de regressões encontradas (vazia se nenhuma); cenários ausentes
+        do baseline são ignorados
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        min_throughput = reference["driver_laps_per_second"] * (1.0 - threshold)
+        if current["driver_laps_per_second"] < min_throughput:
+            regressions.append(
+                f"{name}: vazão {current['driver_laps_per_second']:.0f} voltas/s "
+                f"< {min_throughput:.0f} (baseline {reference['driver_laps_per_second']:.0f})"
+            )
+        max_memory = max(reference["peak_memory_mb"] * (1.0 + threshold), reference["peak_memory_mb"] + MEMORY_SLACK_MB)
+        if current["peak_memory_mb"] > max_memory:
+            regressions.append(
+                f"{name}: pico de memória {current['peak_memory_mb']:.2f} MB "
+                f"> {max_memory:.2f} MB (baseline {reference['peak_memory_mb']:.2f})"
+            )
+    return regressions
+
+
+def _environment() -> Dict[str, str]:
+    """Ambiente da medição (gravado junto do baseline)."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine()
+    }
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    """Carrega o baseline (None se o arquivo não existir)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do caminho crítico da simulação")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Arquivo JSON do baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Variação tolerada (0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Execuções medidas por cenário")
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=[s.name for s in SCENARIOS], help="Cenários a executar (padrão: todos)"
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Grava as medições como novo baseline")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in SCENARIOS if args.scenarios is None or s.name in args.scenarios]
+
+    print("=" * 60)
+    print("BENCHMARK DA SIMULAÇÃO")
+    print("=" * 60)
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = measure(scenario, args.repeat)
+        r = results[scenario.name]
+        print(
+            f"{scenario.name:<10} {r['seconds']:>8.3f} s  {r['driver_laps_per_second']:>12,.0f} voltas/s  "
+            f"{r['peak_memory_mb']:>8.2f} MB"
+        )
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        scenarios_data = dict(baseline["scenarios"]) if baseline else {}
+        scenarios_data.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": _environment(), "scenarios": scenarios_data}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n✓ Baseline gravado em {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nSem baseline em {args.baseline} (use --update-baseline para criar)")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline["scenarios"], args.threshold)
+    print("=" * 60)
+    if regressions:
+        print("✗ Regressões em relação ao baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"✓ Sem regressões (tolerância de {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import unittest
+import itertools
+import random
+import sys
+import os
+import time
+from unittest import mock
+
+import pandas as pd
+
+# Adiciona o diretório backend ao path para importação correta
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import fantasy_optimizer, optimizer
+
+
+def make_market(seed, num_drivers=12, num_constructors=6, integer_points=False):
+    """Mercado sintético; pontos inteiros geram muitos empates."""
+    rng = random.Random(seed)
+    constructors = [
+        {"id": f"C{i}", "price": round(rng.uniform(5, 30), 1), "expected_points": round(rng.uniform(0, 30), 1)}
+        for i in range(num_constructors)
+    ]
+    drivers = [
+        {
+            "id": f"D{i}",
+            "price": round(rng.uniform(4, 30), 1),
+            "team": f"C{rng.randrange(num_constructors // 2)}",
+            "expected_points": float(rng.randint(0, 10)) if integer_points else round(rng.uniform(-2, 26), 1)
+        }
+        for i in range(num_drivers)
+    ]
+    return drivers, constructors
+
+
+def brute_force(drivers, constructors, budget):
+    """Enumeração completa (referência): times válidos do melhor ao pior, empates na ordem da enumeração."""
+    ranked = []
+    for pair in itertools.combinations(constructors, 2):
+        for combo in itertools.combinations(drivers, 5):
+            teams = [d["team"] for d in combo]
+            if max(teams.count(t) for t in teams) > 3:
+                continue
+            cost = sum(c["price"] for c in pair) + sum(d["price"] for d in combo)
+            if cost > budget:
+                continue
+            points = sum(d["expected_points"] for d in combo) + sum(c["expected_points"] for c in pair)
+            ranked.append(([d["id"] for d in combo], [c["id"] for c in pair], points, cost))
+    # sort é estável: empates mantêm a ordem da enumeração
+    return sorted(ranked, key=lambda team: -team[2])
+
+
+class TestOtimizadorExato(unittest.TestCase):
+
+    def test_matches_exhaustive_search(self):
+        for seed in range(12):
+            drivers, constructors = make_market(seed, integer_points=seed % 2 == 1)
+            budget = [100.0, 75.5, 60.0][seed % 3]
+            ranked = brute_force(drivers, constructors, budget)
+            team = fantasy_optimizer.solve_best_team(drivers, constructors, budget)
+            if not ranked:
+                self.assertIsNone(team)
+                continue
+            self.assertEqual(
+                (team["drivers"], team["constructors"], team["total_points"], team["total_cost"]), ranked[0]
+            )
+
+    def test_top_k_matches_exhaustive_ranking(self):
+        for seed in range(4):
+            drivers, constructors = make_market(seed, integer_points=seed % 2 == 1)
+            ranked = brute_force(drivers, constructors, 100.0)[:15]
+            teams = fantasy_optimizer.solve_top_teams(drivers, constructors, 100.0, top_k=15)
+            self.assertEqual([(t["drivers"], t["constructors"], t["total_points"]) for t in teams],
+                             [team[:3] for team in ranked])
+            self.assertEqual([t["gap_to_best"] for t in teams], [ranked[0][2] - team[2] for team in ranked])
+
+    def test_respects_team_limit_and_budget(self):
+        constructors = [{"id": "A", "price": 10.0, "expected_points": 5.0}, {"id": "B", "price": 10.0, "expected_points": 5.0}]
+        drivers = [{"id": f"A{i}", "price": 5.0, "team": "A", "expected_points": 20.0} for i in range(5)]
+        drivers += [{"id": f"B{i}", "price": 5.0, "team": "B", "expected_points": float(i)} for i in range(3)]
+
+        team = fantasy_optimizer.solve_best_team(drivers, constructors, 45.0)
+        self.assertEqual(team["drivers"], ["A0", "A1", "A2", "B1", "B2"])
+        self.assertEqual(team["budget_remaining"], 0.0)
+        self.assertIsNone(fantasy_optimizer.solve_best_team(drivers, constructors, 44.9))
+
+
+class TestTabelaDeEscalacoes(unittest.TestCase):
+
+    def test_matches_exhaustive_search_for_every_budget(self):
+        budgets = [40.0, 55.5, 60.0, 75.3, 90.0, 100.0, 120.0, 250.0]
+        for seed in range(6):
+            drivers, constructors = make_market(seed, integer_points=seed % 2 == 1)
+            with mock.patch.object(fantasy_optimizer, "LINEUP_CHUNK", 100):
+                table = fantasy_optimizer.LineupTable(drivers)
+            teams = table.best_teams(constructors, budgets)
+            for budget, team in zip(budgets, teams):
+                ranked = brute_force(drivers, constructors, budget)
+                if not ranked:
+                    self.assertIsNone(team)
+                    continue
+                self.assertEqual(
+                    (team["drivers"], team["constructors"], team["total_points"], team["total_cost"]), ranked[0]
+                )
+
+    def test_best_lineup_respects_team_limit(self):
+        drivers = [{"id": f"A{i}", "price": 5.0, "team": "A", "expected_points": 20.0} for i in range(5)]
+        drivers += [{"id": f"B{i}", "price": 5.0, "team": "B", "expected_points": float(i)} for i in range(3)]
+        table = fantasy_optimizer.LineupTable(drivers)
+
+        self.assertEqual(table.best_lineup(25.0), [0, 1, 2, 6, 7])
+        self.assertEqual(table.best_lineup(1000.0), [0, 1, 2, 6, 7])
+        self.assertIsNone(table.best_lineup(24.9))
+        self.assertIsNone(table.best_lineup(-1.0))
+
+    def test_prices_are_compared_in_tenths(self):
+        # 0.1 * 3 = 0.30000000000000004: o orçamento de 0.3 deve caber
+        drivers = [{"id": f"D{i}", "price": 0.1, "team": f"T{i}", "expected_points": 1.0} for i in range(5)]
+        constructors = [{"id": f"C{i}", "price": 0.1, "expected_points": 1.0} for i in range(2)]
+        table = fantasy_optimizer.LineupTable(drivers)
+        self.assertIsNotNone(table.best_teams(constructors, [0.7])[0])
+        self.assertIsNotNone(fantasy_optimizer.solve_best_team(drivers, constructors, 0.7))
+        self.assertIsNone(table.best_teams(constructors, [0.69])[0])
+
+    def test_large_pool_skips_table(self):
+        # C(80, 5) ~ 24 milhões de escalações: montar a tabela levaria minutos
+        drivers, constructors = make_market(7, num_drivers=80, num_constructors=10)
+        prices = (
+            [dict(d, name=d["id"], type="DRIVER") for d in drivers]
+            + [dict(c, name=c["id"], type="CONSTRUCTOR") for c in constructors]
+        )
+        budgets = [60.0, 80.0, 100.0]
+        with mock.patch.object(fantasy_optimizer, "load_prices_data", side_effect=lambda: [dict(p) for p in prices]), \
+                mock.patch.object(fantasy_optimizer, "LineupTable", side_effect=AssertionError("tabela montada")):
+            start = time.perf_counter()
+            team = fantasy_optimizer.find_best_team(100.0)
+            teams = fantasy_optimizer.find_best_teams_for_budgets(budgets)
+            self.assertLess(time.perf_counter() - start, 2.0)
+
+        self.assertEqual(teams[2], team)
+        self.assertEqual(teams, [fantasy_optimizer.solve_best_team(drivers, constructors, b) for b in budgets])
+
+    def test_table_is_cached_per_market_version(self):
+        drivers, _ = make_market(3)
+        table = fantasy_optimizer.get_lineup_table(drivers)
+        self.assertIs(fantasy_optimizer.get_lineup_table([dict(d) for d in drivers]), table)
+
+        drivers[0] = dict(drivers[0], expected_points=drivers[0]["expected_points"] + 1)
+        self.assertIsNot(fantasy_optimizer.get_lineup_table(drivers), table)
+
+
+class TestOtimizacaoEmLote(unittest.TestCase):
+
+    def make_prices(self, seed):
+        drivers, constructors = make_market(seed)
+        return (
+            [dict(d, name=f"Piloto {d['id']}", type="DRIVER") for d in drivers]
+            + [dict(c, name=f"Equipe {c['id']}", type="CONSTRUCTOR") for c in constructors]
+        )
+
+    def test_results_match_single_requests_in_order(self):
+        prices = self.make_prices(2)
+        queries = [
+            {"budget": 100.0},
+            {"budget": 75.5, "custom_points_projections": {"D0": 40.0, "Piloto D3": -5.0}},
+            {"budget": 0.0},
+            {"budget": 100.0, "top_k": 4},
+            {"budget": 20.0},
+            {"budget": 60.0, "custom_points_projections": {"D0": 40.0, "Piloto D3": -5.0}},
+            {"budget": 60.0, "custom_points_projections": None},
+        ]
+        with mock.patch.object(fantasy_optimizer, "load_prices_data", side_effect=lambda: [dict(p) for p in prices]) as load:
+            results = fantasy_optimizer.find_best_teams_batch(queries)
+            self.assertEqual(load.call_count, 1)
+
+            for query, result in zip(queries, results):
+                if query["budget"] <= 0:
+                    self.assertIn("error", result)
+                    continue
+                try:
+                    expected = fantasy_optimizer.find_best_team(
+                        query["budget"], query.get("custom_points_projections"), query.get("top_k", 1)
+                    )
+                except ValueError as e:
+                    expected = {"error": str(e)}
+                self.assertEqual(result, expected)
+
+    def test_team_optimizer_reuses_candidate_index(self):
+        team_optimizer = TestTeamOptimizerVetorizado.make_optimizer(1)
+        for budget in (90.0, 140.0, 120.5):
+            for strategy in optimizer.STRATEGIES:
+                fresh = TestTeamOptimizerVetorizado.make_optimizer(1)
+                self.assertEqual(team_optimizer.find_best_team(budget, strategy, top_k=3),
+                                 fresh.find_best_team(budget, strategy, top_k=3))
+        self.assertEqual(len(team_optimizer._candidates), 1)
+        self.assertEqual(len(team_optimizer._scores), len(optimizer.STRATEGIES))
+
+
+class TestTeamOptimizerVetorizado(unittest.TestCase):
+
+    @staticmethod
+    def make_optimizer(seed):
+        rng = random.Random(seed)
+        drivers = pd.DataFrame([
+            {"id": f"D{i}", "team_id": f"T{rng.randrange(3)}", "price": round(rng.uniform(4, 30), 1),
+             "sentiment": rng.randint(40, 95), "predicted_points": float(rng.randint(0, 12))}
+            for i in range(9)
+        ])
+        constructors = pd.DataFrame([
+            {"id": f"T{i}", "team_id": f"T{i}", "price": round(rng.uniform(5, 30), 1),
+             "sentiment": rng.randint(40, 95), "predicted_points": float(rng.randint(0, 12))}
+            for i in range(4)
+        ])
+        with mock.patch.object(optimizer, "load_assets", return_value=(drivers, constructors)):
+            return optimizer.TeamOptimizer()
+
+    def test_matches_per_team_evaluation(self):
+        for seed in range(4):
+            team_optimizer = self.make_optimizer(seed)
+            for strategy in optimizer.STRATEGIES:
+                # Referência: laço time a time com os métodos escalares
+                best, best_score = None, float("-inf")
+                for drivers in itertools.combinations(team_optimizer.driver_ids, 5):
+                    for constructors in itertools.combinations(team_optimizer.constructor_ids, 2):
+                        if not team_optimizer._validate_team(list(drivers), list(constructors), 140.0):
+                            continue
+                        score = team_optimizer._calculate_score(list(drivers), list(constructors), strategy)
+                        if score > best_score:
+                            best, best_score = (list(drivers), list(constructors)), score
+
+                with mock.patch.object(optimizer, "COMBINATION_CHUNK", 7):
+                    team = team_optimizer.find_best_team(140.0, strategy)
+                self.assertEqual((team["drivers"], team["constructors"]), best)
+                self.assertEqual(team["total_score"], best_score)
+                self.assertEqual(team["total_cost"], team_optimizer._calculate_cost(*best))
+
+    def test_top_k_ranking(self):
+        team_optimizer = self.make_optimizer(1)
+        ranked = []
+        for drivers in itertools.combinations(team_optimizer.driver_ids, 5):
+            for constructors in itertools.combinations(team_optimizer.constructor_ids, 2):
+                if team_optimizer._validate_team(list(drivers), list(constructors), 140.0):
+                    score = team_optimizer._calculate_score(list(drivers), list(constructors), "points")
+                    ranked.append((list(drivers), list(constructors), score))
+        ranked.sort(key=lambda team: -team[2])
+
+        with mock.patch.object(optimizer, "COMBINATION_CHUNK", 5):
+            result = team_optimizer.find_best_team(140.0, "points", top_k=12)
+        self.assertEqual(result["drivers"], ranked[0][0])
+        self.assertEqual([(t["drivers"], t["constructors"], t["total_score"]) for t in result["top_teams"]], ranked[:12])
+        self.assertEqual(result["top_teams"][-1]["gap_to_best"], ranked[0][2] - ranked[11][2])
+        self.assertNotIn("top_teams", team_optimizer.find_best_team(140.0, "points"))
+
+    def test_invalid_strategy_and_budget(self):
+        team_optimizer = self.make_optimizer(0)
+        with self.assertRaises(ValueError):
+            team_optimizer.find_best_team(100.0, "random")
+        with self.assertRaises(ValueError):
+            team_optimizer.find_best_team(1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
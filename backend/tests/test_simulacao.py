@@ -0,0 +1,949 @@
+import unittest
+import asyncio
+import importlib
+import importlib.util
+import json
+import random
+import sys
+import os
+import tempfile
+import threading
+import time
+import types
+from unittest import mock
+
+import numpy as np
+
+# Adiciona o diretório backend ao path para importação correta
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.simulation.models import DriverSim, RaceState, SweepScenario
+from app.simulation.engine import simulate_race, _choose_next_tyre
+from app.simulation.tyres import TyreModel, TyreCompound, COMPOUND_CODES
+from app.simulation.weather import WeatherEngine, WeatherCondition, WEATHER_ORDER
+from app.simulation import vectorized, runner, streams, strategy, precision, cache, jobs, scoring, timing, trace, run_store, head_to_head
+from app.services.fantasy_service import calculate_driver_weekend_score
+from benchmarks import simulation_benchmark
+
+
+def import_without_fastf1(module_name):
+    """
+    Importa um módulo que depende de app.services.fastf1_adapter mesmo sem o
+    FastF1 instalado (o adapter vira um módulo vazio; os testes trocam as
+    funções que o usam por mocks).
+    """
+    adapter = "app.services.fastf1_adapter"
+    if adapter not in sys.modules and importlib.util.find_spec("fastf1") is None:
+        stub = types.ModuleType(adapter)
+        stub.get_session_data = None
+        sys.modules[adapter] = stub
+    return importlib.import_module(module_name)
+
+
+def make_grid(num_drivers=2, gap=0.2):
+    """Grid sintético: cada piloto `gap` segundos por volta mais lento que o anterior."""
+    return [
+        DriverSim(
+            name=f"P{i + 1}",
+            base_lap_time=80.0 + gap * i,
+            consistency=0.5,
+            tire_degradation=0.1,
+            pit_stop_loss=22.0
+        )
+        for i in range(num_drivers)
+    ]
+
+
+class TestSimulacaoVetorizada(unittest.TestCase):
+
+    def test_batch_aggregates_are_consistent(self):
+        drivers = make_grid(num_drivers=5)
+        stats = vectorized.simulate_races_batch(
+            drivers, 30, 500, weather_prob=0.5, seed=7, batch_size=256
+        )
+        self.assertEqual(stats.iterations, 500)
+        self.assertEqual(int(stats.wins.sum()), 500)
+        self.assertEqual(int(stats.podiums.sum()), 3 * 500)
+        # Cada corrida distribui as posições 1..5
+        self.assertEqual(int(stats.positions_sum.sum()), 500 * 15)
+        self.assertEqual(sum(stats.weather_counts.values()), 500)
+
+    def test_batch_matches_reference_engine(self):
+        # Referência: motor volta a volta (random); vetorizado: NumPy
+        drivers = make_grid(num_drivers=2, gap=0.02)
+        total_laps = 50
+        reference_runs = 300
+
+        random.seed(11)
+        reference_wins = 0
+        for _ in range(reference_runs):
+            results, _ = simulate_race(drivers, total_laps)
+            reference_wins += results[0].driver_name == "P1"
+
+        stats = vectorized.simulate_races_batch(drivers, total_laps, 4000, seed=11)
+        batch_win_rate = stats.wins[0] / stats.iterations
+
+        self.assertAlmostEqual(batch_win_rate, reference_wins / reference_runs, delta=0.1)
+
+    def test_weather_batch_follows_reference_rules(self):
+        rng = np.random.default_rng(3)
+        codes = WeatherEngine.determine_weather_batch(0.5, 20000, rng)
+        dry_share = np.mean(codes == WEATHER_ORDER.index(WeatherCondition.DRY))
+        self.assertAlmostEqual(dry_share, 0.5, delta=0.02)
+
+        self.assertTrue(np.all(WeatherEngine.determine_weather_batch(0.0, 10, rng) == 0))
+        wet = WEATHER_ORDER.index(WeatherCondition.WET)
+        self.assertTrue(np.all(WeatherEngine.determine_weather_batch(1.0, 10, rng) == wet))
+
+    def test_next_tyre_table_matches_reference(self):
+        driver = make_grid(num_drivers=1)[0]
+        for laps_remaining in (5, 16, 26, 40):
+            table = vectorized._next_tyre_table(laps_remaining).reshape(len(WEATHER_ORDER), -1)
+            for weather_code, weather in enumerate(WEATHER_ORDER):
+                for mask in range(1, table.shape[1]):
+                    driver.compounds_used = {
+                        c for code, c in enumerate(vectorized.COMPOUND_ORDER) if mask & (1 << code)
+                    }
+                    expected = _choose_next_tyre(driver, weather, laps_remaining, driver.pit_stop_loss)
+                    self.assertEqual(vectorized.COMPOUND_ORDER[table[weather_code, mask]], expected)
+
+
+class TestExecucaoEmShards(unittest.TestCase):
+
+    def tearDown(self):
+        runner.shutdown_executor()
+
+    def test_split_iterations_aligned_to_seed_blocks(self):
+        block = streams.SEED_BLOCK_SIZE
+        self.assertEqual(runner.split_iterations(10, 3), [(0, 10)])
+        shards = runner.split_iterations(10000, 16)
+        self.assertEqual(sum(size for _, size in shards), 10000)
+        self.assertTrue(all(start % block == 0 for start, _ in shards))
+
+    @mock.patch.object(settings, "SIMULATION_MIN_SHARD_SIZE", 100)
+    def test_sharded_run_merges_partial_counters(self):
+        drivers = make_grid(num_drivers=4)
+        stats = runner.run_monte_carlo(drivers, 20, 900, weather_prob=0.4, seed=5, workers=3)
+        self.assertEqual(stats.iterations, 900)
+        self.assertEqual(int(stats.wins.sum()), 900)
+        self.assertEqual(int(stats.positions_sum.sum()), 900 * 10)
+        self.assertEqual(sum(stats.weather_counts.values()), 900)
+
+    @mock.patch.object(settings, "SIMULATION_MIN_SHARD_SIZE", 100)
+    def test_sharded_run_is_bit_identical_to_serial_run(self):
+        drivers = make_grid(num_drivers=4)
+        serial = runner.run_monte_carlo(drivers, 20, 1500, weather_prob=0.6, seed=42, workers=1)
+        sharded = runner.run_monte_carlo(drivers, 20, 1500, weather_prob=0.6, seed=42, workers=4)
+        batched = vectorized.simulate_races_batch(drivers, 20, 1500, weather_prob=0.6, seed=42, batch_size=512)
+
+        for other in (sharded, batched):
+            self.assertEqual(serial.wins.tolist(), other.wins.tolist())
+            self.assertEqual(serial.positions_sum.tolist(), other.positions_sum.tolist())
+            self.assertEqual(serial.points_sum.tolist(), other.points_sum.tolist())
+            self.assertEqual(serial.weather_counts, other.weather_counts)
+
+    def test_rounds_respect_iteration_and_time_limits(self):
+        drivers = make_grid(num_drivers=4)
+        stats, reason, rounds = runner.run_in_rounds(drivers, 20, 60.0, seed=8, max_iterations=1000)
+        self.assertEqual(reason, runner.STOP_MAX_ITERATIONS)
+        self.assertEqual(stats.iterations, 1000)
+        # Rodadas dobram a partir de um bloco: 256 + 256 + 488
+        self.assertEqual(rounds, 3)
+        fixed = runner.run_monte_carlo(drivers, 20, 1000, seed=8)
+        self.assertEqual(stats.wins.tolist(), fixed.wins.tolist())
+
+        stats, reason, rounds = runner.run_in_rounds(drivers, 20, 0.0, seed=8)
+        self.assertEqual(reason, runner.STOP_TIME_BUDGET)
+        self.assertEqual((stats.iterations, rounds), (streams.SEED_BLOCK_SIZE, 1))
+
+
+class TestSementes(unittest.TestCase):
+
+    def test_simulate_race_is_reproducible_with_seed(self):
+        drivers = make_grid(num_drivers=3)
+        first, weather_first = simulate_race(drivers, 30, 0.5, seed=streams.iteration_seed(9, 0))
+        second, weather_second = simulate_race(drivers, 30, 0.5, seed=streams.iteration_seed(9, 0))
+        self.assertEqual(weather_first, weather_second)
+        self.assertEqual([r.total_time for r in first], [r.total_time for r in second])
+
+    def test_summary_mode_matches_full_trace(self):
+        drivers = make_grid(num_drivers=4)
+        seed = streams.iteration_seed(3, 1)
+        full, _ = simulate_race(drivers, 40, 0.5, seed=seed)
+        summary, _ = simulate_race(drivers, 40, 0.5, seed=seed, record_history=False)
+
+        self.assertEqual(
+            [(r.driver_name, r.total_time, r.pit_stops, r.fastest_lap, r.position) for r in full],
+            [(r.driver_name, r.total_time, r.pit_stops, r.fastest_lap, r.position) for r in summary]
+        )
+        self.assertEqual(len(full[0].position_history), 40)
+        self.assertEqual(summary[0].lap_history, [])
+        self.assertEqual(summary[0].position_history, [])
+
+    def test_race_state_is_reset_between_races(self):
+        drivers = make_grid(num_drivers=4)
+        state = RaceState(drivers)
+        for race in range(3):
+            seed = streams.iteration_seed(8, race)
+            reused, _ = simulate_race(drivers, 30, 0.5, seed=seed, state=state)
+            fresh, _ = simulate_race(drivers, 30, 0.5, seed=seed)
+            self.assertEqual(
+                [(r.driver_name, r.total_time, r.pit_stops, r.fastest_lap) for r in reused],
+                [(r.driver_name, r.total_time, r.pit_stops, r.fastest_lap) for r in fresh]
+            )
+        # Os pilotos originais não são modificados
+        self.assertTrue(all(d.tyre_laps == 0 and not d.compounds_used for d in drivers))
+
+        with self.assertRaises(ValueError):
+            simulate_race(drivers[:2], 30, state=state)
+
+    def test_iteration_seeds_are_distinct(self):
+        seeds = {streams.iteration_seed(9, i) for i in range(1000)}
+        self.assertEqual(len(seeds), 1000)
+
+    def test_determine_weather_with_seed(self):
+        draws = [WeatherEngine.determine_weather(0.5, seed=s) for s in range(50)]
+        self.assertEqual(draws, [WeatherEngine.determine_weather(0.5, seed=s) for s in range(50)])
+
+
+class TestTabelasDePneus(unittest.TestCase):
+
+    def setUp(self):
+        self._original = TyreModel.properties_snapshot()
+
+    def tearDown(self):
+        TyreModel.TYRE_PROPERTIES = self._original
+
+    def test_table_matches_penalty_curve(self):
+        table = TyreModel.get_penalty_table(60)
+        for compound, code in COMPOUND_CODES.items():
+            for laps in (0, 5, 14, 15, 30, 59):
+                self.assertEqual(table[code, laps], TyreModel._compute_lap_penalty(compound, laps))
+                self.assertEqual(TyreModel.get_lap_penalty(compound, laps), table[code, laps])
+        # Idades além da tabela são calculadas na hora
+        self.assertEqual(
+            TyreModel.get_lap_penalty(TyreCompound.HARD, 10000),
+            TyreModel._compute_lap_penalty(TyreCompound.HARD, 10000)
+        )
+
+    def test_tables_rebuilt_when_properties_change(self):
+        soft = COMPOUND_CODES[TyreCompound.SOFT]
+        before = TyreModel.get_lap_penalty(TyreCompound.SOFT, 10)
+
+        TyreModel.TYRE_PROPERTIES[TyreCompound.SOFT]["degradation_rate"] = 0.30
+        self.assertAlmostEqual(TyreModel.get_lap_penalty(TyreCompound.SOFT, 10), 2 * before)
+
+        TyreModel.calibrate(TyreCompound.SOFT, speed_bonus=-2.0)
+        self.assertEqual(TyreModel.get_speed_bonus_vector()[soft], -2.0)
+
+        TyreModel.TYRE_PROPERTIES = self._original
+        self.assertEqual(TyreModel.get_lap_penalty(TyreCompound.SOFT, 10), before)
+        self.assertEqual(TyreModel.get_speed_bonus_vector()[soft], -1.0)
+
+
+class TestEstrategias(unittest.TestCase):
+
+    def test_dry_plans_respect_two_compound_rule(self):
+        plans = strategy.plan_strategies(WeatherCondition.DRY, 58, 22.0)
+        self.assertEqual(set(plans), {1, 2, 3})
+        max_laps = TyreModel.get_max_laps_vector()
+        for stops, plan in plans.items():
+            self.assertEqual(plan.stops, stops)
+            self.assertGreaterEqual(len(set(plan.compounds)), 2)
+            # Paradas dentro da corrida e stints dentro da vida do pneu
+            laps = (0,) + plan.pit_laps + (58,)
+            self.assertTrue(all(0 < lap < 58 for lap in plan.pit_laps))
+            for compound, start, end in zip(plan.compounds, laps, laps[1:]):
+                self.assertLessEqual(end - start, max_laps[COMPOUND_CODES[compound]])
+
+    def test_wet_plans_use_wet_tyres_only(self):
+        plan = strategy.best_plan(WeatherCondition.WET, 58, 22.0)
+        self.assertEqual(set(plan.compounds), {TyreCompound.WET})
+
+    def test_planned_race_follows_plan(self):
+        drivers = make_grid(num_drivers=3)
+        plan = strategy.best_plan(WeatherCondition.DRY, 40, drivers[0].pit_stop_loss)
+        results, weather = simulate_race(drivers, 40, 0.0, seed=1, pit_strategy="planned")
+        self.assertEqual(weather, WeatherCondition.DRY)
+        self.assertTrue(all(r.pit_stops == plan.stops for r in results))
+
+        with self.assertRaises(ValueError):
+            simulate_race(drivers, 40, pit_strategy="unknown")
+
+    def test_planned_batch_aggregates_are_consistent(self):
+        drivers = make_grid(num_drivers=4)
+        stats = vectorized.simulate_races_batch(
+            drivers, 40, 600, weather_prob=0.5, seed=3, pit_strategy="planned"
+        )
+        self.assertEqual(int(stats.wins.sum()), 600)
+        self.assertEqual(int(stats.positions_sum.sum()), 600 * 10)
+        # Mesmo plano para todos: o piloto mais rápido deve vencer mais
+        self.assertEqual(int(np.argmax(stats.wins)), 0)
+
+
+class TestPrecisao(unittest.TestCase):
+
+    def tearDown(self):
+        runner.shutdown_executor()
+
+    def test_wilson_interval(self):
+        low, high = precision.wilson_interval(np.array([0, 50, 100]), 100)
+        self.assertTrue(np.all(low <= np.array([0.0, 0.5, 1.0])))
+        self.assertTrue(np.all(high >= np.array([0.0, 0.5, 1.0])))
+        # Nenhum sucesso ainda deixa um intervalo de largura positiva
+        self.assertGreater(high[0], 0.0)
+        self.assertAlmostEqual(high[1] - 0.5, 0.5 - low[1])
+
+    def test_adaptive_run_stops_at_tolerance(self):
+        drivers = make_grid(num_drivers=6, gap=0.05)
+        stats, report = precision.run_until_precise(drivers, 20, 0.03, weather_prob=0.3, seed=4)
+        self.assertEqual(report.stop_reason, precision.STOP_TOLERANCE)
+        self.assertTrue(report.converged)
+        self.assertLessEqual(report.max_half_width, 0.03)
+        self.assertEqual(len(report.drivers), precision.DEFAULT_TOP_DRIVERS)
+
+        # Rodadas continuam o fluxo: idêntico a uma execução fixa com as mesmas iterações
+        fixed = runner.run_monte_carlo(drivers, 20, stats.iterations, 0.3, seed=4)
+        self.assertEqual(stats.wins.tolist(), fixed.wins.tolist())
+        self.assertEqual(stats.podiums.tolist(), fixed.podiums.tolist())
+
+    def test_adaptive_run_respects_limits(self):
+        drivers = make_grid(num_drivers=6, gap=0.05)
+        stats, report = precision.run_until_precise(drivers, 20, 0.001, seed=4, max_iterations=1500)
+        self.assertEqual(stats.iterations, 1500)
+        self.assertEqual(report.stop_reason, precision.STOP_MAX_ITERATIONS)
+        self.assertFalse(report.converged)
+
+        stats, report = precision.run_until_precise(drivers, 20, 0.001, seed=4, time_budget=0.0)
+        self.assertEqual(report.stop_reason, precision.STOP_TIME_BUDGET)
+        self.assertEqual(report.rounds, 1)
+
+
+class TestCacheDeResultados(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def test_key_depends_on_scenario(self):
+        drivers = make_grid(num_drivers=3)
+        key = cache.make_cache_key(drivers, 58, 0.2, 1000, 7, pit_strategy="reactive")
+        self.assertEqual(key, cache.make_cache_key(make_grid(num_drivers=3), 58, 0.2, 1000, 7, pit_strategy="reactive"))
+
+        changed = make_grid(num_drivers=3)
+        changed[1].consistency += 0.01
+        variants = [
+            cache.make_cache_key(changed, 58, 0.2, 1000, 7, pit_strategy="reactive"),
+            cache.make_cache_key(drivers, 57, 0.2, 1000, 7, pit_strategy="reactive"),
+            cache.make_cache_key(drivers, 58, 0.3, 1000, 7, pit_strategy="reactive"),
+            cache.make_cache_key(drivers, 58, 0.2, 1001, 7, pit_strategy="reactive"),
+            cache.make_cache_key(drivers, 58, 0.2, 1000, None, pit_strategy="reactive"),
+            cache.make_cache_key(drivers, 58, 0.2, 1000, 7, pit_strategy="planned"),
+        ]
+        self.assertEqual(len(set(variants + [key])), len(variants) + 1)
+
+    def test_memory_and_disk_tiers(self):
+        store = cache.ResultCache(directory=self._tmp.name, memory_entries=2)
+        self.assertEqual(store.get("a"), (None, cache.CACHE_MISS))
+
+        for key in ("a", "b", "c"):
+            store.put(key, {"key": key})
+        # "a" saiu da memória (LRU) mas continua no disco
+        self.assertEqual(store.get("c"), ({"key": "c"}, cache.CACHE_MEMORY))
+        self.assertEqual(store.get("a"), ({"key": "a"}, cache.CACHE_DISK))
+        self.assertEqual(store.get("a")[1], cache.CACHE_MEMORY)
+
+    def test_disk_eviction_by_size(self):
+        store = cache.ResultCache(directory=self._tmp.name, memory_entries=1, disk_bytes=250)
+        for index in range(5):
+            store.put(f"k{index}", {"payload": "x" * 80})
+            os.utime(os.path.join(self._tmp.name, f"k{index}.json"), (index, index))
+
+        files = sorted(os.listdir(self._tmp.name))
+        total = sum(os.path.getsize(os.path.join(self._tmp.name, name)) for name in files)
+        self.assertLessEqual(total, 250)
+        # Os mais recentes sobrevivem
+        self.assertIn("k4.json", files)
+        self.assertNotIn("k0.json", files)
+
+
+class TestReducaoDeVariancia(unittest.TestCase):
+
+    def test_antithetic_generator_mirrors_pairs(self):
+        rng = streams.BlockedGenerator(3, 0, 301, antithetic=True)
+        noise = rng.standard_normal((301, 4))
+        np.testing.assert_array_equal(noise[1::2], -noise[0:300:2])
+        uniforms = rng.random(301)
+        np.testing.assert_array_equal(uniforms[1::2], 1.0 - uniforms[0:300:2])
+        compounds = rng.integers(0, 2, size=(301, 3))
+        np.testing.assert_array_equal(compounds[1::2], 1 - compounds[0:300:2])
+
+    def test_stratified_weather_matches_probability(self):
+        rng = streams.BlockedGenerator(5, 0, 512)
+        weather = WeatherEngine.determine_weather_batch(0.3, 512, rng, stratified=True)
+        dry = int(np.sum(weather == 0))
+        # Um uniforme por estrato: 30% de chuva em cada bloco, a menos de um sorteio
+        self.assertLessEqual(abs((512 - dry) - 0.3 * 512), 2)
+
+    def test_variance_reduction_is_independent_of_batching(self):
+        drivers = make_grid(num_drivers=3)
+        options = streams.VarianceReduction(antithetic=True, stratified_weather=True)
+        a = vectorized.simulate_races_batch(drivers, 15, 777, 0.4, seed=8, batch_size=256, variance_reduction=options)
+        b = vectorized.simulate_races_batch(drivers, 15, 777, 0.4, seed=8, batch_size=1024, variance_reduction=options)
+        for name in ("wins", "positions_sum", "wins_sq", "podiums_weighted"):
+            np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+        self.assertEqual(a.group_size_sq, 4 * 388 + 1)
+
+    def test_effective_sample_size(self):
+        # Corridas independentes: ESS = iterações
+        drivers = make_grid(num_drivers=2, gap=0.01)
+        independent = vectorized.simulate_races_batch(drivers, 30, 1024, seed=1)
+        win_ess, _ = precision.effective_sample_sizes(independent)
+        np.testing.assert_allclose(win_ess, 1024)
+
+        # Duelo equilibrado: os pares antitéticos quase sempre se dividem
+        paired = vectorized.simulate_races_batch(
+            drivers, 30, 1024, seed=1, variance_reduction=streams.VarianceReduction(antithetic=True)
+        )
+        report = precision.measure_precision(paired)
+        self.assertGreater(report.effective_sample_size, 2 * 1024)
+        low, high = precision.wilson_interval(paired.wins, 1024, effective_trials=precision.effective_sample_sizes(paired)[0])
+        plain_low, plain_high = precision.wilson_interval(paired.wins, 1024)
+        self.assertTrue(np.all(high - low < plain_high - plain_low))
+
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = jobs.JobManager(max_workers=2, ttl=60, max_jobs=10)
+        self.addCleanup(self.manager.shutdown)
+        self.addCleanup(runner.shutdown_executor)
+
+    def _wait(self, job):
+        for _ in range(500):
+            if job.finished:
+                return job
+            time.sleep(0.01)
+        self.fail("job não terminou")
+
+    def test_job_publishes_partial_aggregates(self):
+        drivers = make_grid(num_drivers=3)
+        partials = []
+
+        def work(progress):
+            def on_round(stats):
+                partials.append(stats.iterations)
+                progress({"iterations": stats.iterations})
+            stats, _, _ = runner.run_in_rounds(drivers, 20, None, seed=2, max_iterations=1000, on_round=on_round)
+            return {"wins": stats.wins.tolist()}
+
+        job = self._wait(self.manager.submit(work))
+        self.assertEqual(job.status, jobs.JOB_DONE)
+        self.assertEqual(partials, [256, 512, 1000])
+        self.assertEqual(job.progress, {"iterations": 1000})
+        self.assertEqual(job.result["wins"], runner.run_monte_carlo(drivers, 20, 1000, seed=2).wins.tolist())
+        self.assertIs(self.manager.get(job.id), job)
+
+    def test_failed_job_keeps_error(self):
+        class NotFound(Exception):
+            status_code = 404
+            detail = "sem dados"
+
+        def work(progress):
+            raise NotFound()
+
+        job = self._wait(self.manager.submit(work))
+        self.assertEqual(job.status, jobs.JOB_FAILED)
+        self.assertEqual(job.error, {"status_code": 404, "detail": "sem dados"})
+        self.assertIsNone(self.manager.get("desconhecido"))
+
+    def test_pending_jobs_are_limited(self):
+        manager = jobs.JobManager(max_workers=1, ttl=60, max_jobs=2)
+        self.addCleanup(manager.shutdown)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def work(progress):
+            release.wait(5)
+            return {}
+
+        pending = [manager.submit(work), manager.submit(work)]
+        with self.assertRaises(jobs.JobQueueFull):
+            manager.submit(work)
+
+        # Concluídos liberam vaga (e são removidos pelo limite de jobs guardados)
+        release.set()
+        for job in pending:
+            self._wait(job)
+        self.assertEqual(self._wait(manager.submit(work)).status, jobs.JOB_DONE)
+
+    def test_full_queue_is_429(self):
+        from fastapi import HTTPException
+        simulation = import_without_fastf1("app.api.endpoints.simulation")
+        manager = mock.Mock()
+        manager.submit.side_effect = jobs.JobQueueFull("Limite de 2 jobs pendentes atingido")
+        with mock.patch.object(simulation, "get_job_manager", return_value=manager):
+            with self.assertRaises(HTTPException) as raised:
+                asyncio.run(simulation.submit_simulation_job(2025, "Bahrain", options={}))
+        self.assertEqual(raised.exception.status_code, 429)
+
+
+class TestVarredura(unittest.TestCase):
+
+    def test_weather_from_uniforms_matches_batch_draw(self):
+        rain_draws = np.array([0.05, 0.05, 0.5, 0.95])
+        split_draws = np.array([0.2, 0.8, 0.2, 0.8])
+        weather = WeatherEngine.weather_from_uniforms(0.3, rain_draws, split_draws)
+        self.assertEqual([WEATHER_ORDER[code] for code in weather], [
+            WeatherCondition.MIXED, WeatherCondition.WET, WeatherCondition.DRY, WeatherCondition.DRY
+        ])
+
+    def test_sweep_matrices_are_consistent(self):
+        drivers = make_grid(num_drivers=4)
+        scenarios = [SweepScenario(p, 30) for p in (0.0, 0.5, 1.0)] + [SweepScenario(0.0, 20, 30.0)]
+        results = vectorized.simulate_sweep_batch(drivers, scenarios, 600, seed=4, batch_size=256)
+
+        self.assertEqual(len(results), len(scenarios))
+        for stats in results:
+            self.assertEqual(stats.iterations, 600)
+            self.assertEqual(int(stats.wins.sum()), 600)
+            self.assertEqual(int(stats.positions_sum.sum()), 600 * 10)
+        self.assertEqual(results[0].weather_counts, {"DRY": 600})
+        self.assertNotIn("DRY", results[2].weather_counts)
+
+    def test_common_random_numbers_across_scenarios(self):
+        drivers = make_grid(num_drivers=3)
+        scenarios = [SweepScenario(p, 20) for p in (0.0, 0.2, 0.4, 0.6)]
+        results = vectorized.simulate_sweep_batch(drivers, scenarios, 1000, seed=9)
+
+        # Os mesmos uniformes definem o clima: corridas secas só diminuem com p
+        dry = [stats.weather_counts.get("DRY", 0) for stats in results]
+        self.assertEqual(dry, sorted(dry, reverse=True))
+
+        # Cenários idênticos recebem exatamente os mesmos sorteios
+        twins = vectorized.simulate_sweep_batch(drivers, [scenarios[1], scenarios[1]], 1000, seed=9)
+        np.testing.assert_array_equal(twins[0].wins, twins[1].wins)
+        np.testing.assert_array_equal(twins[0].wins, results[1].wins)
+
+    def test_sharded_sweep_is_bit_identical_to_serial_sweep(self):
+        drivers = make_grid(num_drivers=3)
+        scenarios = [SweepScenario(p, 15) for p in (0.0, 0.7)]
+        with mock.patch.object(settings, "SIMULATION_MIN_SHARD_SIZE", 256):
+            sharded = runner.run_sweep(drivers, scenarios, 1000, seed=5, workers=3)
+        self.addCleanup(runner.shutdown_executor)
+        serial = vectorized.simulate_sweep_batch(drivers, scenarios, 1000, seed=5)
+        for a, b in zip(sharded, serial):
+            np.testing.assert_array_equal(a.positions_sum, b.positions_sum)
+            self.assertEqual(a.weather_counts, b.weather_counts)
+
+
+class TestClimaPorVolta(unittest.TestCase):
+
+    def test_transition_matrix_and_constant_timelines(self):
+        for p in (0.0, 0.3, 1.0):
+            np.testing.assert_allclose(WeatherEngine.transition_matrix(p).sum(axis=1), 1.0)
+
+        rng = random.Random(1)
+        self.assertEqual(set(WeatherEngine.weather_timeline(0.0, 30, rng)), {WeatherCondition.DRY})
+        self.assertEqual(len(set(WeatherEngine.weather_timeline(1.0, 30, rng))), 1)
+        timeline = WeatherEngine.weather_timeline_batch(0.0, 10, 30, np.random.default_rng(1))
+        self.assertEqual(timeline.shape, (10, 30))
+        self.assertFalse(timeline.any())
+
+    def test_scalar_and_batch_timelines_agree(self):
+        rng = random.Random(2)
+        scalar = np.array([
+            [WEATHER_ORDER.index(c) for c in WeatherEngine.weather_timeline(0.4, 40, rng)]
+            for _ in range(3000)
+        ])
+        batch = WeatherEngine.weather_timeline_batch(0.4, 3000, 40, np.random.default_rng(2))
+        for code in range(len(WEATHER_ORDER)):
+            self.assertAlmostEqual((scalar == code).mean(), (batch == code).mean(), delta=0.03)
+
+    def test_crossover_pit_stop_when_rain_arrives(self):
+        drivers = make_grid(num_drivers=3)
+        timeline = [WeatherCondition.DRY] * 5 + [WeatherCondition.WET] * 25
+        for pit_strategy in ("reactive", "planned"):
+            with mock.patch.object(WeatherEngine, "weather_timeline", return_value=timeline):
+                results, weather = simulate_race(
+                    drivers, 30, 0.5, seed=3, pit_strategy=pit_strategy, weather_model="markov"
+                )
+            self.assertEqual(weather, WeatherCondition.WET)
+            for result in results:
+                self.assertGreaterEqual(result.pit_stops, 1)
+
+        with self.assertRaises(ValueError):
+            simulate_race(drivers, 10, 0.0, seed=1, weather_model="hourly")
+
+    def test_markov_batch_is_consistent_and_independent_of_batching(self):
+        drivers = make_grid(num_drivers=4)
+        for pit_strategy in ("reactive", "planned"):
+            a = vectorized.simulate_races_batch(
+                drivers, 30, 700, 0.4, seed=6, batch_size=256, pit_strategy=pit_strategy, weather_model="markov"
+            )
+            b = vectorized.simulate_races_batch(
+                drivers, 30, 700, 0.4, seed=6, batch_size=768, pit_strategy=pit_strategy, weather_model="markov"
+            )
+            np.testing.assert_array_equal(a.positions_sum, b.positions_sum)
+            self.assertEqual(a.weather_counts, b.weather_counts)
+            self.assertEqual(int(a.wins.sum()), 700)
+            self.assertEqual(sum(a.weather_counts.values()), 700)
+
+        # Sem chuva, o modelo por volta não altera a corrida seca
+        static = vectorized.simulate_races_batch(drivers, 30, 300, 0.0, seed=6)
+        markov = vectorized.simulate_races_batch(drivers, 30, 300, 0.0, seed=6, weather_model="markov")
+        self.assertEqual(markov.weather_counts, {"DRY": 300})
+        self.assertEqual(int(markov.wins.sum()), int(static.wins.sum()))
+
+
+class TestPontuacaoFantasy(unittest.TestCase):
+
+    def test_kernel_matches_scalar_rules(self):
+        rng = np.random.default_rng(0)
+        iterations, num_drivers = 50, 6
+        team = np.array([0, 0, 1, 1, 2, -1])
+        grid = np.tile(np.arange(1, num_drivers + 1), (iterations, 1))
+        finish = np.argsort(rng.random((iterations, num_drivers)), axis=1) + 1
+        fastest_lap = finish == rng.integers(1, num_drivers + 1, size=(iterations, 1))
+        dnf = rng.random((iterations, num_drivers)) < 0.2
+
+        points, constructor_points = scoring.score_races(grid, finish, fastest_lap, dnf, team)
+        mate = {0: 1, 1: 0, 2: 3, 3: 2}
+        for it in range(iterations):
+            for d in range(num_drivers):
+                expected = calculate_driver_weekend_score({"race": {
+                    "grid": int(grid[it, d]),
+                    "position": int(finish[it, d]),
+                    "fastest_lap": bool(fastest_lap[it, d]),
+                    "beat_teammate": d in mate and finish[it, d] < finish[it, mate[d]],
+                    "status": "Retired" if dnf[it, d] else "Finished"
+                }})
+                self.assertEqual(points[it, d], expected)
+
+        # Construtor: soma dos pilotos + pódio duplo / abandono duplo
+        self.assertEqual(constructor_points.shape, (iterations, 3))
+        np.testing.assert_array_equal(constructor_points[:, 2], points[:, 4])
+        bonus = constructor_points[:, 0] - points[:, 0] - points[:, 1]
+        double_podium = (finish[:, 0] <= 3) & (finish[:, 1] <= 3)
+        double_dnf = dnf[:, 0] & dnf[:, 1]
+        np.testing.assert_array_equal(
+            bonus, np.where(double_podium, scoring.DOUBLE_PODIUM_POINTS, 0) + np.where(double_dnf, scoring.DOUBLE_DNF_POINTS, 0)
+        )
+
+    def test_overtake_rule_changes_apply_to_kernel(self):
+        from app.core import regras_corrida
+
+        def capped(grid_position, finish_position):
+            return max(-5, min(5, grid_position - finish_position))
+
+        rng = np.random.default_rng(1)
+        iterations, num_drivers = 40, 12
+        grid = np.argsort(rng.random((iterations, num_drivers)), axis=1) + 1
+        finish = np.argsort(rng.random((iterations, num_drivers)), axis=1) + 1
+        no = np.zeros((iterations, num_drivers), dtype=bool)
+        team = np.full(num_drivers, -1)
+        with mock.patch.object(regras_corrida, "calculate_race_overtake_points", side_effect=capped):
+            points, _ = scoring.score_races(grid, finish, no, no, team)
+            low, high = scoring.points_range(num_drivers, 1)
+            for it in range(iterations):
+                for d in range(num_drivers):
+                    expected = calculate_driver_weekend_score({"race": {
+                        "grid": int(grid[it, d]), "position": int(finish[it, d]), "status": "Finished"
+                    }})
+                    self.assertEqual(points[it, d], expected)
+        self.assertGreaterEqual(int(points.min()), low)
+        self.assertLess(high, scoring.points_range(num_drivers, 1)[1])
+
+    def test_summary_percentiles_match_numpy(self):
+        points = np.array([[3, -2], [7, 0], [7, 1], [10, 1], [12, 4]])
+        counts = scoring.histogram_counts(points, -5, 20)
+        distribution = scoring.FantasyDistribution(["A", "B"], [], -5, counts, np.zeros((0, 20), dtype=np.int64))
+        summary = scoring.summarize_fantasy(distribution, percentiles=(0, 50, 100))
+        first = summary["drivers"][0]
+        self.assertEqual(first["mean"], 7.8)
+        self.assertEqual(first["percentiles"], {"p0": 3, "p50": 7, "p100": 12})
+        for q in (0, 50, 100):
+            self.assertEqual(
+                summary["drivers"][1]["percentiles"][f"p{q}"],
+                np.percentile(points[:, 1], q, method="inverted_cdf")
+            )
+        self.assertEqual(first["histogram"]["min_points"], 3)
+        self.assertEqual(sum(first["histogram"]["counts"]), 5)
+        self.assertEqual(summary["constructors"], [])
+
+    def test_engine_distribution_is_consistent_and_independent_of_batching(self):
+        drivers = make_grid(num_drivers=4)
+        for i, driver in enumerate(drivers):
+            driver.team = f"T{i // 2}"
+        a = vectorized.simulate_races_batch(drivers, 20, 600, 0.3, seed=2, batch_size=256, fantasy=True)
+        b = vectorized.simulate_races_batch(drivers, 20, 600, 0.3, seed=2, batch_size=768, fantasy=True)
+        np.testing.assert_array_equal(a.fantasy.driver_counts, b.fantasy.driver_counts)
+        np.testing.assert_array_equal(a.fantasy.constructor_counts, b.fantasy.constructor_counts)
+        self.assertEqual(a.fantasy.constructor_names, ["T0", "T1"])
+        np.testing.assert_array_equal(a.fantasy.driver_counts.sum(axis=1), 600)
+
+        # A simulação não altera as demais estatísticas
+        plain = vectorized.simulate_races_batch(drivers, 20, 600, 0.3, seed=2)
+        self.assertIsNone(plain.fantasy)
+        np.testing.assert_array_equal(plain.positions_sum, a.positions_sum)
+
+
+class TestTemposPorFase(unittest.TestCase):
+
+    def test_nested_phases_are_exclusive(self):
+        timer = timing.PhaseTimer()
+        with timing.activate(timer):
+            with timing.phase(timing.PHASE_PARAMETERS):
+                time.sleep(0.01)
+                with timing.phase(timing.PHASE_SESSION_LOAD):
+                    time.sleep(0.02)
+            with timing.phase(timing.PHASE_SIMULATION):
+                pass
+        # Sem timer ativo, phase() não mede nada
+        with timing.phase(timing.PHASE_AGGREGATION):
+            pass
+
+        self.assertEqual(set(timer.durations), {"session_load", "parameters", "simulation"})
+        self.assertGreaterEqual(timer.durations["session_load"], 0.02)
+        self.assertLess(timer.durations["parameters"], 0.02)
+        timings = timer.to_dict()
+        self.assertEqual(list(timings), ["session_load", "parameters", "simulation", "total"])
+        self.assertTrue(timer.server_timing().startswith("session_load;dur="))
+
+    def test_histograms_are_cumulative(self):
+        histograms = timing.PhaseHistograms(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.5, 0.7, 5.0):
+            histograms.observe("simulation", seconds)
+        series = histograms.snapshot()["simulation"]
+        self.assertEqual(series["buckets"], {"0.1": 1, "1": 3, "+Inf": 4})
+        self.assertEqual(series["count"], 4)
+        text = histograms.render_prometheus()
+        self.assertIn('simulation_phase_seconds_bucket{phase="simulation",le="1"} 3', text)
+        self.assertIn('simulation_phase_seconds_count{phase="simulation"} 4', text)
+
+
+class TestRaceTrace(unittest.TestCase):
+
+    def test_compact_formats_round_trip(self):
+        results, _ = simulate_race(make_grid(num_drivers=4), 12, 0.5, seed=8)
+        full = trace.build_race_trace(results, 12)
+        self.assertEqual(full["lap_data"][0]["lap_history"], results[0].lap_history)
+
+        names, gaps, positions = trace.decode_race_trace(full)
+        self.assertEqual(positions.shape, (4, 12))
+        np.testing.assert_array_equal(gaps.min(axis=0), 0.0)
+        for trace_format in ("columnar", "packed"):
+            encoded = trace.build_race_trace(results, 12, trace_format)
+            self.assertEqual(encoded["format"], trace_format)
+            decoded_names, decoded_gaps, decoded_positions = trace.decode_race_trace(encoded)
+            self.assertEqual(decoded_names, names)
+            self.assertEqual(decoded_positions.dtype, np.uint8)
+            np.testing.assert_array_equal(decoded_positions, positions)
+            np.testing.assert_allclose(decoded_gaps, gaps, atol=1e-3)
+
+        # Intervalos em JSON com no máximo 3 casas (sem ruído de float32)
+        columnar = trace.build_race_trace(results, 12, "columnar")
+        for row in columnar["gap_to_leader"]:
+            for gap in row:
+                self.assertLessEqual(len(repr(gap).split(".")[-1]), 3)
+        self.assertLess(len(json.dumps(columnar)), len(json.dumps(full)) / 2)
+
+        with self.assertRaises(ValueError):
+            trace.build_race_trace(results, 12, "csv")
+
+
+class TestMatrizDePosicoes(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def tearDown(self):
+        runner.shutdown_executor()
+
+    @mock.patch.object(settings, "SIMULATION_MIN_SHARD_SIZE", 100)
+    def test_positions_match_counters_and_sharding(self):
+        drivers = make_grid(num_drivers=5)
+        serial = runner.run_monte_carlo(drivers, 15, 1100, weather_prob=0.4, seed=9, workers=1, record_positions=True)
+        sharded = runner.run_monte_carlo(drivers, 15, 1100, weather_prob=0.4, seed=9, workers=3, record_positions=True)
+
+        positions = serial.finishing_positions
+        self.assertEqual((positions.shape, positions.dtype), ((1100, 5), np.uint8))
+        np.testing.assert_array_equal(positions, sharded.finishing_positions)
+        self.assertEqual((positions == 1).sum(axis=0).tolist(), serial.wins.tolist())
+        self.assertEqual(positions.sum(axis=0, dtype=np.int64).tolist(), serial.positions_sum.tolist())
+        self.assertIsNone(runner.run_monte_carlo(drivers, 15, 300, seed=9, workers=1).finishing_positions)
+
+    def test_queries_match_direct_counts(self):
+        rng = np.random.default_rng(4)
+        positions = np.argsort(rng.random((3000, 6)), axis=1).argsort(axis=1).astype(np.uint8) + 1
+
+        counts = run_store.position_counts(positions)
+        self.assertEqual(counts[2, 0], int((positions[:, 2] == 1).sum()))
+        np.testing.assert_array_equal(counts.sum(axis=0), 3000)
+
+        with mock.patch.object(run_store, "HEAD_TO_HEAD_CHUNK", 700):
+            h2h = run_store.head_to_head_matrix(positions)
+        self.assertAlmostEqual(h2h[1, 4], float((positions[:, 1] < positions[:, 4]).mean()))
+        np.testing.assert_allclose(h2h + h2h.T + np.eye(6), 1.0)
+        np.testing.assert_allclose(run_store.head_to_head_matrix(positions, [4, 1]), h2h[np.ix_([4, 1], [4, 1])])
+
+        top3 = run_store.top_n_probabilities(positions, 3)
+        np.testing.assert_allclose(top3, counts[:, :3].sum(axis=1) / 3000)
+        self.assertAlmostEqual(top3.sum(), 3.0)
+        joint = run_store.joint_top_n_probability(positions, 3, [0, 5])
+        self.assertAlmostEqual(joint, float(((positions[:, 0] <= 3) & (positions[:, 5] <= 3)).mean()))
+
+    def test_store_round_trip_and_eviction(self):
+        store = run_store.RunStore(directory=self._tmp.name, disk_bytes=10 ** 6)
+        positions = np.tile(np.arange(1, 5, dtype=np.uint8), (50, 1))
+        run_id = store.save(positions, ["A", "B", "C", "D"], {"track": "Monza"})
+
+        run = store.load(run_id)
+        self.assertIsInstance(run.positions, np.memmap)
+        np.testing.assert_array_equal(run.positions, positions)
+        self.assertEqual((run.driver_names, run.metadata), (["A", "B", "C", "D"], {"track": "Monza"}))
+        self.assertEqual(run.columns(["C", "A"]), [2, 0])
+        with self.assertRaises(KeyError):
+            run.columns(["Z"])
+        for missing in ("0" * 32, "../" + run_id):
+            self.assertFalse(store.exists(missing))
+            with self.assertRaises(KeyError):
+                store.load(missing)
+
+        # Limite menor que duas execuções: a mais antiga é removida
+        store.disk_bytes = 2 * sum(os.path.getsize(os.path.join(self._tmp.name, n)) for n in os.listdir(self._tmp.name)) - 1
+        os.utime(os.path.join(self._tmp.name, f"{run_id}.json"), (0, 0))
+        newer = store.save(positions, ["A", "B", "C", "D"], {"track": "Monza"})
+        self.assertFalse(store.exists(run_id))
+        self.assertTrue(store.exists(newer))
+
+    def test_eviction_keeps_matrix_of_save_in_progress(self):
+        store = run_store.RunStore(directory=self._tmp.name, disk_bytes=10 ** 6)
+        positions = np.tile(np.arange(1, 5, dtype=np.uint8), (50, 1))
+        older = store.save(positions, ["A", "B", "C", "D"])
+        os.utime(os.path.join(self._tmp.name, f"{older}.json"), (1000, 1000))
+
+        # save() de outra thread entre a gravação do .npy e a do .json
+        pending = "f" * 32
+        np.save(os.path.join(self._tmp.name, f"{pending}.npy"), positions)
+        store.disk_bytes = sum(os.path.getsize(os.path.join(self._tmp.name, n)) for n in os.listdir(self._tmp.name)) - 1
+        store._evict()
+
+        self.assertFalse(store.exists(older))
+        self.assertTrue(os.path.exists(os.path.join(self._tmp.name, f"{pending}.npy")))
+
+
+class TestConfrontoDireto(unittest.TestCase):
+
+    def tearDown(self):
+        runner.shutdown_executor()
+
+    @mock.patch.object(settings, "SIMULATION_MIN_SHARD_SIZE", 100)
+    def test_counts_accumulated_in_the_simulation_pass(self):
+        drivers = make_grid(num_drivers=4)
+        serial = runner.run_monte_carlo(
+            drivers, 15, 800, weather_prob=0.5, seed=6, workers=1, record_positions=True, head_to_head=True
+        )
+        sharded = runner.run_monte_carlo(drivers, 15, 800, weather_prob=0.5, seed=6, workers=3, head_to_head=True)
+
+        positions = serial.finishing_positions
+        np.testing.assert_array_equal(serial.ahead_counts, sharded.ahead_counts)
+        self.assertEqual(int(serial.ahead_counts[0, 3]), int((positions[:, 0] < positions[:, 3]).sum()))
+        np.testing.assert_array_equal(serial.ahead_counts + serial.ahead_counts.T + 800 * np.eye(4), 800)
+        self.assertIsNone(runner.run_monte_carlo(drivers, 15, 256, seed=6, workers=1).ahead_counts)
+
+    def test_summary_includes_teammate_battles(self):
+        counts = np.array([[0, 7, 9], [3, 0, 6], [1, 4, 0]])
+        summary = head_to_head.summarize_head_to_head(["A", "B", "C"], counts, 10, ["X", None, "X"])
+        self.assertEqual(summary["matrix"][1][2], 0.6)
+        self.assertEqual(
+            summary["teammate_battles"], [{"team": "X", "drivers": ["A", "C"], "matrix": [[0.0, 0.9], [0.1, 0.0]]}]
+        )
+        self.assertEqual(head_to_head.summarize_head_to_head(["A"], np.zeros((1, 1)), 0)["teammate_battles"], [])
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_compare_to_baseline_flags_regressions(self):
+        baseline = {
+            "20x58": {"driver_laps_per_second": 1000.0, "peak_memory_mb": 10.0},
+            "2x50": {"driver_laps_per_second": 500.0, "peak_memory_mb": 0.01},
+        }
+        results = {
+            "20x58": {"driver_laps_per_second": 700.0, "peak_memory_mb": 13.0},
+            "2x50": {"driver_laps_per_second": 480.0, "peak_memory_mb": 0.3},
+            "mc_10k": {"driver_laps_per_second": 1.0, "peak_memory_mb": 99.0},
+        }
+        regressions = simulation_benchmark.compare_to_baseline(results, baseline, threshold=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(r.startswith("20x58") for r in regressions))
+
+    def test_synthetic_scenarios_run_offline(self):
+        scenario = simulation_benchmark.BenchmarkScenario("mini", 3, 5, 1.0, races=2)
+        result = simulation_benchmark.measure(scenario, repeat=1)
+        self.assertGreater(result["driver_laps_per_second"], 0)
+        self.assertGreaterEqual(result["peak_memory_mb"], 0)
+
+
+class TestParametrosDeCorrida(unittest.TestCase):
+
+    def setUp(self):
+        race_setup = import_without_fastf1("app.services.race_setup")
+        self.race_setup = race_setup
+        race_setup.clear_race_parameters_cache()
+        self.addCleanup(race_setup.clear_race_parameters_cache)
+
+    def test_qualifying_fallback_is_not_memoized(self):
+        qualifying, race = make_grid(2, gap=0.1), make_grid(2, gap=0.3)
+        sessions = [(qualifying, "Qualifying"), (race, "Race")]
+        with mock.patch.object(self.race_setup, "_extract_race_parameters", side_effect=sessions) as extract:
+            first = self.race_setup.load_race_parameters(2025, "Bahrain")
+            second = self.race_setup.load_race_parameters(2025, "Bahrain")
+            third = self.race_setup.load_race_parameters(2025, "Bahrain")
+
+        self.assertEqual(extract.call_count, 2)
+        self.assertEqual([d.base_lap_time for d in first], [d.base_lap_time for d in qualifying])
+        self.assertEqual([d.base_lap_time for d in second], [d.base_lap_time for d in race])
+        self.assertEqual([d.base_lap_time for d in third], [d.base_lap_time for d in race])
+        # Cópias: o chamador pode alterar os pilotos sem afetar a memória
+        self.assertIsNot(third[0], second[0])
+
+    def test_clear_cache_reloads(self):
+        with mock.patch.object(self.race_setup, "_extract_race_parameters",
+                               return_value=(make_grid(2), "Race")) as extract:
+            self.race_setup.load_race_parameters(2025, "Monaco")
+            self.race_setup.clear_race_parameters_cache()
+            self.race_setup.load_race_parameters(2025, "Monaco")
+        self.assertEqual(extract.call_count, 2)
+
+
+class TestEndpointVarredura(unittest.TestCase):
+
+    def test_uncovered_planned_scenario_is_422(self):
+        from fastapi import HTTPException
+        simulation = import_without_fastf1("app.api.endpoints.simulation")
+
+        with mock.patch.object(simulation, "load_race_parameters", return_value=make_grid(3)):
+            with self.assertRaises(HTTPException) as raised:
+                simulation.execute_sweep(2025, "Bahrain", [0], laps=[1], iterations=10, seed=1,
+                                         pit_strategy="planned", use_cache=False)
+        self.assertEqual(raised.exception.status_code, 422)
+
+
+class TestRequisicaoDeSimulacao(unittest.TestCase):
+
+    def test_num_simulations_must_be_positive(self):
+        from pydantic import ValidationError
+        SimulationRequest = import_without_fastf1("app.api.endpoints.simulation").SimulationRequest
+
+        self.assertIsNone(SimulationRequest(gp_name="Bahrain").num_simulations)
+        self.assertEqual(SimulationRequest(gp_name="Bahrain", num_simulations=1).num_simulations, 1)
+        for value in (0, -5):
+            with self.assertRaises(ValidationError):
+                SimulationRequest(gp_name="Bahrain", num_simulations=value)
+
+
+if __name__ == '__main__':
+    unittest.main()
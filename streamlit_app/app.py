@@ -1,6 +1,7 @@
 import streamlit as st
 import sys
 import os
+import time
 import pandas as pd
 import numpy as np
 import requests
@@ -11,7 +12,7 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'backen
 from auth import Authenticator
 from components.charts import render_telemetry_chart, render_simulation_results
 from components.team_builder import render_team_builder
-from config_env import API_BASE_URL
+from config_env import API_BASE_URL, SIMULATION_TIME_BUDGET_MS
 
 # Configuração da Página
 st.set_page_config(page_title="F1 2025 Fantasy Projections", layout="wide", page_icon="🏎️")
@@ -519,14 +520,28 @@ elif page == "🔮 Simulador Monte Carlo":
         )
     
     with col3:
-        iterations = st.slider(
-            "🔄 Número de Iterações",
-            min_value=100,
-            max_value=1000,
-            value=100,
-            step=50,
-            help="Número de simulações Monte Carlo a executar"
+        adaptive_mode = st.checkbox(
+            "🎯 Precisão automática",
+            value=False,
+            help="Simula até as probabilidades dos favoritos atingirem a precisão escolhida"
         )
+        if adaptive_mode:
+            tolerance_pp = st.select_slider(
+                "🎯 Precisão (± pontos percentuais)",
+                options=[5.0, 2.0, 1.0, 0.5],
+                value=1.0,
+                help="Meia-largura máxima do intervalo de confiança (95%) de vitória e pódio dos favoritos"
+            )
+            iterations = None
+        else:
+            iterations = st.slider(
+                "🔄 Número de Iterações",
+                min_value=100,
+                max_value=1000,
+                value=100,
+                step=50,
+                help="Número de simulações Monte Carlo a executar"
+            )
     
     # Slider para probabilidade de chuva
     st.markdown("### 🌧️ Condições Climáticas")
@@ -543,15 +558,69 @@ elif page == "🔮 Simulador Monte Carlo":
     
     # Botão para rodar simulação
     if st.button("🚀 Rodar Simulação", type="primary", use_container_width=True):
-        with st.spinner(f'Simulando corrida {iterations} vezes...'):
+        spinner_text = (
+            f'Simulando até atingir ±{tolerance_pp} p.p. de precisão...' if adaptive_mode
+            else f'Simulando corrida {iterations} vezes...'
+        )
+        with st.spinner(spinner_text):
             try:
-                url = f"{API_BASE_URL}/api/v1/simulation/run/{selected_year}/{selected_gp}"
-                params = {"iterations": iterations, "rain_probability": rain_probability}
+                # Envia a simulação como job e acompanha os parciais até a conclusão
+                url = f"{API_BASE_URL}/api/v1/simulation/jobs/run/{selected_year}/{selected_gp}"
+                params = {
+                    "rain_probability": rain_probability,
+                    "time_budget_ms": SIMULATION_TIME_BUDGET_MS,
+                    # Race Trace compacto (buffers base64), decodificado por render_lap_chart
+                    "trace_format": "packed"
+                }
+                if adaptive_mode:
+                    params["tolerance"] = tolerance_pp / 100.0
+                    # Redução de variância: a precisão pedida é atingida com menos iterações
+                    params["antithetic"] = True
+                    params["stratified_weather"] = True
+                else:
+                    params["iterations"] = iterations
                 
-                response = requests.post(url, params=params, timeout=300)
+                response = requests.post(url, params=params, timeout=30)
+                result = None
+                error_detail = None
                 
-                if response.status_code == 200:
-                    result = response.json()
+                if response.status_code == 202:
+                    job_url = f"{API_BASE_URL}/api/v1/simulation/jobs/{response.json()['job_id']}"
+                    progress_placeholder = st.empty()
+                    # O orçamento limita a simulação; a folga cobre o carregamento da sessão
+                    deadline = time.time() + SIMULATION_TIME_BUDGET_MS / 1000 + 120
+                    
+                    while True:
+                        if time.time() > deadline:
+                            raise requests.exceptions.Timeout()
+                        job = requests.get(job_url, timeout=30).json()
+                        if job['status'] == 'done':
+                            result = job['result']
+                            break
+                        if job['status'] == 'failed':
+                            error_detail = job['error']['detail']
+                            break
+                        
+                        # Probabilidades parciais convergindo a cada rodada
+                        partial = job.get('progress')
+                        if partial:
+                            with progress_placeholder.container():
+                                st.caption(f"⏳ {partial['iterations']} simulações até agora...")
+                                st.plotly_chart(
+                                    render_simulation_results(partial['predictions']),
+                                    use_container_width=True,
+                                    key=f"monte_carlo_progress_{partial['iterations']}"
+                                )
+                        time.sleep(0.5)
+                    
+                    progress_placeholder.empty()
+                else:
+                    try:
+                        error_detail = response.json().get("detail", "Erro desconhecido")
+                    except:
+                        error_detail = f"Erro HTTP {response.status_code}"
+                
+                if result is not None:
                     st.session_state.monte_carlo_result = result
                     
                     # Salva os pontos simulados no session_state para uso no otimizador
@@ -565,11 +634,7 @@ elif page == "🔮 Simulador Monte Carlo":
                     
                     st.success(f"✅ Simulação concluída com sucesso!")
                 else:
-                    try:
-                        error_detail = response.json().get("detail", "Erro desconhecido")
-                    except:
-                        error_detail = f"Erro HTTP {response.status_code}"
-                    
+                    error_detail = str(error_detail)
                     if "404" in error_detail or "não encontrado" in error_detail.lower() or "insuficientes" in error_detail.lower():
                         st.error(f"❌ Dados insuficientes para esta pista neste ano. Tente outro GP ou ano.")
                     else:
@@ -592,7 +657,20 @@ elif page == "🔮 Simulador Monte Carlo":
         
         st.divider()
         st.subheader(f"📊 Resultados da Simulação - {result['track']}")
-        st.caption(f"Baseado em {result['iterations']} simulações Monte Carlo")
+        precision = result.get('precision')
+        if precision and precision.get('stop_reason') == 'time_budget':
+            st.caption(
+                f"Baseado em {result['iterations']} simulações Monte Carlo "
+                f"(limitado pelo orçamento de {result['time_budget_ms'] / 1000:.0f} s)"
+            )
+        elif precision:
+            st.caption(
+                f"Baseado em {result['iterations']} simulações Monte Carlo · "
+                f"precisão dos favoritos: ±{precision['max_half_width'] * 100:.1f} p.p. "
+                f"({precision['confidence'] * 100:.0f}% de confiança)"
+            )
+        else:
+            st.caption(f"Baseado em {result['iterations']} simulações Monte Carlo")
         
         # Indicador de condição climática
         weather_condition = result.get('weather_condition', 'DRY')
@@ -14,6 +14,10 @@ except ImportError:
     st.success("✅ Plotly instalado com sucesso! Por favor, recarregue a página.")
     st.stop()
 
+import base64
+
+import numpy as np
+
 
 def _format_lap_time(lap_time_str: str) -> str:
     """
@@ -214,22 +218,58 @@ def render_simulation_results(predictions: list):
     return fig
 
 
+def _decode_race_trace(simulation_data: dict):
+    """
+    Converte o race_trace da API (qualquer trace_format) em arrays.
+    
+    Returns:
+        Tupla (pilotos, intervalo para o líder em segundos, posições), os
+        arrays com formato (pilotos × voltas)
+    """
+    trace_format = simulation_data.get('format', 'full')
+    
+    if trace_format == 'full':
+        lap_data = [d for d in simulation_data.get('lap_data', []) if d.get('position_history')]
+        if not lap_data:
+            return [], np.zeros((0, 0), dtype=np.float32), np.zeros((0, 0), dtype=np.uint8)
+        cumulative = np.array([d['lap_history'] for d in lap_data], dtype=np.float64)
+        gaps = (cumulative - cumulative.min(axis=0)).astype(np.float32)
+        positions = np.array([d['position_history'] for d in lap_data], dtype=np.uint8)
+        return [d['driver'] for d in lap_data], gaps, positions
+    
+    drivers = list(simulation_data.get('drivers', []))
+    shape = (len(drivers), simulation_data.get('laps', 0))
+    if trace_format == 'columnar':
+        gaps = np.array(simulation_data['gap_to_leader'], dtype=np.float32).reshape(shape)
+        positions = np.array(simulation_data['positions'], dtype=np.uint8).reshape(shape)
+        return drivers, gaps, positions
+    
+    # packed: buffers base64 little-endian; posições codificadas por diferença entre voltas
+    gaps = np.frombuffer(base64.b64decode(simulation_data['gap_to_leader']), dtype='<f4').reshape(shape)
+    positions = np.frombuffer(base64.b64decode(simulation_data['positions']), dtype=np.uint8).reshape(shape)
+    if simulation_data.get('positions_encoding') == 'delta':
+        positions = np.cumsum(positions, axis=1, dtype=np.uint8)
+    return drivers, gaps, positions
+
+
 def render_lap_chart(simulation_data: dict) -> go.Figure:
     """
     Renderiza um gráfico de Race Trace mostrando a evolução das posições por volta.
     
     Args:
-        simulation_data: Dicionário com dados da simulação contendo:
-            - 'lap_data': Lista de dicts com 'driver', 'lap_history', 'position_history'
-            - 'total_laps': Número total de voltas
+        simulation_data: race_trace da API, em qualquer trace_format:
+            - full: 'lap_data' (lista de dicts com 'driver', 'lap_history',
+              'position_history') e 'total_laps'
+            - columnar/packed: 'format', 'drivers', 'laps', 'gap_to_leader',
+              'positions' e 'total_laps'
     
     Returns:
         Figura Plotly com o gráfico de posições por volta
     """
-    lap_data = simulation_data.get('lap_data', [])
+    drivers, gaps, positions = _decode_race_trace(simulation_data)
     total_laps = simulation_data.get('total_laps', 0)
     
-    if not lap_data or total_laps == 0:
+    if not drivers or total_laps == 0:
         # Retorna figura vazia se não houver dados
         fig = go.Figure()
         fig.add_annotation(text="Sem dados de volta disponíveis", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
@@ -267,18 +307,11 @@ def render_lap_chart(simulation_data: dict) -> go.Figure:
     
     fig = go.Figure()
     
-    # Filtra pilotos que estão muito atrás (opcional, para clareza)
-    # Por enquanto, mostra todos os pilotos
-    drivers_to_show = lap_data
+    # Eixo X comum a todos os pilotos
+    laps = np.arange(1, positions.shape[1] + 1)
     
     color_idx = 0
-    for driver_data in drivers_to_show:
-        driver_name = driver_data['driver']
-        position_history = driver_data.get('position_history', [])
-        
-        if not position_history:
-            continue
-        
+    for i, driver_name in enumerate(drivers):
         # Escolhe cor
         if driver_name in team_colors:
             color = team_colors[driver_name]
@@ -288,25 +321,23 @@ def render_lap_chart(simulation_data: dict) -> go.Figure:
             color = team_colors.get(first_name, default_colors[color_idx % len(default_colors)])
             color_idx += 1
         
-        # Prepara dados (eixo Y invertido: 1º lugar no topo)
-        laps = list(range(1, len(position_history) + 1))
-        positions = position_history
-        
-        # Adiciona linha
+        # Adiciona linha (eixo Y invertido: 1º lugar no topo)
         fig.add_trace(go.Scatter(
             x=laps,
-            y=positions,
+            y=positions[i],
+            customdata=gaps[i],
             mode='lines+markers',
             name=driver_name,
             line=dict(color=color, width=2),
             marker=dict(size=4),
             hovertemplate=f'<b>{driver_name}</b><br>' +
                          'Volta %{x}<br>' +
-                         'Posição: %{y}<extra></extra>'
+                         'Posição: %{y}<br>' +
+                         'Intervalo para o líder: +%{customdata:.3f} s<extra></extra>'
         ))
     
     # Atualiza layout (eixo Y invertido: 1 no topo, 20 embaixo)
-    max_position = max([max(d.get('position_history', [1])) for d in lap_data], default=20)
+    max_position = int(positions.max()) if positions.size else 20
     
     fig.update_layout(
         title={'text': '📈 Race Trace - Evolução das Posições', 'x': 0.5, 'xanchor': 'center', 'font': {'size': 20}},
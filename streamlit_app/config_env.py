@@ -30,4 +30,6 @@ def get_api_base_url():
 # Exporta a URL da API
 API_BASE_URL = get_api_base_url()
 
-
+# Orçamento de tempo (ms) enviado ao Simulador Monte Carlo: a API roda quantas
+# iterações couberem nesse tempo, mantendo a resposta dentro do timeout
+SIMULATION_TIME_BUDGET_MS = int(os.getenv("SIMULATION_TIME_BUDGET_MS", 30000))